@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+비동기 크롤링 엔진
+하나의 이벤트 루프에서 최대 K명의 사용자를 동시에 처리
+"""
+
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from auto_chultae import logger, process_single_user, create_browser_pool
+from jitter_scheduler import JitterScheduler
+
+
+class _CrawlLane:
+    """
+    크롤링 레인 - 전용 스레드 1개와 그 스레드에 묶인 브라우저 풀
+
+    sync Playwright 객체는 생성한 스레드 밖에서 사용할 수 없으므로
+    레인마다 스레드를 고정하고 같은 스레드에서 풀을 만들고 닫습니다.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"CrawlLane{index}")
+        self.browser_pool = None
+
+    def run_user(self, user_info, button_ids, action_name):
+        if self.browser_pool is None:
+            self.browser_pool = create_browser_pool(size=1)
+        return process_single_user(user_info, button_ids, action_name, self.browser_pool)
+
+    def close(self):
+        if self.browser_pool:
+            self.browser_pool.stop()
+            self.browser_pool = None
+
+
+class AsyncCrawlEngine:
+    """사용자별 크롤링을 동시성 K로 제한해 병렬 실행"""
+
+    def __init__(self, concurrency=4):
+        self.concurrency = max(1, concurrency)
+
+    async def _run_user(self, semaphore, lanes, scheduler, slot, button_ids, action_name, report):
+        user_id = slot.user_id
+        loop = asyncio.get_running_loop()
+
+        # 시작 오프셋까지는 레인을 점유하지 않고 이벤트 루프에서 대기
+        await asyncio.sleep(scheduler.seconds_until(slot))
+
+        async with semaphore:
+            lane = lanes.get_nowait()
+            scheduler.mark_started(slot)
+            await loop.run_in_executor(None, report, {user_id: "running"})
+            try:
+                status = await loop.run_in_executor(
+                    lane.executor, lane.run_user, slot.user_info, button_ids, action_name
+                )
+            except Exception as e:
+                logger.error(f"[{user_id}] [{action_name}] 비동기 처리 중 오류: {e}")
+                status = "failed"
+            finally:
+                lanes.put_nowait(lane)
+
+        await loop.run_in_executor(None, report, {user_id: status})
+        return status
+
+    async def _run(self, users, button_ids, action_name, report):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        # 허용 시간대 안에서 사용자별 시작 시각 분산 배정
+        scheduler = JitterScheduler(action_name)
+        slots = scheduler.plan(users)
+
+        lane_count = min(self.concurrency, len(users))
+        lane_list = [_CrawlLane(i) for i in range(lane_count)]
+        lanes = asyncio.Queue()
+        for lane in lane_list:
+            lanes.put_nowait(lane)
+
+        try:
+            results = await asyncio.gather(*[
+                self._run_user(semaphore, lanes, scheduler, slot, button_ids, action_name, report)
+                for slot in slots
+            ])
+            return {slot.user_id: status for slot, status in zip(slots, results)}
+        finally:
+            scheduler.report(slots)
+
+            # 브라우저 풀은 생성한 레인 스레드에서 닫아야 함
+            for lane in lane_list:
+                try:
+                    await loop.run_in_executor(lane.executor, lane.close)
+                except Exception as e:
+                    logger.warning(f"크롤링 레인 {lane.index} 종료 실패: {e}")
+                lane.executor.shutdown(wait=False)
+
+    def run(self, users, button_ids, action_name, progress=None):
+        """사용자 목록 처리 - 사용자별 결과 상태 딕셔너리 반환 (progress: 사용자별 상태 변경 콜백)"""
+        start_time = time.time()
+        logger.info(f"비동기 크롤링 엔진 시작 - 사용자 {len(users)}명, 동시성: {self.concurrency}")
+
+        report = progress or (lambda updates: None)
+        summary = asyncio.run(self._run(users, button_ids, action_name, report))
+
+        elapsed = time.time() - start_time
+        logger.info(f"비동기 크롤링 엔진 완료 (소요시간: {elapsed:.2f}s) - 결과: {summary}")
+        return summary
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+출석 기록 로컬 아웃박스 모듈
+출퇴근 처리 경로의 attendance_logs INSERT/UPDATE를 로컬 SQLite(WAL)에 먼저 기록하고
+백그라운드 스레드가 PostgreSQL로 동기화 (DB 지연/장애 중에도 브라우저 흐름이 멈추지 않음)
+
+- 기록 생성 시 임시 ID(음수)를 즉시 반환, 동기화 후 실제 attendance_logs.id와 매핑
+- 멱등 키(idempotency_key)로 재시도/다중 프로세스 동기화 시 중복 INSERT 방지
+- 여러 프로세스가 같은 기록을 동기화해도 버전(outbox_version)이 더 새로울 때만 반영 (최신 상태를 이전 상태로 덮어쓰지 않음)
+- 임시 ID로 저장된 heartbeat_status.attendance_log_id는 동기화 시 실제 ID로 교체
+(attendance_logs.idempotency_key / outbox_version 컬럼은 schema_attendance_outbox.sql)
+"""
+
+import os
+import time
+import uuid
+import atexit
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import text
+from db_manager import db_manager
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 아웃박스 설정 (선택)
+ATTENDANCE_OUTBOX_PATH = os.getenv("ATTENDANCE_OUTBOX_PATH", os.path.join("logs", "attendance_outbox.sqlite3"))
+ATTENDANCE_OUTBOX_SYNC_INTERVAL = float(os.getenv("ATTENDANCE_OUTBOX_SYNC_INTERVAL", "1"))      # 초
+ATTENDANCE_OUTBOX_RETRY_INTERVAL = float(os.getenv("ATTENDANCE_OUTBOX_RETRY_INTERVAL", "15"))   # 초 - DB 장애 시 재시도 간격
+ATTENDANCE_OUTBOX_RETENTION_DAYS = int(os.getenv("ATTENDANCE_OUTBOX_RETENTION_DAYS", "7"))     # 동기화 완료 기록 보관 (ID 매핑용)
+
+OUTBOX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS attendance_outbox (
+        local_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idempotency_key TEXT NOT NULL UNIQUE,
+        user_id TEXT NOT NULL,
+        action_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        error_message TEXT,
+        attempt_time TEXT NOT NULL,
+        version INTEGER NOT NULL DEFAULT 1,
+        synced_version INTEGER NOT NULL DEFAULT 0,
+        remote_id INTEGER,
+        sync_attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_outbox_pending ON attendance_outbox(synced_version, version);
+    CREATE INDEX IF NOT EXISTS idx_outbox_user_action ON attendance_outbox(user_id, action_type, attempt_time);
+"""
+
+
+class AttendanceOutbox:
+    """attendance_logs 쓰기용 SQLite 아웃박스 + 백그라운드 동기화"""
+
+    def __init__(self, path=ATTENDANCE_OUTBOX_PATH, sync_interval=ATTENDANCE_OUTBOX_SYNC_INTERVAL,
+                 retry_interval=ATTENDANCE_OUTBOX_RETRY_INTERVAL, retention_days=ATTENDANCE_OUTBOX_RETENTION_DAYS):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.retry_interval = retry_interval
+        self.retention_days = retention_days
+
+        self._remote_ids = {}
+        self._sync_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._pid = None
+        self.enabled = self._init_db()
+
+        # 이전 실행에서 동기화하지 못한 기록이 있으면 바로 동기화 시작
+        if self.enabled and self.pending_count():
+            self._notify()
+
+    # ==================== SQLite ====================
+
+    @contextmanager
+    def _connect(self):
+        """호출마다 새 연결 (스레드/프로세스 간 공유 없음) - 정상 종료 시 커밋, 예외 시 롤백"""
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                # WAL: 여러 프로세스가 동시에 읽고 쓰면서도 쓰기가 읽기를 막지 않음
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(OUTBOX_SCHEMA)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"출석 기록 아웃박스 초기화 실패 - DB 직접 기록으로 동작: {e}")
+            return False
+
+    @staticmethod
+    def provisional_id(local_id):
+        """로컬 ID -> 임시 attendance_log_id (실제 SERIAL ID와 겹치지 않도록 음수)"""
+        return -local_id
+
+    # ==================== 기록 ====================
+
+    def create(self, user_id, action_type):
+        """in_progress 기록을 로컬에 저장하고 임시 ID 즉시 반환"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO attendance_outbox (idempotency_key, user_id, action_type, status, attempt_time)
+                VALUES (?, ?, ?, 'in_progress', ?)
+                """,
+                (uuid.uuid4().hex, user_id, action_type, datetime.now().isoformat())
+            )
+            local_id = cursor.lastrowid
+        self._notify()
+        return self.provisional_id(local_id)
+
+    def update(self, attendance_id, status, error_message=None):
+        """로컬 기록 상태 변경 (동기화 버전 증가) - 해당 기록이 없으면 False"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE attendance_outbox
+                SET status = ?, error_message = ?, version = version + 1
+                WHERE local_id = ?
+                """,
+                (status, error_message, -attendance_id)
+            )
+            updated = cursor.rowcount > 0
+        self._notify()
+        return updated
+
+    def has_local_success(self, user_id, action_type):
+        """아직 동기화되지 않았을 수 있는 오늘자 성공 기록이 로컬에 있는지 확인"""
+        if not self.enabled:
+            return False
+        try:
+            day_start = datetime.combine(datetime.now().date(), datetime.min.time()).isoformat()
+            with self._connect() as conn:
+                row = conn.execute(
+                    """
+                    SELECT 1 FROM attendance_outbox
+                    WHERE user_id = ? AND action_type = ?
+                    AND status IN ('success', 'already_done')
+                    AND attempt_time >= ?
+                    LIMIT 1
+                    """,
+                    (user_id, action_type, day_start)
+                ).fetchone()
+            return row is not None
+        except sqlite3.Error as e:
+            logger.warning(f"아웃박스 성공 기록 확인 실패: {e}")
+            return False
+
+    def resolve(self, attendance_id):
+        """임시 ID를 실제 attendance_logs.id로 변환 (미동기화 시 임시 ID 그대로)"""
+        if attendance_id is None or attendance_id >= 0 or not self.enabled:
+            return attendance_id
+        if attendance_id in self._remote_ids:
+            return self._remote_ids[attendance_id]
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT remote_id FROM attendance_outbox WHERE local_id = ?", (-attendance_id,)
+                ).fetchone()
+        except sqlite3.Error:
+            return attendance_id
+        if row and row["remote_id"]:
+            self._remote_ids[attendance_id] = row["remote_id"]
+            return row["remote_id"]
+        return attendance_id
+
+    # ==================== 동기화 ====================
+
+    def _notify(self):
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def _ensure_worker(self):
+        """동기화 스레드 시작 (fork된 자식 프로세스에서는 새로 시작)"""
+        if self._running and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, daemon=True, name="AttendanceOutboxSync")
+        self._thread.start()
+
+    def _worker(self):
+        while self._running:
+            self._wakeup.wait(self.sync_interval)
+            self._wakeup.clear()
+            if not self._running:
+                break
+            if not self.sync():
+                # DB 장애 - 재시도 간격만큼 대기 (그 사이 새 기록은 로컬에만 저장)
+                deadline = time.monotonic() + self.retry_interval
+                while self._running and time.monotonic() < deadline:
+                    self._wakeup.wait(deadline - time.monotonic())
+                    self._wakeup.clear()
+
+    def sync(self, limit=100):
+        """미동기화 기록을 PostgreSQL에 반영 - DB 오류로 중단되면 False"""
+        if not self.enabled:
+            return True
+
+        with self._sync_lock:
+            try:
+                with self._connect() as conn:
+                    pending = conn.execute(
+                        """
+                        SELECT * FROM attendance_outbox
+                        WHERE synced_version < version
+                        ORDER BY local_id
+                        LIMIT ?
+                        """,
+                        (limit,)
+                    ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"아웃박스 조회 실패: {e}")
+                return False
+
+            for record in pending:
+                # 다른 프로세스가 그사이 동기화했거나 더 새 버전으로 바뀌었을 수 있으므로 반영 직전에 다시 조회
+                try:
+                    with self._connect() as conn:
+                        record = conn.execute(
+                            "SELECT * FROM attendance_outbox WHERE local_id = ? AND synced_version < version",
+                            (record["local_id"],)
+                        ).fetchone()
+                except sqlite3.Error as e:
+                    logger.error(f"아웃박스 조회 실패: {e}")
+                    return False
+                if record is None:
+                    continue
+
+                try:
+                    remote_id = self._push(record)
+                except Exception as e:
+                    self._record_failure(record, e)
+                    logger.warning(f"[{record['user_id']}] 출석 기록 동기화 실패 (로컬 보관, 재시도 예정): {e}")
+                    return False
+
+                self._remote_ids[self.provisional_id(record["local_id"])] = remote_id
+                try:
+                    with self._connect() as conn:
+                        conn.execute(
+                            # 다른 프로세스가 더 높은 버전을 먼저 기록했으면 되돌리지 않음
+                            """
+                            UPDATE attendance_outbox
+                            SET remote_id = COALESCE(remote_id, ?), synced_version = MAX(synced_version, ?), last_error = NULL
+                            WHERE local_id = ?
+                            """,
+                            (remote_id, record["version"], record["local_id"])
+                        )
+                except sqlite3.Error as e:
+                    # 다음 주기에 같은 멱등 키로 다시 반영 (중복 생성 없음)
+                    logger.warning(f"아웃박스 동기화 상태 저장 실패: {e}")
+
+            if pending:
+                logger.debug(f"출석 기록 {len(pending)}건 동기화 완료")
+            self._cleanup()
+            return True
+
+    def _push(self, record):
+        """기록 하나를 PostgreSQL에 반영하고 실제 ID 반환"""
+        provisional_id = self.provisional_id(record["local_id"])
+        session = db_manager.get_session()
+        try:
+            if record["remote_id"] is None:
+                # 멱등 키 충돌 시 기존 행 갱신 - 커밋 후 응답을 못 받고 재시도해도 행은 하나
+                # 더 새 버전이 이미 반영되어 있으면 갱신하지 않음 (RETURNING 없음 -> 멱등 키로 ID 조회)
+                result = session.execute(
+                    text("""
+                        INSERT INTO attendance_logs
+                        (user_id, action_type, status, error_message, attempt_time, created_at, idempotency_key, outbox_version)
+                        VALUES (:user_id, :action_type, :status, :error_message, :attempt_time, :attempt_time, :idempotency_key, :version)
+                        ON CONFLICT (idempotency_key) DO UPDATE SET
+                            status = EXCLUDED.status,
+                            error_message = EXCLUDED.error_message,
+                            outbox_version = EXCLUDED.outbox_version
+                        WHERE attendance_logs.outbox_version IS NULL OR attendance_logs.outbox_version < EXCLUDED.outbox_version
+                        RETURNING id
+                    """),
+                    {
+                        "user_id": record["user_id"],
+                        "action_type": record["action_type"],
+                        "status": record["status"],
+                        "error_message": record["error_message"],
+                        "attempt_time": datetime.fromisoformat(record["attempt_time"]),
+                        "idempotency_key": record["idempotency_key"],
+                        "version": record["version"]
+                    }
+                )
+                row = result.fetchone()
+                if row is None:
+                    row = session.execute(
+                        text("SELECT id FROM attendance_logs WHERE idempotency_key = :idempotency_key"),
+                        {"idempotency_key": record["idempotency_key"]}
+                    ).fetchone()
+                remote_id = row[0]
+            else:
+                remote_id = record["remote_id"]
+                session.execute(
+                    text("""
+                        UPDATE attendance_logs
+                        SET status = :status, error_message = :error_message, outbox_version = :version
+                        WHERE id = :attendance_id
+                        AND (outbox_version IS NULL OR outbox_version < :version)
+                    """),
+                    {"attendance_id": remote_id, "status": record["status"], "error_message": record["error_message"],
+                     "version": record["version"]}
+                )
+
+            # 임시 ID로 저장된 하트비트를 실제 ID로 교체
+            session.execute(
+                text("UPDATE heartbeat_status SET attendance_log_id = :remote_id WHERE attendance_log_id = :provisional_id"),
+                {"remote_id": remote_id, "provisional_id": provisional_id}
+            )
+            session.commit()
+            return remote_id
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _record_failure(self, record, error):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE attendance_outbox SET sync_attempts = sync_attempts + 1, last_error = ? WHERE local_id = ?",
+                    (str(error)[:500], record["local_id"])
+                )
+        except sqlite3.Error:
+            pass
+
+    def _cleanup(self):
+        """보관 기간이 지난 동기화 완료 기록 삭제"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "DELETE FROM attendance_outbox WHERE synced_version = version AND attempt_time < ?", (cutoff,)
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"아웃박스 정리 실패: {e}")
+
+    def pending_count(self):
+        """미동기화 기록 수"""
+        if not self.enabled:
+            return 0
+        try:
+            with self._connect() as conn:
+                return conn.execute("SELECT COUNT(*) FROM attendance_outbox WHERE synced_version < version").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def close(self):
+        """동기화 스레드 종료 후 남은 기록 한 번 더 동기화 (프로세스 종료 시 호출)"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        if self.enabled and self._pid == os.getpid():
+            self.sync()
+            remaining = self.pending_count()
+            if remaining:
+                logger.warning(f"미동기화 출석 기록 {remaining}건 로컬 보관 - 다음 실행 시 동기화 ({self.path})")
+
+
+# 전역 아웃박스 인스턴스
+attendance_outbox = AttendanceOutbox()
+
+# 프로그램 종료 시 남은 기록 동기화
+atexit.register(attendance_outbox.close)
@@ -1,12 +1,21 @@
 import os
 import sys
+import json
 import time
-import random
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 from db_manager import db_manager
+from heartbeat_buffer import heartbeat_buffer
+from browser_pool import BrowserPool
+from session_cache import session_cache
+from jitter_scheduler import JitterScheduler
+from punch_verifier import PunchResponseWatcher, PunchVerdict
+from request_blocker import RequestBlocker
+from timeout_advisor import timeout_advisor
+from attendance_outbox import attendance_outbox
 
 # .env 파일 로드
 load_dotenv()
@@ -33,43 +42,22 @@ logger = setup_logging()
 
 # 하트비트 함수
 def update_heartbeat(stage="unknown", user_id=None, action=None, attendance_log_id=None):
-    """하트비트 업데이트 - heartbeat_status 테이블에 저장"""
+    """하트비트 업데이트 - 버퍼에 적재 후 heartbeat_status 테이블에 일괄 저장"""
     try:
-        # heartbeat_status 테이블에 저장
-        session = db_manager.get_session()
-        try:
-            from sqlalchemy import text
-            from datetime import datetime
-            import os
-
-            session.execute(
-                text("""
-                    INSERT INTO heartbeat_status
-                    (stage, user_id, action_type, pid, timestamp, attendance_log_id)
-                    VALUES (:stage, :user_id, :action_type, :pid, :timestamp, :attendance_log_id)
-                """),
-                {
-                    "stage": stage,
-                    "user_id": user_id,
-                    "action_type": action,
-                    "pid": os.getpid(),
-                    "timestamp": datetime.now(),
-                    "attendance_log_id": attendance_log_id
-                }
-            )
-            session.commit()
-
-            # 상세 로그
-            if user_id and action:
-                logger.debug(f"💓 HEARTBEAT: [{user_id}] [{action}] {stage}")
-            else:
-                logger.debug(f"💓 HEARTBEAT: {stage}")
-
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+        heartbeat_buffer.add({
+            "stage": stage,
+            "user_id": user_id,
+            "action_type": action,
+            "pid": os.getpid(),
+            "timestamp": datetime.now(),
+            "attendance_log_id": attendance_log_id
+        })
+
+        # 상세 로그
+        if user_id and action:
+            logger.debug(f"💓 HEARTBEAT: [{user_id}] [{action}] {stage}")
+        else:
+            logger.debug(f"💓 HEARTBEAT: {stage}")
 
     except Exception as e:
         logger.warning(f"하트비트 업데이트 실패: {e}")
@@ -84,7 +72,16 @@ def get_users():
         return []
 
 def create_attendance_record(user_id, action_type):
-    """출석 기록을 사전에 생성하고 ID 반환"""
+    """
+    출석 기록을 사전에 생성하고 ID 반환
+    아웃박스 사용 시 로컬에 저장 후 임시 ID(음수)를 즉시 반환하고 DB 반영은 백그라운드에서 처리
+    """
+    if attendance_outbox.enabled:
+        try:
+            return attendance_outbox.create(user_id, action_type)
+        except Exception as e:
+            logger.warning(f"아웃박스 기록 생성 실패 - DB 직접 기록: {e}")
+
     try:
         session = db_manager.get_session()
         try:
@@ -115,7 +112,16 @@ def create_attendance_record(user_id, action_type):
         return None
 
 def update_attendance_record(attendance_id, status, error_message=None):
-    """출석 기록 상태 업데이트"""
+    """출석 기록 상태 업데이트 (임시 ID면 아웃박스에 기록 후 백그라운드 동기화)"""
+    if attendance_id is not None and attendance_id < 0:
+        try:
+            if attendance_outbox.update(attendance_id, status, error_message):
+                return
+            logger.error(f"아웃박스에 출석 기록 없음: {attendance_id}")
+        except Exception as e:
+            logger.error(f"아웃박스 기록 업데이트 실패: {e}")
+        return
+
     try:
         session = db_manager.get_session()
         try:
@@ -191,61 +197,202 @@ NAVIGATION_TIMEOUT = int(NAVIGATION_TIMEOUT_STR)
 PAGE_LOAD_TIMEOUT = int(PAGE_LOAD_TIMEOUT_STR)
 POPUP_CHECK_TIMEOUT = int(POPUP_CHECK_TIMEOUT_STR)
 
-def check_password_error_popup(page, user_id, timeout_ms=10000):
+# 브라우저 풀 설정 (선택)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "1"))
+BROWSER_POOL_MAX_CONTEXTS = int(os.getenv("BROWSER_POOL_MAX_CONTEXTS", "20"))
+BROWSER_POOL_MAX_RSS_MB = int(os.getenv("BROWSER_POOL_MAX_RSS_MB", "1024"))
+
+# 조건 대기 상한 설정 (선택, 밀리초) - 조건이 충족되면 상한까지 기다리지 않고 바로 진행
+LOGIN_RESULT_TIMEOUT = int(os.getenv("LOGIN_RESULT_TIMEOUT", "10000"))    # 로그인 제출 후 메인 이동 또는 오류 팝업
+PAGE_READY_TIMEOUT = int(os.getenv("PAGE_READY_TIMEOUT", "10000"))        # 출퇴근 영역/버튼 렌더링
+PUNCH_RESULT_TIMEOUT = int(os.getenv("PUNCH_RESULT_TIMEOUT", "15000"))    # 버튼 클릭 후 알림 팝업 또는 완료 표시
+NETWORK_IDLE_TIMEOUT = int(os.getenv("NETWORK_IDLE_TIMEOUT", "3000"))     # 네트워크 안정화
+
+# 크롤링 엔진 설정 (선택) - sequential: 한 명씩 순차 처리, async: 최대 CRAWL_CONCURRENCY명 동시 처리
+CRAWL_ENGINE = os.getenv("CRAWL_ENGINE", "sequential")
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+
+# 브라우저 실행 옵션
+BROWSER_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+    '--disable-web-security',
+    '--ignore-certificate-errors-spki-list',
+    '--ignore-certificate-errors',
+    '--ignore-ssl-errors',
+    '--proxy-bypass-list=<-loopback>',
+    '--disable-features=VizDisplayCompositor',
+    '--lang=ko-KR',
+    '--font-render-hinting=none',
+    '--disable-font-subpixel-positioning'
+]
+
+# 브라우저 컨텍스트 옵션
+BROWSER_CONTEXT_OPTIONS = {
+    "viewport": {'width': 1920, 'height': 1080},
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    "locale": 'ko-KR',
+    "timezone_id": 'Asia/Seoul',
+    "proxy": PROXY_CONFIG
+}
+
+def create_browser_pool(size=None):
+    """출퇴근 처리 구간 동안 사용할 브라우저 풀 생성"""
+    return BrowserPool(
+        size=size or BROWSER_POOL_SIZE,
+        max_contexts_per_browser=BROWSER_POOL_MAX_CONTEXTS,
+        max_rss_mb=BROWSER_POOL_MAX_RSS_MB,
+        launch_args=BROWSER_LAUNCH_ARGS
+    )
+
+@contextmanager
+def open_browser_context(user_id, action_name, heartbeat, browser_pool=None, storage_state=None):
+    """사용자별 브라우저 컨텍스트 생성 - 풀이 있으면 풀에서 대여, 없으면 단독 실행"""
+    context_options = dict(BROWSER_CONTEXT_OPTIONS)
+    if storage_state:
+        context_options["storage_state"] = storage_state
+
+    if browser_pool:
+        heartbeat("playwright_init")
+        logger.info(f"[{user_id}] [{action_name}] 브라우저 풀에서 컨텍스트 생성 시작...")
+        with browser_pool.context(**context_options) as context:
+            heartbeat("browser_started")
+            logger.info(f"[{user_id}] [{action_name}] 브라우저 컨텍스트 생성 완료 (풀)")
+            heartbeat("context_created")
+            yield context
+        return
+
+    with sync_playwright() as p:
+        logger.info(f"[{user_id}] [{action_name}] Playwright 초기화 완료")
+
+        # Playwright 초기화 하트비트
+        heartbeat("playwright_init")
+
+        logger.info(f"[{user_id}] [{action_name}] 브라우저 실행 시작...")
+        browser = p.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+        logger.info(f"[{user_id}] [{action_name}] 브라우저 실행 완료")
+
+        # 브라우저 실행 완료 하트비트
+        heartbeat("browser_started")
+
+        try:
+            logger.info(f"[{user_id}] [{action_name}] 브라우저 컨텍스트 생성 시작...")
+            context = browser.new_context(**context_options)
+            logger.info(f"[{user_id}] [{action_name}] 브라우저 컨텍스트 생성 완료")
+
+            # 컨텍스트 생성 완료 하트비트
+            heartbeat("context_created")
+
+            try:
+                yield context
+            finally:
+                try:
+                    context.close()
+                except:
+                    pass
+        finally:
+            try:
+                browser.close()
+            except:
+                pass
+
+class WaitTimer:
+    """조건 대기 구간별 실제 소요 시간 기록"""
+
+    def __init__(self, user_id, action_name):
+        self.user_id = user_id
+        self.action_name = action_name
+        self.records = []
+
+    def wait(self, label, wait_fn):
+        """조건 대기 실행 - 충족 시 wait_fn 결과(없으면 True), 타임아웃/실패 시 None 반환"""
+        start = time.time()
+        try:
+            result = wait_fn()
+            met = True
+        except Exception as e:
+            result = None
+            met = False
+            logger.debug(f"[{self.user_id}] [{self.action_name}] 대기 '{label}' 미충족: {e}")
+
+        elapsed = time.time() - start
+        self.records.append((label, elapsed, met))
+        logger.info(f"[{self.user_id}] [{self.action_name}] 대기 '{label}': {elapsed:.2f}s ({'충족' if met else '타임아웃'})")
+
+        if not met:
+            return None
+        return True if result is None else result
+
+    def summary(self):
+        """전체 대기 요약 문자열"""
+        total = sum(elapsed for _, elapsed, _ in self.records)
+        slowest = max(self.records, key=lambda record: record[1], default=None)
+        text = f"대기 {len(self.records)}회, 합계 {total:.2f}s"
+        if slowest:
+            text += f", 최장 '{slowest[0]}' {slowest[1]:.2f}s"
+        return text
+
+# 비밀번호 오류 팝업 판정 스크립트 - 감지 시 { detected, message, selector } 반환
+PASSWORD_ERROR_JS = """() => {
+    // 비밀번호 오류 팝업 선택자
+    const errorSelectors = [
+        '.system_alert_box.alert_guide',
+        '.alert_guide',
+        '[class*="alert"]'
+    ];
+
+    for (const selector of errorSelectors) {
+        const alertBox = document.querySelector(selector);
+        if (!alertBox) continue;
+
+        // 팝업이 보이는지 확인
+        const isVisible = window.getComputedStyle(alertBox).display !== 'none' &&
+                         window.getComputedStyle(alertBox).visibility !== 'hidden';
+
+        if (!isVisible) continue;
+
+        // 텍스트 내용 확인
+        const textContent = alertBox.textContent || alertBox.innerText || '';
+
+        // 비밀번호 오류 관련 키워드 검사
+        const errorKeywords = [
+            '로그인 정보가 일치하지 않습니다',  // 일반 로그인 실패
+            '로그인 정보',
+            '일치하지 않습니다',
+            '비밀번호 입력 오류',
+            '비밀번호 오류',
+            '입력오류',
+            '로그인이 자동 차단',
+            '비밀번호가 일치하지 않습니다',
+            '비밀번호를 확인해주세요',
+            '로그인 실패',
+            '인증 실패'
+        ];
+
+        for (const keyword of errorKeywords) {
+            if (textContent.includes(keyword)) {
+                return {
+                    detected: true,
+                    message: textContent.trim(),
+                    selector: selector
+                };
+            }
+        }
+    }
+
+    return { detected: false };
+}"""
+
+def check_password_error_popup(page, user_id, timeout_ms=10000, state=None):
     """비밀번호 오류 팝업 검사 (프록시 환경 고려)"""
     try:
         logger.info(f"[{user_id}] 비밀번호 오류 팝업 검사 시작 (타임아웃: {timeout_ms}ms, 프록시 환경)...")
 
-        # 비밀번호 오류 팝업 검사 (기본 5초, 조정 가능)
-        password_error_detected = page.evaluate("""() => {
-            // 비밀번호 오류 팝업 선택자
-            const errorSelectors = [
-                '.system_alert_box.alert_guide',
-                '.alert_guide',
-                '[class*="alert"]'
-            ];
-
-            for (const selector of errorSelectors) {
-                const alertBox = document.querySelector(selector);
-                if (!alertBox) continue;
-
-                // 팝업이 보이는지 확인
-                const isVisible = window.getComputedStyle(alertBox).display !== 'none' &&
-                                 window.getComputedStyle(alertBox).visibility !== 'hidden';
-
-                if (!isVisible) continue;
-
-                // 텍스트 내용 확인
-                const textContent = alertBox.textContent || alertBox.innerText || '';
-
-                // 비밀번호 오류 관련 키워드 검사
-                const errorKeywords = [
-                    '로그인 정보가 일치하지 않습니다',  // 일반 로그인 실패
-                    '로그인 정보',
-                    '일치하지 않습니다',
-                    '비밀번호 입력 오류',
-                    '비밀번호 오류',
-                    '입력오류',
-                    '로그인이 자동 차단',
-                    '비밀번호가 일치하지 않습니다',
-                    '비밀번호를 확인해주세요',
-                    '로그인 실패',
-                    '인증 실패'
-                ];
-
-                for (const keyword of errorKeywords) {
-                    if (textContent.includes(keyword)) {
-                        return {
-                            detected: true,
-                            message: textContent.trim(),
-                            selector: selector
-                        };
-                    }
-                }
-            }
-
-            return { detected: false };
-        }""")
+        # 상태 스냅샷의 로그인 오류 항목으로 판정
+        state = state or probe_page_state(page)
+        password_error_detected = state["loginError"]
 
         if password_error_detected.get('detected'):
             error_message = password_error_detected.get('message', '비밀번호 오류')
@@ -259,13 +406,23 @@ def check_password_error_popup(page, user_id, timeout_ms=10000):
         logger.warning(f"[{user_id}] 비밀번호 오류 팝업 검사 실패: {e}")
         return False, None
 
-def close_all_popups(page, user_id, action_name):
-    """모든 팝업을 강제로 닫는 함수"""
+def close_all_popups(page, user_id, action_name, state=None):
+    """모든 팝업을 강제로 닫는 함수 - 상태 스냅샷에 열린 팝업이 없으면 생략"""
     try:
         logger.info(f"[{user_id}] [{action_name}] 팝업 처리 시작")
-        
-        # 1. 모든 팝업 대화상자를 강제로 닫기
-        page.evaluate("""() => {
+
+        if state is None:
+            try:
+                state = probe_page_state(page)
+            except Exception as e:
+                logger.debug(f"[{user_id}] [{action_name}] 상태 프로브 실패 (팝업 처리 계속): {e}")
+
+        if state and not state["popups"] and not state["overlays"] and not state["closeButtons"]:
+            logger.info(f"[{user_id}] [{action_name}] 열린 팝업 없음 - 팝업 처리 생략")
+            return
+
+        # 1. 모든 팝업 대화상자를 강제로 닫고, 여전히 보이는 닫기 버튼 목록을 함께 반환
+        remaining_close_buttons = page.evaluate("""(config) => {
             // jQuery UI 다이얼로그 모두 닫기
             if (window.$ && $.ui && $.ui.dialog) {
                 $('.ui-dialog').each(function() {
@@ -276,20 +433,9 @@ def close_all_popups(page, user_id, action_name):
                     }
                 });
             }
-            
+
             // 일반 팝업 레이어들 숨기기
-            const popupSelectors = [
-                '.popnoti_lyr',
-                '.ui-dialog',
-                '.popup',
-                '.modal',
-                '.layer-popup',
-                '[class*="popup"]',
-                '[class*="modal"]',
-                '[class*="dialog"]'
-            ];
-            
-            popupSelectors.forEach(selector => {
+            config.popupSelectors.forEach(selector => {
                 const elements = document.querySelectorAll(selector);
                 elements.forEach(el => {
                     if (el.style.display !== 'none') {
@@ -299,92 +445,98 @@ def close_all_popups(page, user_id, action_name):
                     }
                 });
             });
-            
+
             // 오버레이 제거
-            const overlays = document.querySelectorAll('.ui-widget-overlay, .modal-backdrop, [class*="overlay"]');
+            const overlays = document.querySelectorAll(config.overlaySelector);
             overlays.forEach(overlay => overlay.remove());
-        }""")
-        
-        # 2. 닫기 버튼이 있다면 클릭 시도
-        close_button_selectors = [
-            ".ui-dialog-titlebar-close",
-            ".btn-close",
-            ".close",
-            "[aria-label='Close']",
-            "[data-dismiss='modal']"
-        ]
-        
-        for selector in close_button_selectors:
+
+            return config.closeButtonSelectors.filter(selector => {
+                const el = document.querySelector(selector);
+                if (!el) return false;
+                const style = window.getComputedStyle(el);
+                return style.display !== 'none' && style.visibility !== 'hidden' && el.getClientRects().length > 0;
+            });
+        }""", {
+            "popupSelectors": POPUP_SELECTORS,
+            "overlaySelector": POPUP_OVERLAY_SELECTOR,
+            "closeButtonSelectors": POPUP_CLOSE_BUTTON_SELECTORS
+        })
+
+        # 2. 아직 보이는 닫기 버튼만 클릭
+        for selector in remaining_close_buttons:
             try:
-                if page.is_visible(selector, timeout=1000):
-                    page.click(selector, timeout=2000)
-                    logger.info(f"[{user_id}] [{action_name}] 닫기 버튼 클릭: {selector}")
-                    time.sleep(0.5)
+                page.click(selector, timeout=2000)
+                logger.info(f"[{user_id}] [{action_name}] 닫기 버튼 클릭: {selector}")
+                # 닫기 버튼이 사라질 때까지만 대기
+                page.wait_for_selector(selector, state="hidden", timeout=1000)
             except:
                 continue
-        
+
         # 3. ESC 키로 팝업 닫기 시도
         try:
             page.keyboard.press("Escape")
-            time.sleep(0.5)
         except:
             pass
-            
+
         logger.info(f"[{user_id}] [{action_name}] 팝업 처리 완료")
-        
+
     except Exception as e:
         logger.warning(f"[{user_id}] [{action_name}] 팝업 처리 중 오류: {e}")
 
-def check_punch_in_completed(page, user_id, action_name, attendance_log_id=None):
-    """출근 완료 상태 확인 함수 - 출근 영역에서만 정확히 확인"""
-    try:
-        update_heartbeat("checking_punch_in_status", user_id, action_name, attendance_log_id)
-        logger.info(f"[{user_id}] [{action_name}] 출근 완료 상태 확인 중...")
-
-        # JavaScript로 출근 완료 상태 확인 - 출근 영역(#ptlAttendRegist_punch_in)에서만 확인
-        completion_status = page.evaluate("""() => {
-            // 1. 출근 영역의 complete 클래스 확인 (가장 확실한 방법)
-            const punchInTd = document.querySelector('#ptlAttendRegist_punch_in');
-            if (punchInTd && punchInTd.classList.contains('complete')) {
-                return '출근완료';
+# 출근 완료 판정 스크립트 - 출근 영역(#ptlAttendRegist_punch_in)에서만 확인, 완료 시 상태 문자열 반환
+PUNCH_IN_COMPLETED_JS = """() => {
+    // 1. 출근 영역의 complete 클래스 확인 (가장 확실한 방법)
+    const punchInTd = document.querySelector('#ptlAttendRegist_punch_in');
+    if (punchInTd && punchInTd.classList.contains('complete')) {
+        return '출근완료';
+    }
+
+    // 2. 출근 영역 내의 div_punch에서 '출근완료' 텍스트 확인
+    const punchInDivPunch = document.querySelector('#ptlAttendRegist_punch_in .div_punch');
+    if (punchInDivPunch) {
+        const text = punchInDivPunch.textContent.trim();
+        if (text.includes('출근완료') || text.includes('출근 완료')) {
+            return text;
+        }
+    }
+
+    // 3. time2 영역에서 출근 시간과 완료 텍스트 확인
+    const time2Box = document.querySelector('#ptlAttendRegist_time2');
+    if (time2Box) {
+        const divPunch = time2Box.querySelector('.div_punch');
+        if (divPunch) {
+            const text = divPunch.textContent.trim();
+            if (text.includes('출근완료') || text.includes('출근 완료')) {
+                return text;
             }
-
-            // 2. 출근 영역 내의 div_punch에서 '출근완료' 텍스트 확인
-            const punchInDivPunch = document.querySelector('#ptlAttendRegist_punch_in .div_punch');
-            if (punchInDivPunch) {
-                const text = punchInDivPunch.textContent.trim();
-                if (text.includes('출근완료') || text.includes('출근 완료')) {
-                    return text;
+        }
+        // 출근 시간이 표시되어 있는지 확인
+        const attnTime = document.querySelector('#ptlAttendRegist_attn_time');
+        if (attnTime) {
+            const timeText = attnTime.textContent.trim();
+            // 실제 시간이 표시되어 있으면 (HH:MM 형식)
+            if (timeText && /^[0-9]{2}:[0-9]{2}$/.test(timeText)) {
+                // 출근 버튼이 비활성화되어 있는지 확인
+                const attnBtn = document.querySelector('#ptlAttendRegist_btn_attn');
+                if (attnBtn && attnBtn.disabled) {
+                    return '출근완료 (시간표시: ' + timeText + ')';
                 }
             }
+        }
+    }
 
-            // 3. time2 영역에서 출근 시간과 완료 텍스트 확인
-            const time2Box = document.querySelector('#ptlAttendRegist_time2');
-            if (time2Box) {
-                const divPunch = time2Box.querySelector('.div_punch');
-                if (divPunch) {
-                    const text = divPunch.textContent.trim();
-                    if (text.includes('출근완료') || text.includes('출근 완료')) {
-                        return text;
-                    }
-                }
-                // 출근 시간이 표시되어 있는지 확인
-                const attnTime = document.querySelector('#ptlAttendRegist_attn_time');
-                if (attnTime) {
-                    const timeText = attnTime.textContent.trim();
-                    // 실제 시간이 표시되어 있으면 (HH:MM 형식)
-                    if (timeText && /^[0-9]{2}:[0-9]{2}$/.test(timeText)) {
-                        // 출근 버튼이 비활성화되어 있는지 확인
-                        const attnBtn = document.querySelector('#ptlAttendRegist_btn_attn');
-                        if (attnBtn && attnBtn.disabled) {
-                            return '출근완료 (시간표시: ' + timeText + ')';
-                        }
-                    }
-                }
-            }
+    return null;
+}"""
 
-            return null;
-        }""")
+def check_punch_in_completed(page, user_id, action_name, attendance_log_id=None, state=None):
+    """출근 완료 상태 확인 함수 - 출근 영역에서만 정확히 확인"""
+    try:
+        update_heartbeat("checking_punch_in_status", user_id, action_name, attendance_log_id)
+        logger.info(f"[{user_id}] [{action_name}] 출근 완료 상태 확인 중...")
+
+        # 상태 스냅샷으로 출근 완료 확인 - 출근 영역(#ptlAttendRegist_punch_in)에서만 확인
+        state = state or probe_page_state(page)
+        completion_status = state["punchIn"]
 
         if completion_status:
             logger.info(f"[{user_id}] [{action_name}] ✅ 출근이 이미 완료되어 있습니다! (상태: {completion_status})")
@@ -400,54 +552,58 @@ def check_punch_in_completed(page, user_id, action_name, attendance_log_id=None)
         update_heartbeat("punch_in_status_check_failed", user_id, action_name, attendance_log_id)
         return False
 
-def check_punch_out_completed(page, user_id, action_name, attendance_log_id=None):
+# 퇴근 완료 판정 스크립트 - 퇴근 영역(#ptlAttendRegist_punch_out)에서만 확인, 완료 시 상태 문자열 반환
+PUNCH_OUT_COMPLETED_JS = """() => {
+    // 1. 퇴근 영역의 complete 클래스 확인 (가장 확실한 방법)
+    const punchOutTd = document.querySelector('#ptlAttendRegist_punch_out');
+    if (punchOutTd && punchOutTd.classList.contains('complete')) {
+        return '퇴근완료';
+    }
+
+    // 2. 퇴근 영역 내의 div_punch에서 '퇴근완료' 텍스트 확인
+    const punchOutDivPunch = document.querySelector('#ptlAttendRegist_punch_out .div_punch');
+    if (punchOutDivPunch) {
+        const text = punchOutDivPunch.textContent.trim();
+        if (text.includes('퇴근완료') || text.includes('퇴근 완료')) {
+            return text;
+        }
+    }
+
+    // 3. 퇴근 시간이 표시되어 있으면 완료로 판단 (버튼 상태 무관)
+    //    실제 DOM: <span id="ptlAttendRegist_lvof_time">18:01</span>
+    //    퇴근 완료 시 시간이 표시되지만 complete 클래스나 버튼 disabled는 적용되지 않음
+    const lvofTime = document.querySelector('#ptlAttendRegist_lvof_time');
+    if (lvofTime) {
+        const timeText = lvofTime.textContent.trim();
+        if (timeText && timeText !== '--:--:--' && timeText !== '--:--' && /^[0-9]{1,2}:[0-9]{2}/.test(timeText)) {
+            return '퇴근완료 (시간표시: ' + timeText + ')';
+        }
+    }
+
+    // 4. time4 영역에서 퇴근 시간 확인
+    const time4Box = document.querySelector('#ptlAttendRegist_time4');
+    if (time4Box) {
+        const punchDiv = time4Box.querySelector('.div_punch');
+        if (punchDiv) {
+            const text = punchDiv.textContent.trim();
+            if (text.includes('퇴근완료') || text.includes('퇴근 완료')) {
+                return text;
+            }
+        }
+    }
+
+    return null;
+}"""
+
+def check_punch_out_completed(page, user_id, action_name, attendance_log_id=None, state=None):
     """퇴근 완료 상태 확인 함수 - 퇴근 영역에서만 정확히 확인"""
     try:
         update_heartbeat("checking_punch_out_status", user_id, action_name, attendance_log_id)
         logger.info(f"[{user_id}] [{action_name}] 퇴근 완료 상태 확인 중...")
 
-        # JavaScript로 퇴근 완료 상태 확인 - 퇴근 영역(#ptlAttendRegist_punch_out)에서만 확인
-        completion_status = page.evaluate("""() => {
-            // 1. 퇴근 영역의 complete 클래스 확인 (가장 확실한 방법)
-            const punchOutTd = document.querySelector('#ptlAttendRegist_punch_out');
-            if (punchOutTd && punchOutTd.classList.contains('complete')) {
-                return '퇴근완료';
-            }
-
-            // 2. 퇴근 영역 내의 div_punch에서 '퇴근완료' 텍스트 확인
-            const punchOutDivPunch = document.querySelector('#ptlAttendRegist_punch_out .div_punch');
-            if (punchOutDivPunch) {
-                const text = punchOutDivPunch.textContent.trim();
-                if (text.includes('퇴근완료') || text.includes('퇴근 완료')) {
-                    return text;
-                }
-            }
-
-            // 3. 퇴근 시간이 표시되어 있으면 완료로 판단 (버튼 상태 무관)
-            //    실제 DOM: <span id="ptlAttendRegist_lvof_time">18:01</span>
-            //    퇴근 완료 시 시간이 표시되지만 complete 클래스나 버튼 disabled는 적용되지 않음
-            const lvofTime = document.querySelector('#ptlAttendRegist_lvof_time');
-            if (lvofTime) {
-                const timeText = lvofTime.textContent.trim();
-                if (timeText && timeText !== '--:--:--' && timeText !== '--:--' && /^[0-9]{1,2}:[0-9]{2}/.test(timeText)) {
-                    return '퇴근완료 (시간표시: ' + timeText + ')';
-                }
-            }
-
-            // 4. time4 영역에서 퇴근 시간 확인
-            const time4Box = document.querySelector('#ptlAttendRegist_time4');
-            if (time4Box) {
-                const punchDiv = time4Box.querySelector('.div_punch');
-                if (punchDiv) {
-                    const text = punchDiv.textContent.trim();
-                    if (text.includes('퇴근완료') || text.includes('퇴근 완료')) {
-                        return text;
-                    }
-                }
-            }
-
-            return null;
-        }""")
+        # 상태 스냅샷으로 퇴근 완료 확인 - 퇴근 영역(#ptlAttendRegist_punch_out)에서만 확인
+        state = state or probe_page_state(page)
+        completion_status = state["punchOut"]
 
         if completion_status:
             logger.info(f"[{user_id}] [{action_name}] ✅ 퇴근이 이미 완료되어 있습니다! (상태: {completion_status})")
@@ -463,8 +619,183 @@ def check_punch_out_completed(page, user_id, action_name, attendance_log_id=None
         update_heartbeat("punch_out_status_check_failed", user_id, action_name, attendance_log_id)
         return False
 
-def wait_and_click_button(page, button_selector, user_id, action_name, max_attempts=5):
+# 상태 프로브 대상 셀렉터
+PROBE_BUTTON_SELECTORS = [PUNCH_IN_BUTTON_ID, *PUNCH_OUT_BUTTON_IDS, POPUP_PUNCH_IN_BUTTON_ID, POPUP_PUNCH_OUT_BUTTON_ID]
+POPUP_SELECTORS = ['.popnoti_lyr', '.ui-dialog', '.popup', '.modal', '.layer-popup',
+                   '[class*="popup"]', '[class*="modal"]', '[class*="dialog"]']
+POPUP_OVERLAY_SELECTOR = '.ui-widget-overlay, .modal-backdrop, [class*="overlay"]'
+POPUP_CLOSE_BUTTON_SELECTORS = [".ui-dialog-titlebar-close", ".btn-close", ".close",
+                                "[aria-label='Close']", "[data-dismiss='modal']"]
+
+# 페이지 상태 프로브 - 컨텍스트에 add_init_script로 한 번 설치하고 evaluate 한 번으로 전체 상태 조회
+STATE_PROBE_SCRIPT = """(() => {
+    const punchInCompleted = """ + PUNCH_IN_COMPLETED_JS + """;
+    const punchOutCompleted = """ + PUNCH_OUT_COMPLETED_JS + """;
+    const passwordError = """ + PASSWORD_ERROR_JS + """;
+    const buttonSelectors = """ + json.dumps(PROBE_BUTTON_SELECTORS) + """;
+    const popupSelectors = """ + json.dumps(POPUP_SELECTORS) + """;
+    const overlaySelector = """ + json.dumps(POPUP_OVERLAY_SELECTOR) + """;
+    const closeButtonSelectors = """ + json.dumps(POPUP_CLOSE_BUTTON_SELECTORS) + """;
+
+    const isVisible = (el) => {
+        if (!el) return false;
+        const style = window.getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden' && el.getClientRects().length > 0;
+    };
+
+    window.__chultaeProbe = () => {
+        const buttons = {};
+        for (const selector of buttonSelectors) {
+            const el = document.querySelector(selector);
+            buttons[selector] = { exists: !!el, visible: isVisible(el), enabled: !!el && !el.disabled };
+        }
+
+        return {
+            url: location.href,
+            loginError: passwordError(),
+            punchIn: punchInCompleted(),
+            punchOut: punchOutCompleted(),
+            buttons: buttons,
+            popups: popupSelectors.filter(s => Array.from(document.querySelectorAll(s)).some(isVisible)),
+            overlays: document.querySelectorAll(overlaySelector).length,
+            closeButtons: closeButtonSelectors.filter(s => isVisible(document.querySelector(s))),
+            alertConfirm: isVisible(document.querySelector('#naon-cmm-alert-confirm'))
+        };
+    };
+})()"""
+
+def probe_page_state(page):
+    """주입된 상태 프로브로 로그인 오류/완료 여부/버튼/팝업 상태를 한 번에 조회"""
+    state = page.evaluate("() => window.__chultaeProbe ? window.__chultaeProbe() : null")
+    if state is None:
+        # init script 설치 전에 열린 문서면 직접 설치 후 재조회
+        page.evaluate(STATE_PROBE_SCRIPT)
+        state = page.evaluate("() => window.__chultaeProbe()")
+    return state
+
+def button_state(state, selector):
+    """스냅샷에서 버튼 상태 조회 (프로브 대상이 아니면 None)"""
+    return (state or {}).get("buttons", {}).get(selector)
+
+def build_punch_result_js(completed_js):
+    """알림 팝업 또는 완료 표시 중 먼저 나타나는 쪽 판정 스크립트 ('alert' / 'completed' / null)"""
+    return f"""() => {{
+        const alertConfirm = document.querySelector('#naon-cmm-alert-confirm');
+        if (alertConfirm && alertConfirm.getClientRects().length > 0 &&
+            window.getComputedStyle(alertConfirm).visibility !== 'hidden') {{
+            return 'alert';
+        }}
+        return ({completed_js})() ? 'completed' : null;
+    }}"""
+
+def verify_punch_result(page, user_id, action_name, attendance_log_id, heartbeat, waits, watcher=None):
+    """버튼 클릭 후 출퇴근 완료 확인 - 등록 응답 판정 우선, 없으면 알림 팝업/완료 표시 대기 후 새로고침 재확인"""
+    if action_name == "punch_in":
+        label, completed_js, check_completed = "출근", PUNCH_IN_COMPLETED_JS, check_punch_in_completed
+    else:
+        label, completed_js, check_completed = "퇴근", PUNCH_OUT_COMPLETED_JS, check_punch_out_completed
+
+    # 1. 등록 XHR 응답으로 즉시 판정 (PUNCH_RESPONSE_URL_PATTERN 설정 시)
+    if watcher and watcher.enabled:
+        try:
+            # 판정 불가(None)는 WaitTimer가 True로 바꾸므로 PunchVerdict일 때만 응답으로 판정
+            verdict = waits.wait(f"{action_name}_response", lambda: watcher.wait(PUNCH_RESULT_TIMEOUT))
+        finally:
+            watcher.stop()
+
+        if isinstance(verdict, PunchVerdict):
+            if verdict.success:
+                logger.info(f"[{user_id}] [{action_name}] ✅ 등록 응답으로 {label} 완료 확인됨 (HTTP {verdict.status}, DOM 검증 생략)")
+                heartbeat(f"{action_name}_response_success")
+
+                # 완료 알림 팝업이 떠 있으면 닫기 (없으면 무시)
+                try:
+                    page.locator("#naon-cmm-alert-confirm").click(timeout=1000)
+                except Exception:
+                    pass
+
+                heartbeat("button_clicked_success")
+                heartbeat("process_complete")
+                return True
+
+            # 서버가 실패를 응답하면 새로고침 없이 현재 화면만 한 번 더 확인
+            logger.error(f"[{user_id}] [{action_name}] 등록 응답 실패: {verdict.detail}")
+            heartbeat(f"{action_name}_response_failed")
+            if check_completed(page, user_id, action_name, attendance_log_id):
+                heartbeat("button_clicked_success")
+                heartbeat("process_complete")
+                return True
+            raise Exception(f"{label} 등록 실패 응답: {verdict.detail}")
+
+    # 2. 응답을 못 잡은 경우 DOM으로 확인
+    logger.info(f"[{user_id}] [{action_name}] {label} 완료 상태 확인 시작 (최대 {PUNCH_RESULT_TIMEOUT}ms)")
+
+    # '{label}했습니다' 알림 팝업 또는 완료 표시 중 먼저 나타나는 쪽까지만 대기
+    result = waits.wait(f"{action_name}_result", lambda: page.wait_for_function(
+        build_punch_result_js(completed_js), timeout=timeout_advisor.budget("button_click_start", PUNCH_RESULT_TIMEOUT)
+    ).json_value())
+
+    # 알림 팝업이 뜨면 서버에서 처리가 완료된 것이므로 성공 확정
+    if result == "alert":
+        try:
+            logger.info(f"[{user_id}] [{action_name}] '{label}했습니다' 알림 팝업 감지, 확인 버튼 클릭 중...")
+            page.locator("#naon-cmm-alert-confirm").click(timeout=5000)
+            logger.info(f"[{user_id}] [{action_name}] ✅ 알림 팝업으로 {label} 완료 확인됨 (DOM 검증 생략)")
+            heartbeat("button_clicked_success")
+            heartbeat("process_complete")
+            return True
+        except Exception as e:
+            logger.info(f"[{user_id}] [{action_name}] 알림 팝업 확인 버튼 클릭 실패 (DOM 검증으로 진행): {e}")
+            result = waits.wait(f"{action_name}_dom_verify", lambda: page.wait_for_function(
+                completed_js, timeout=PAGE_READY_TIMEOUT
+            ))
+            result = "completed" if result else None
+
+    completed = result == "completed" and check_completed(page, user_id, action_name, attendance_log_id)
+    if completed:
+        logger.info(f"[{user_id}] [{action_name}] ✅ 버튼 클릭 후 {label} 완료 확인됨")
+
+    # DOM 검증 실패 시 페이지 새로고침 후 최종 재확인
+    if not completed:
+        logger.info(f"[{user_id}] [{action_name}] DOM 검증 실패 - 페이지 새로고침 후 최종 재확인")
+        heartbeat(f"{action_name}_reload_verify")
+        try:
+            page.reload(timeout=timeout_advisor.budget(f"{action_name}_reload_verify", PAGE_LOAD_TIMEOUT), wait_until="load")
+            waits.wait(f"{action_name}_reload_verify", lambda: page.wait_for_function(
+                completed_js, timeout=PAGE_READY_TIMEOUT
+            ))
+
+            if check_completed(page, user_id, action_name, attendance_log_id):
+                completed = True
+                logger.info(f"[{user_id}] [{action_name}] ✅ 페이지 새로고침 후 {label} 완료 확인됨!")
+        except Exception as reload_e:
+            logger.warning(f"[{user_id}] [{action_name}] 페이지 새로고침 실패: {reload_e}")
+
+    if completed:
+        heartbeat("button_clicked_success")
+        heartbeat("process_complete")
+        return True
+
+    # 최종 실패
+    logger.error(f"[{user_id}] [{action_name}] ❌ 버튼 클릭 후 {label} 완료 확인 실패 (새로고침 후에도 미확인)")
+
+    # 스크린샷 저장
+    os.makedirs("screenshots", exist_ok=True)
+    path = f"screenshots/{action_name}_verify_failed_{user_id}_{int(time.time())}.png"
+    page.screenshot(path=path, full_page=True)
+    logger.error(f"[{user_id}] [{action_name}] 검증 실패 스크린샷 저장: {path}")
+
+    # 페이지 HTML도 저장
+    html_path = f"screenshots/{action_name}_verify_failed_{user_id}_{int(time.time())}.html"
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(page.content())
+    logger.error(f"[{user_id}] [{action_name}] 페이지 HTML 저장: {html_path}")
+
+    raise Exception(f"{label} 버튼 클릭 후 {label} 완료 상태가 확인되지 않음")
+
+def wait_and_click_button(page, button_selector, user_id, action_name, max_attempts=5, waits=None, state=None):
     """버튼 클릭을 재시도하는 함수 - 날짜 선택 팝업 우선 확인"""
+    waits = waits or WaitTimer(user_id, action_name)
 
     # Step 1: 먼저 날짜 선택 팝업 버튼이 있는지 확인
     logger.info(f"[{user_id}] [{action_name}] 1단계: 날짜 선택 팝업 버튼 확인 중...")
@@ -478,8 +809,10 @@ def wait_and_click_button(page, button_selector, user_id, action_name, max_attem
             popup_button = POPUP_PUNCH_OUT_BUTTON_ID
             button_name = "퇴근"
 
-        # 날짜 선택 팝업 버튼이 있는지 확인
-        if page.is_visible(popup_button, timeout=POPUP_CHECK_TIMEOUT):
+        # 날짜 선택 팝업 버튼이 있는지 상태 스냅샷으로 확인
+        state = state or probe_page_state(page)
+        popup_state = button_state(state, popup_button)
+        if popup_state and popup_state["visible"]:
             logger.info(f"[{user_id}] [{action_name}] 날짜 선택 팝업 {button_name} 버튼 발견: {popup_button}")
 
             # 팝업 버튼 클릭 시도
@@ -495,14 +828,13 @@ def wait_and_click_button(page, button_selector, user_id, action_name, max_attem
             if success:
                 logger.info(f"[{user_id}] [{action_name}] 날짜 선택 팝업 {button_name} 버튼 클릭 성공!")
 
-                # 팝업 버튼 클릭 후 잠시 대기 후 기본 출근/퇴근 버튼 클릭 시도
-                time.sleep(2)
                 logger.info(f"[{user_id}] [{action_name}] 팝업 클릭 후 기본 {button_name} 버튼 찾는 중...")
 
-                # 이제 기본 버튼이 나타났는지 확인하고 클릭
+                # 기본 버튼이 보일 때까지 대기 후 클릭
                 for attempt in range(3):
                     try:
-                        if page.is_visible(button_selector, timeout=5000):
+                        if waits.wait("popup_basic_button_visible",
+                                      lambda: page.wait_for_selector(button_selector, state="visible", timeout=5000)):
                             # 기본 버튼 클릭 시도
                             basic_success = page.evaluate(f"""() => {{
                                 const btn = document.querySelector('{button_selector}');
@@ -523,10 +855,8 @@ def wait_and_click_button(page, button_selector, user_id, action_name, max_attem
                                 return True
                         else:
                             logger.info(f"[{user_id}] [{action_name}] 팝업 클릭 후 기본 버튼 대기 중... ({attempt+1}/3)")
-                            time.sleep(1)
                     except Exception as basic_error:
                         logger.warning(f"[{user_id}] [{action_name}] 팝업 후 기본 버튼 클릭 실패 시도 {attempt+1}: {basic_error}")
-                        time.sleep(1)
 
                 logger.warning(f"[{user_id}] [{action_name}] 팝업 클릭 후 기본 버튼을 찾을 수 없음")
                 return False
@@ -534,7 +864,6 @@ def wait_and_click_button(page, button_selector, user_id, action_name, max_attem
                 # 일반 클릭 시도
                 page.click(popup_button, timeout=5000, force=True)
                 logger.info(f"[{user_id}] [{action_name}] 날짜 선택 팝업 {button_name} 버튼 클릭 성공! (Playwright)")
-                time.sleep(2)
                 return True
         else:
             logger.info(f"[{user_id}] [{action_name}] 날짜 선택 팝업 버튼 없음, 기본 버튼으로 진행")
@@ -552,13 +881,13 @@ def wait_and_click_button(page, button_selector, user_id, action_name, max_attem
             # 팝업 재정리
             if attempt > 0:
                 close_all_popups(page, user_id, action_name)
-                time.sleep(1)
 
             # 버튼이 존재하는지 확인
             page.wait_for_selector(button_selector, timeout=DEFAULT_TIMEOUT, state="attached")
 
-            # 버튼이 보이는지 확인
-            if not page.is_visible(button_selector, timeout=15000):
+            # 버튼이 보일 때까지 대기
+            if not waits.wait("basic_button_visible",
+                              lambda: page.wait_for_selector(button_selector, state="visible", timeout=15000)):
                 logger.warning(f"[{user_id}] [{action_name}] 기본 버튼이 보이지 않음: {button_selector}")
                 continue
 
@@ -566,10 +895,9 @@ def wait_and_click_button(page, button_selector, user_id, action_name, max_attem
             page.evaluate(f"""() => {{
                 const btn = document.querySelector('{button_selector}');
                 if (btn) {{
-                    btn.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
+                    btn.scrollIntoView({{ behavior: 'instant', block: 'center' }});
                 }}
             }}""")
-            time.sleep(1)
 
             # 강제로 클릭 (JavaScript 사용)
             success = page.evaluate(f"""() => {{
@@ -592,501 +920,355 @@ def wait_and_click_button(page, button_selector, user_id, action_name, max_attem
 
         except Exception as e:
             logger.warning(f"[{user_id}] [{action_name}] 기본 버튼 클릭 실패 시도 {attempt + 1}: {e}")
-            if attempt < max_attempts - 1:
-                time.sleep(2)
             continue
 
     return False
 
-def login_and_click_button(user_id, password, button_ids, action_name, attendance_log_id=None):
-    start_time = time.time()
-    logger.info(f"[{user_id}] [{action_name}] 프로세스 시작")
+# 로그인 제출 결과 판정 스크립트 - 메인 페이지 이동 또는 오류 팝업 표시 시 true
+LOGIN_RESULT_JS = """() => {
+    if (location.href.includes('homGwMain')) return true;
+    const alertBox = document.querySelector('.system_alert_box.alert_guide, .alert_guide');
+    if (!alertBox) return false;
+    const style = window.getComputedStyle(alertBox);
+    return style.display !== 'none' && style.visibility !== 'hidden';
+}"""
+
+def perform_login(page, user_id, password, action_name, heartbeat, waits=None):
+    """로그인 페이지에서 아이디/비밀번호 입력 후 메인 페이지 이동까지 처리"""
+    waits = waits or WaitTimer(user_id, action_name)
+    try:
+        # 로그인 시작 하트비트
+        heartbeat("login_start")
 
-    # 로컬 하트비트 함수 (attendance_log_id가 자동으로 포함됨)
-    def heartbeat(stage):
-        update_heartbeat(stage, user_id, action_name, attendance_log_id)
+        # 로그인
+        logger.info(f"[{user_id}] [{action_name}] 로그인 페이지로 이동: {LOGIN_URL}")
+        logger.info(f"[{user_id}] [{action_name}] 페이지 이동 시작...")
 
-    # 시작 하트비트
-    heartbeat("process_start")
-    
-    browser = None
-    context = None
-    
-    try:
-        with sync_playwright() as p:
-            logger.info(f"[{user_id}] [{action_name}] Playwright 초기화 완료")
-
-            # Playwright 초기화 하트비트
-            heartbeat("playwright_init")
-
-            logger.info(f"[{user_id}] [{action_name}] 브라우저 실행 시작...")
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-extensions',
-                    '--disable-web-security',
-                    '--ignore-certificate-errors-spki-list',
-                    '--ignore-certificate-errors',
-                    '--ignore-ssl-errors',
-                    '--proxy-bypass-list=<-loopback>',
-                    '--disable-features=VizDisplayCompositor',
-                    '--lang=ko-KR',
-                    '--font-render-hinting=none',
-                    '--disable-font-subpixel-positioning'
-                ]
-            )
-            logger.info(f"[{user_id}] [{action_name}] 브라우저 실행 완료")
+        # 페이지 이동 하트비트
+        heartbeat("page_navigation")
 
-            # 브라우저 실행 완료 하트비트
-            heartbeat("browser_started")
+        page.goto(LOGIN_URL, timeout=timeout_advisor.budget("page_navigation", PAGE_LOAD_TIMEOUT), wait_until="load")
+        logger.info(f"[{user_id}] [{action_name}] 페이지 이동 완료")
 
-            logger.info(f"[{user_id}] [{action_name}] 브라우저 컨텍스트 생성 시작...")
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                locale='ko-KR',
-                timezone_id='Asia/Seoul',
-                proxy=PROXY_CONFIG
-            )
-            logger.info(f"[{user_id}] [{action_name}] 브라우저 컨텍스트 생성 완료")
+        # 페이지 이동 완료 하트비트
+        heartbeat("page_loaded")
 
-            # 컨텍스트 생성 완료 하트비트
-            heartbeat("context_created")
+        # 로그인 폼 요소들이 로드될 때까지 대기
+        logger.info(f"[{user_id}] [{action_name}] 로그인 폼 로드 대기 중...")
 
-            # 컨텍스트 타임아웃 설정 (짧게)
-            context.set_default_timeout(DEFAULT_TIMEOUT)
-            context.set_default_navigation_timeout(NAVIGATION_TIMEOUT)
+        try:
+            page.wait_for_selector("#userId", timeout=timeout_advisor.budget("page_loaded", NAVIGATION_TIMEOUT))
+            page.wait_for_selector("#password", timeout=DEFAULT_TIMEOUT)
+            page.wait_for_selector("button[type=submit]", timeout=DEFAULT_TIMEOUT)
+            logger.info(f"[{user_id}] [{action_name}] 로그인 폼 로드 완료")
+        except Exception as selector_error:
+            # 로그인 폼 로드 실패 시 디버깅 정보 수집
+            logger.error(f"[{user_id}] [{action_name}] 로그인 폼 로드 실패: {selector_error}")
 
-            logger.info(f"[{user_id}] [{action_name}] 새 페이지 생성...")
+            # 현재 페이지 URL과 제목 확인
+            current_url = page.url
+            page_title = page.title()
+            logger.error(f"[{user_id}] [{action_name}] 현재 URL: {current_url}")
+            logger.error(f"[{user_id}] [{action_name}] 페이지 제목: {page_title}")
 
-            # 페이지 생성 시작 하트비트
-            heartbeat("page_creation_start")
+            # 디버깅용 스크린샷 저장
+            os.makedirs("screenshots", exist_ok=True)
+            debug_path = f"screenshots/login_form_error_{user_id}_{int(time.time())}.png"
+            page.screenshot(path=debug_path, full_page=True)
+            logger.error(f"[{user_id}] [{action_name}] 디버깅 스크린샷 저장: {debug_path}")
 
-            # 페이지 생성 재시도 (최대 3번)
-            page = None
-            max_attempts = 3
+            # HTML 내용도 저장
+            html_debug_path = f"screenshots/login_form_error_{user_id}_{int(time.time())}.html"
+            with open(html_debug_path, 'w', encoding='utf-8') as f:
+                f.write(page.content())
+            logger.error(f"[{user_id}] [{action_name}] HTML 내용 저장: {html_debug_path}")
 
-            for attempt in range(max_attempts):
-                try:
-                    logger.info(f"[{user_id}] [{action_name}] 페이지 생성 시도 {attempt + 1}/{max_attempts}")
+            raise selector_error
 
-                    # 페이지 생성 시도 하트비트
-                    heartbeat(f"page_creation_attempt_{attempt + 1}")
+        # 폼 로드 완료 하트비트 (입력은 page.fill이 요소 활성화까지 자동 대기)
+        heartbeat("login_form_loaded")
 
-                    page = context.new_page()
-                    logger.info(f"[{user_id}] [{action_name}] 페이지 생성 완료")
+        logger.info(f"[{user_id}] [{action_name}] 아이디 입력 시작...")
+        page.fill("#userId", user_id)
+        logger.info(f"[{user_id}] [{action_name}] 아이디 입력 완료")
 
-                    # 페이지 생성 성공 하트비트
-                    heartbeat("page_created")
-                    break
-                except Exception as e:
-                    if attempt < max_attempts - 1:
-                        logger.warning(f"[{user_id}] [{action_name}] 페이지 생성 실패: {e}, 2초 후 재시도...")
-                        time.sleep(2)
-                        continue
-                    else:
-                        logger.error(f"[{user_id}] [{action_name}] 모든 페이지 생성 시도 실패: {e}")
-                        raise e
+        # 아이디 입력 완료 하트비트
+        heartbeat("userid_filled")
 
-            if not page:
-                raise Exception("페이지 생성에 실패했습니다")
-            
-            try:
-                # 로그인 시작 하트비트
-                heartbeat("login_start")
+        logger.info(f"[{user_id}] [{action_name}] 비밀번호 입력 시작...")
+        page.fill("#password", password)
+        logger.info(f"[{user_id}] [{action_name}] 비밀번호 입력 완료")
 
-                # 로그인
-                logger.info(f"[{user_id}] [{action_name}] 로그인 페이지로 이동: {LOGIN_URL}")
-                logger.info(f"[{user_id}] [{action_name}] 페이지 이동 시작...")
+        # 비밀번호 입력 완료 하트비트
+        heartbeat("password_filled")
 
-                # 페이지 이동 하트비트
-                heartbeat("page_navigation")
+        logger.info(f"[{user_id}] [{action_name}] 로그인 버튼 클릭 시작...")
 
-                page.goto(LOGIN_URL, timeout=PAGE_LOAD_TIMEOUT, wait_until="load")
-                logger.info(f"[{user_id}] [{action_name}] 페이지 이동 완료")
+        # 로그인 버튼 클릭 시작 하트비트
+        heartbeat("login_button_click")
 
-                # 페이지 이동 완료 하트비트
-                heartbeat("page_loaded")
+        page.click("button[type=submit]")
+        logger.info(f"[{user_id}] [{action_name}] 로그인 버튼 클릭 완료")
 
-                # 로그인 폼 요소들이 로드될 때까지 대기
-                logger.info(f"[{user_id}] [{action_name}] 로그인 폼 로드 대기 중...")
+        # 메인 페이지 이동 또는 오류 팝업 표시 중 먼저 일어나는 쪽까지만 대기
+        logger.info(f"[{user_id}] [{action_name}] 로그인 결과 대기 중 (최대 {LOGIN_RESULT_TIMEOUT}ms)...")
+        waits.wait("login_result", lambda: page.wait_for_function(
+            LOGIN_RESULT_JS, timeout=timeout_advisor.budget("login_button_click", LOGIN_RESULT_TIMEOUT)
+        ))
 
-                try:
-                    page.wait_for_selector("#userId", timeout=NAVIGATION_TIMEOUT)
-                    page.wait_for_selector("#password", timeout=DEFAULT_TIMEOUT)
-                    page.wait_for_selector("button[type=submit]", timeout=DEFAULT_TIMEOUT)
-                    logger.info(f"[{user_id}] [{action_name}] 로그인 폼 로드 완료")
-                except Exception as selector_error:
-                    # 로그인 폼 로드 실패 시 디버깅 정보 수집
-                    logger.error(f"[{user_id}] [{action_name}] 로그인 폼 로드 실패: {selector_error}")
+        # 비밀번호 오류 팝업 검사
+        heartbeat("password_error_check")
+        password_error, error_message = check_password_error_popup(page, user_id)
 
-                    # 현재 페이지 URL과 제목 확인
-                    current_url = page.url
-                    page_title = page.title()
-                    logger.error(f"[{user_id}] [{action_name}] 현재 URL: {current_url}")
-                    logger.error(f"[{user_id}] [{action_name}] 페이지 제목: {page_title}")
+        if password_error:
+            # 비밀번호 불일치 상태로 설정
+            logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 감지 - 사용자를 비밀번호 불일치 상태로 전환")
+            heartbeat("password_mismatch_detected")
 
-                    # 디버깅용 스크린샷 저장
-                    os.makedirs("screenshots", exist_ok=True)
-                    debug_path = f"screenshots/login_form_error_{user_id}_{int(time.time())}.png"
-                    page.screenshot(path=debug_path, full_page=True)
-                    logger.error(f"[{user_id}] [{action_name}] 디버깅 스크린샷 저장: {debug_path}")
+            # 스크린샷 저장
+            os.makedirs("screenshots", exist_ok=True)
+            error_screenshot_path = f"screenshots/password_error_{user_id}_{int(time.time())}.png"
+            page.screenshot(path=error_screenshot_path, full_page=True)
+            logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 스크린샷 저장: {error_screenshot_path}")
 
-                    # HTML 내용도 저장
-                    html_debug_path = f"screenshots/login_form_error_{user_id}_{int(time.time())}.html"
-                    with open(html_debug_path, 'w', encoding='utf-8') as f:
-                        f.write(page.content())
-                    logger.error(f"[{user_id}] [{action_name}] HTML 내용 저장: {html_debug_path}")
+            # HTML 저장
+            html_error_path = f"screenshots/password_error_{user_id}_{int(time.time())}.html"
+            with open(html_error_path, 'w', encoding='utf-8') as f:
+                f.write(page.content())
+            logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 HTML 저장: {html_error_path}")
 
-                    raise selector_error
+            # 데이터베이스에 비밀번호 불일치 상태 기록
+            db_manager.set_password_mismatch(user_id, changed_by="system")
 
-                # 폼 로드 완료 하트비트
-                heartbeat("login_form_loaded")
+            # 예외 발생 (크롤링 중단)
+            raise Exception(f"비밀번호 불일치: {error_message}")
 
-                # 추가 안정화 대기
-                time.sleep(2)
+        logger.info(f"[{user_id}] [{action_name}] 비밀번호 오류 팝업 없음 - 계속 진행")
 
-                logger.info(f"[{user_id}] [{action_name}] 아이디 입력 시작...")
-                page.fill("#userId", user_id)
-                logger.info(f"[{user_id}] [{action_name}] 아이디 입력 완료")
+        # 로그인 완료 대기
+        logger.info(f"[{user_id}] [{action_name}] 메인 페이지 이동 대기 중...")
 
-                # 아이디 입력 완료 하트비트
-                heartbeat("userid_filled")
+        # 메인 페이지 이동 대기 시작 하트비트
+        heartbeat("main_page_wait")
 
-                logger.info(f"[{user_id}] [{action_name}] 비밀번호 입력 시작...")
-                page.fill("#password", password)
-                logger.info(f"[{user_id}] [{action_name}] 비밀번호 입력 완료")
+        # 메인 페이지 이동 대기 (프록시 + 해외 서버 환경 고려하여 타임아웃 증가)
+        try:
+            page.wait_for_url("**/homGwMain", timeout=timeout_advisor.budget("main_page_wait", 60000))  # 프록시 경유로 상한 60초
+            logger.info(f"[{user_id}] [{action_name}] 메인 페이지 이동 완료")
 
-                # 비밀번호 입력 완료 하트비트
-                heartbeat("password_filled")
+            # 메인 페이지 이동 완료 하트비트
+            heartbeat("main_page_loaded")
 
-                logger.info(f"[{user_id}] [{action_name}] 로그인 버튼 클릭 시작...")
+        except Exception as e:
+            # 현재 URL 확인 (프록시로 인해 패턴 매칭 실패 가능)
+            current_url = page.url
+            logger.warning(f"[{user_id}] [{action_name}] wait_for_url 타임아웃 - 현재 URL: {current_url}")
+
+            # URL에 homGwMain이 포함되어 있으면 성공으로 간주 (패턴 매칭 실패해도 URL은 정상)
+            if "homGwMain" in current_url:
+                logger.info(f"[{user_id}] [{action_name}] URL 패턴 매칭 실패했지만 현재 URL에 homGwMain 포함 - 정상 처리")
+                heartbeat("main_page_loaded")
+            else:
+                # homGwMain이 없으면 비밀번호 오류 재검사 (프록시로 인한 지연 고려)
+                logger.error(f"[{user_id}] [{action_name}] 메인 페이지 이동 실패 - 비밀번호 오류 재검사")
 
-                # 로그인 버튼 클릭 시작 하트비트
-                heartbeat("login_button_click")
+                # 메인 페이지 이동 실패 시 다시 한번 팝업 검사
+                heartbeat("password_error_recheck")
 
-                page.click("button[type=submit]")
-                logger.info(f"[{user_id}] [{action_name}] 로그인 버튼 클릭 완료")
+                # 비밀번호 오류 팝업 검사 (기본 타임아웃 사용, 프록시 환경 고려)
+                try:
+                    password_error, error_message = check_password_error_popup(page, user_id)
 
-                # 로그인 버튼 클릭 후 비밀번호 오류 팝업 검사 (3초 대기)
-                logger.info(f"[{user_id}] [{action_name}] 비밀번호 오류 팝업 검사 대기 중 (3초)...")
-                time.sleep(3)
+                    if password_error:
+                        # 비밀번호 불일치 상태로 설정
+                        logger.error(f"[{user_id}] [{action_name}] 재검사에서 비밀번호 오류 감지")
 
-                # 비밀번호 오류 팝업 검사
-                heartbeat("password_error_check")
-                password_error, error_message = check_password_error_popup(page, user_id)
+                        # 스크린샷 저장
+                        os.makedirs("screenshots", exist_ok=True)
+                        error_screenshot_path = f"screenshots/password_error_{user_id}_{int(time.time())}.png"
+                        page.screenshot(path=error_screenshot_path, full_page=True)
+                        logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 스크린샷 저장: {error_screenshot_path}")
 
-                if password_error:
-                    # 비밀번호 불일치 상태로 설정
-                    logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 감지 - 사용자를 비밀번호 불일치 상태로 전환")
-                    heartbeat("password_mismatch_detected")
+                        # 데이터베이스에 비밀번호 불일치 상태 기록
+                        db_manager.set_password_mismatch(user_id, changed_by="system")
 
-                    # 스크린샷 저장
-                    os.makedirs("screenshots", exist_ok=True)
-                    error_screenshot_path = f"screenshots/password_error_{user_id}_{int(time.time())}.png"
-                    page.screenshot(path=error_screenshot_path, full_page=True)
-                    logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 스크린샷 저장: {error_screenshot_path}")
+                        # 예외 발생 (크롤링 중단)
+                        raise Exception(f"비밀번호 불일치: {error_message}")
+                    else:
+                        # 팝업도 없으면 다른 오류
+                        logger.error(f"[{user_id}] [{action_name}] 메인 페이지 이동 타임아웃 (비밀번호 오류 아님): {e}")
+                        raise e
+                except Exception as check_error:
+                    # check_password_error_popup 자체가 타임아웃되면 무시하고 진행
+                    logger.warning(f"[{user_id}] [{action_name}] 비밀번호 팝업 검사 실패 (프록시로 인한 타임아웃 가능성): {check_error}")
+                    logger.info(f"[{user_id}] [{action_name}] 팝업 검사 실패했으나 계속 진행")
+                    # 원래 에러 다시 발생
+                    raise e
 
-                    # HTML 저장
-                    html_error_path = f"screenshots/password_error_{user_id}_{int(time.time())}.html"
-                    with open(html_error_path, 'w', encoding='utf-8') as f:
-                        f.write(page.content())
-                    logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 HTML 저장: {html_error_path}")
+        logger.info(f"[{user_id}] [{action_name}] 페이지 로드 상태 대기 중...")
 
-                    # 데이터베이스에 비밀번호 불일치 상태 기록
-                    db_manager.set_password_mismatch(user_id, changed_by="system")
+        # 페이지 로드 상태 대기 하트비트
+        heartbeat("page_load_wait")
 
-                    # 예외 발생 (크롤링 중단)
-                    raise Exception(f"비밀번호 불일치: {error_message}")
+        page.wait_for_load_state("load", timeout=timeout_advisor.budget("page_load_wait", PAGE_LOAD_TIMEOUT))
+        logger.info(f"[{user_id}] [{action_name}] 페이지 로드 완료")
 
-                logger.info(f"[{user_id}] [{action_name}] 비밀번호 오류 팝업 없음 - 계속 진행")
+        # 페이지 로드 완료 하트비트
+        heartbeat("page_load_complete")
 
-                # 로그인 완료 대기
-                logger.info(f"[{user_id}] [{action_name}] 메인 페이지 이동 대기 중...")
+        logger.info(f"[{user_id}] [{action_name}] 로그인 성공")
 
-                # 메인 페이지 이동 대기 시작 하트비트
-                heartbeat("main_page_wait")
+        # 로그인 성공 하트비트
+        heartbeat("login_success")
 
-                # 메인 페이지 이동 대기 (프록시 + 해외 서버 환경 고려하여 타임아웃 증가)
-                try:
-                    page.wait_for_url("**/homGwMain", timeout=60000)  # 프록시 경유로 60초로 증가
-                    logger.info(f"[{user_id}] [{action_name}] 메인 페이지 이동 완료")
+    except Exception as e:
+        logger.error(f"[{user_id}] [{action_name}] 로그인 중 오류 발생: {e}")
+        raise
 
-                    # 메인 페이지 이동 완료 하트비트
-                    heartbeat("main_page_loaded")
+def restore_session(page, user_id, action_name, heartbeat):
+    """저장된 세션으로 출퇴근 페이지 바로 이동 - 세션 만료 시 False 반환"""
+    try:
+        heartbeat("session_restore_start")
+        logger.info(f"[{user_id}] [{action_name}] 저장된 세션으로 출퇴근 페이지 이동: {ATTEND_PAGE_URL}")
+        page.goto(ATTEND_PAGE_URL, timeout=timeout_advisor.budget("session_restore_start", PAGE_LOAD_TIMEOUT), wait_until="load")
 
-                except Exception as e:
-                    # 현재 URL 확인 (프록시로 인해 패턴 매칭 실패 가능)
-                    current_url = page.url
-                    logger.warning(f"[{user_id}] [{action_name}] wait_for_url 타임아웃 - 현재 URL: {current_url}")
-
-                    # URL에 homGwMain이 포함되어 있으면 성공으로 간주 (패턴 매칭 실패해도 URL은 정상)
-                    if "homGwMain" in current_url:
-                        logger.info(f"[{user_id}] [{action_name}] URL 패턴 매칭 실패했지만 현재 URL에 homGwMain 포함 - 정상 처리")
-                        heartbeat("main_page_loaded")
-                    else:
-                        # homGwMain이 없으면 비밀번호 오류 재검사 (프록시로 인한 지연 고려)
-                        logger.error(f"[{user_id}] [{action_name}] 메인 페이지 이동 실패 - 비밀번호 오류 재검사")
+        # 로그인 폼이 다시 보이면 세션 만료로 판단
+        if page.locator("#userId").count() > 0:
+            logger.info(f"[{user_id}] [{action_name}] 세션 만료 - 전체 로그인으로 전환")
+            heartbeat("session_expired")
+            session_cache.invalidate(user_id)
+            return False
 
-                        # 메인 페이지 이동 실패 시 다시 한번 팝업 검사
-                        heartbeat("password_error_recheck")
+        logger.info(f"[{user_id}] [{action_name}] 세션 복원 성공 - 로그인 생략")
+        heartbeat("session_restored")
+        return True
 
-                        # 비밀번호 오류 팝업 검사 (기본 타임아웃 사용, 프록시 환경 고려)
-                        try:
-                            password_error, error_message = check_password_error_popup(page, user_id)
+    except Exception as e:
+        logger.warning(f"[{user_id}] [{action_name}] 세션 복원 실패 - 전체 로그인으로 전환: {e}")
+        heartbeat("session_restore_failed")
+        session_cache.invalidate(user_id)
+        return False
 
-                            if password_error:
-                                # 비밀번호 불일치 상태로 설정
-                                logger.error(f"[{user_id}] [{action_name}] 재검사에서 비밀번호 오류 감지")
+def login_and_click_button(user_id, password, button_ids, action_name, attendance_log_id=None, browser_pool=None):
+    start_time = time.time()
+    logger.info(f"[{user_id}] [{action_name}] 프로세스 시작")
 
-                                # 스크린샷 저장
-                                os.makedirs("screenshots", exist_ok=True)
-                                error_screenshot_path = f"screenshots/password_error_{user_id}_{int(time.time())}.png"
-                                page.screenshot(path=error_screenshot_path, full_page=True)
-                                logger.error(f"[{user_id}] [{action_name}] 비밀번호 오류 스크린샷 저장: {error_screenshot_path}")
+    # 로컬 하트비트 함수 (attendance_log_id가 자동으로 포함됨)
+    def heartbeat(stage):
+        update_heartbeat(stage, user_id, action_name, attendance_log_id)
 
-                                # 데이터베이스에 비밀번호 불일치 상태 기록
-                                db_manager.set_password_mismatch(user_id, changed_by="system")
+    # 시작 하트비트
+    heartbeat("process_start")
 
-                                # 예외 발생 (크롤링 중단)
-                                raise Exception(f"비밀번호 불일치: {error_message}")
-                            else:
-                                # 팝업도 없으면 다른 오류
-                                logger.error(f"[{user_id}] [{action_name}] 메인 페이지 이동 타임아웃 (비밀번호 오류 아님): {e}")
-                                raise e
-                        except Exception as check_error:
-                            # check_password_error_popup 자체가 타임아웃되면 무시하고 진행
-                            logger.warning(f"[{user_id}] [{action_name}] 비밀번호 팝업 검사 실패 (프록시로 인한 타임아웃 가능성): {check_error}")
-                            logger.info(f"[{user_id}] [{action_name}] 팝업 검사 실패했으나 계속 진행")
-                            # 원래 에러 다시 발생
-                            raise e
-                
-                logger.info(f"[{user_id}] [{action_name}] 페이지 로드 상태 대기 중...")
+    # 저장된 로그인 세션 (없거나 만료되면 None)
+    storage_state = session_cache.load(user_id)
 
-                # 페이지 로드 상태 대기 하트비트
-                heartbeat("page_load_wait")
+    # 조건 대기별 실제 소요 시간 기록
+    waits = WaitTimer(user_id, action_name)
 
-                page.wait_for_load_state("load", timeout=PAGE_LOAD_TIMEOUT)
-                logger.info(f"[{user_id}] [{action_name}] 페이지 로드 완료")
+    # 불필요한 리소스 요청 차단 (로그인/출퇴근 페이지 호스트는 항상 허용)
+    blocker = RequestBlocker([LOGIN_URL, ATTEND_PAGE_URL])
 
-                # 페이지 로드 완료 하트비트
-                heartbeat("page_load_complete")
+    # 출퇴근 등록 응답 감시 (버튼 클릭 직전에 시작, 어떤 경로로 끝나든 finally에서 해제)
+    watcher = None
 
-                logger.info(f"[{user_id}] [{action_name}] 로그인 성공")
+    try:
+        with open_browser_context(user_id, action_name, heartbeat, browser_pool, storage_state) as context:
+            # 컨텍스트 타임아웃 설정 (짧게)
+            context.set_default_timeout(DEFAULT_TIMEOUT)
+            context.set_default_navigation_timeout(NAVIGATION_TIMEOUT)
 
-                # 로그인 성공 하트비트
-                heartbeat("login_success")
-                
-            except Exception as e:
-                logger.error(f"[{user_id}] [{action_name}] 로그인 중 오류 발생: {e}")
-                raise
+            # 상태 프로브 설치 (이후 열리는 모든 문서에 자동 주입)
+            context.add_init_script(STATE_PROBE_SCRIPT)
+            blocker.install(context)
+
+            logger.info(f"[{user_id}] [{action_name}] 새 페이지 생성...")
+
+            # 페이지 생성 시작 하트비트
+            heartbeat("page_creation_start")
 
-            # 페이지 완전 로드 대기
+            # 페이지 생성 재시도 (최대 3번)
+            page = None
+            max_attempts = 3
+
+            for attempt in range(max_attempts):
+                try:
+                    logger.info(f"[{user_id}] [{action_name}] 페이지 생성 시도 {attempt + 1}/{max_attempts}")
+
+                    # 페이지 생성 시도 하트비트
+                    heartbeat(f"page_creation_attempt_{attempt + 1}")
+
+                    page = context.new_page()
+                    logger.info(f"[{user_id}] [{action_name}] 페이지 생성 완료")
+
+                    # 페이지 생성 성공 하트비트
+                    heartbeat("page_created")
+                    break
+                except Exception as e:
+                    if attempt < max_attempts - 1:
+                        logger.warning(f"[{user_id}] [{action_name}] 페이지 생성 실패: {e}, 2초 후 재시도...")
+                        time.sleep(2)
+                        continue
+                    else:
+                        logger.error(f"[{user_id}] [{action_name}] 모든 페이지 생성 시도 실패: {e}")
+                        raise e
+
+            if not page:
+                raise Exception("페이지 생성에 실패했습니다")
+            
+            session_restored = False
+            if storage_state:
+                session_restored = restore_session(page, user_id, action_name, heartbeat)
+
+            if not session_restored:
+                perform_login(page, user_id, password, action_name, heartbeat, waits)
+
+                # 다음 실행에서 로그인 폼을 건너뛸 수 있도록 세션 저장
+                session_cache.save(user_id, page.context.storage_state())
+
+            # 출퇴근 버튼이 렌더링되고 네트워크가 잠잠해질 때까지만 대기
             heartbeat("page_stabilize_wait")
-            time.sleep(3)
+            waits.wait("attend_area_ready",
+                       lambda: page.wait_for_selector(", ".join(button_ids), state="attached",
+                                                      timeout=timeout_advisor.budget("page_stabilize_wait", PAGE_READY_TIMEOUT)))
+            waits.wait("network_idle", lambda: page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT))
+
+            # 완료 여부/팝업 상태를 한 번에 조회해 이후 분기에 사용
+            state = probe_page_state(page)
 
             # 출근의 경우 먼저 완료 상태 확인
             if action_name == "punch_in":
-                if check_punch_in_completed(page, user_id, action_name, attendance_log_id):
+                if check_punch_in_completed(page, user_id, action_name, attendance_log_id, state):
                     logger.info(f"[{user_id}] [{action_name}] ✅ 출근이 이미 완료되어 있어 작업을 종료합니다")
                     heartbeat("process_complete")
                     raise Exception("이미 출근 완료")
 
             # 퇴근의 경우 먼저 완료 상태 확인
             if action_name == "punch_out":
-                if check_punch_out_completed(page, user_id, action_name, attendance_log_id):
+                if check_punch_out_completed(page, user_id, action_name, attendance_log_id, state):
                     logger.info(f"[{user_id}] [{action_name}] ✅ 퇴근이 이미 완료되어 있어 작업을 종료합니다")
                     heartbeat("process_complete")
                     raise Exception("이미 퇴근 완료")
 
             # 모든 팝업 닫기
             heartbeat("popup_close_start")
-            close_all_popups(page, user_id, action_name)
-            time.sleep(2)
+            close_all_popups(page, user_id, action_name, state)
             heartbeat("popup_close_complete")
 
+            # 출퇴근 등록 응답 감시 시작 (클릭 직후 도착하는 응답도 잡도록 클릭 전에 등록)
+            watcher = PunchResponseWatcher(page, user_id, action_name)
+            watcher.start()
+
             # 바로 버튼 클릭 시도 (테이블 로드 대기 제거)
             heartbeat("button_click_start")
             clicked = False
             for btn in button_ids:
-                if wait_and_click_button(page, btn, user_id, action_name):
+                if wait_and_click_button(page, btn, user_id, action_name, waits=waits):
                     clicked = True
 
-                    # 버튼 클릭 후 출근 완료 상태 재확인 (재시도 로직)
-                    if action_name == "punch_in":
-                        logger.info(f"[{user_id}] [{action_name}] 출근 완료 상태 확인 시작 (프록시 환경 대응)")
-
-                        # 버튼 클릭 후 네트워크 안정화 대기 (프록시 경유로 서버 응답 지연 대응)
-                        try:
-                            page.wait_for_load_state("networkidle", timeout=15000)
-                            logger.info(f"[{user_id}] [{action_name}] 네트워크 안정화 완료")
-                        except Exception as e:
-                            logger.info(f"[{user_id}] [{action_name}] 네트워크 안정화 대기 타임아웃 (계속 진행): {e}")
-
-                        # 먼저 알림 팝업의 확인 버튼을 클릭 시도
-                        # '출근했습니다' 팝업이 뜨면 서버에서 출근 처리가 완료된 것이므로 성공 확정
-                        alert_popup_confirmed = False
-                        time.sleep(2)
-                        try:
-                            alert_confirm = page.locator("#naon-cmm-alert-confirm")
-                            if alert_confirm.is_visible(timeout=10000):
-                                logger.info(f"[{user_id}] [{action_name}] '출근했습니다' 알림 팝업 감지, 확인 버튼 클릭 중...")
-                                alert_confirm.click(timeout=5000)
-                                alert_popup_confirmed = True
-                                time.sleep(1)
-                                logger.info(f"[{user_id}] [{action_name}] 알림 팝업 확인 버튼 클릭 완료 - 출근 성공 확정")
-                        except Exception as e:
-                            logger.info(f"[{user_id}] [{action_name}] 알림 팝업 없음 또는 이미 닫힘: {e}")
-
-                        # 알림 팝업이 확인되었으면 DOM 검증 없이 즉시 성공 처리
-                        if alert_popup_confirmed:
-                            logger.info(f"[{user_id}] [{action_name}] ✅ 알림 팝업으로 출근 완료 확인됨 (DOM 검증 생략)")
-                            heartbeat("button_clicked_success")
-                            heartbeat("process_complete")
-                            return True
-
-                        # 알림 팝업이 없었던 경우 DOM 검증 수행 (최대 5회, 각 3초)
-                        max_retries = 5
-                        retry_interval = 3
-                        completed = False
-
-                        for retry in range(max_retries):
-                            time.sleep(retry_interval)
-
-                            if check_punch_in_completed(page, user_id, action_name, attendance_log_id):
-                                completed = True
-                                logger.info(f"[{user_id}] [{action_name}] ✅ 버튼 클릭 후 출근 완료 확인됨 (재시도 {retry + 1}/{max_retries})")
-                                break
-                            else:
-                                logger.info(f"[{user_id}] [{action_name}] 출근 완료 대기 중... (재시도 {retry + 1}/{max_retries})")
-
-                        # DOM 검증 실패 시 페이지 새로고침 후 최종 재확인
-                        if not completed:
-                            logger.info(f"[{user_id}] [{action_name}] DOM 검증 실패 - 페이지 새로고침 후 최종 재확인")
-                            heartbeat("punch_in_reload_verify")
-                            try:
-                                page.reload(timeout=PAGE_LOAD_TIMEOUT, wait_until="load")
-                                time.sleep(3)
-                                close_all_popups(page, user_id, action_name)
-                                time.sleep(2)
-
-                                if check_punch_in_completed(page, user_id, action_name, attendance_log_id):
-                                    completed = True
-                                    logger.info(f"[{user_id}] [{action_name}] ✅ 페이지 새로고침 후 출근 완료 확인됨!")
-                            except Exception as reload_e:
-                                logger.warning(f"[{user_id}] [{action_name}] 페이지 새로고침 실패: {reload_e}")
-
-                        if completed:
-                            heartbeat("button_clicked_success")
-                            heartbeat("process_complete")
-                            return True
-                        else:
-                            # 최종 실패
-                            logger.error(f"[{user_id}] [{action_name}] ❌ 버튼 클릭 후 출근 완료 확인 실패 (새로고침 후에도 미확인)")
-
-                            # 스크린샷 저장
-                            os.makedirs("screenshots", exist_ok=True)
-                            path = f"screenshots/punch_in_verify_failed_{user_id}_{int(time.time())}.png"
-                            page.screenshot(path=path, full_page=True)
-                            logger.error(f"[{user_id}] [{action_name}] 검증 실패 스크린샷 저장: {path}")
-
-                            # 페이지 HTML도 저장
-                            html_path = f"screenshots/punch_in_verify_failed_{user_id}_{int(time.time())}.html"
-                            with open(html_path, 'w', encoding='utf-8') as f:
-                                f.write(page.content())
-                            logger.error(f"[{user_id}] [{action_name}] 페이지 HTML 저장: {html_path}")
-
-                            raise Exception("출근 버튼 클릭 후 출근 완료 상태가 확인되지 않음")
-
-                    # 버튼 클릭 후 퇴근 완료 상태 재확인 (재시도 로직)
-                    if action_name == "punch_out":
-                        logger.info(f"[{user_id}] [{action_name}] 퇴근 완료 상태 확인 시작 (프록시 환경 대응)")
-
-                        # 버튼 클릭 후 네트워크 안정화 대기 (프록시 경유로 서버 응답 지연 대응)
-                        try:
-                            page.wait_for_load_state("networkidle", timeout=15000)
-                            logger.info(f"[{user_id}] [{action_name}] 네트워크 안정화 완료")
-                        except Exception as e:
-                            logger.info(f"[{user_id}] [{action_name}] 네트워크 안정화 대기 타임아웃 (계속 진행): {e}")
-
-                        # 먼저 알림 팝업의 확인 버튼을 클릭 시도
-                        # '퇴근했습니다' 팝업이 뜨면 서버에서 퇴근 처리가 완료된 것이므로 성공 확정
-                        alert_popup_confirmed = False
-                        time.sleep(2)
-                        try:
-                            alert_confirm = page.locator("#naon-cmm-alert-confirm")
-                            if alert_confirm.is_visible(timeout=10000):
-                                logger.info(f"[{user_id}] [{action_name}] '퇴근했습니다' 알림 팝업 감지, 확인 버튼 클릭 중...")
-                                alert_confirm.click(timeout=5000)
-                                alert_popup_confirmed = True
-                                time.sleep(1)
-                                logger.info(f"[{user_id}] [{action_name}] 알림 팝업 확인 버튼 클릭 완료 - 퇴근 성공 확정")
-                        except Exception as e:
-                            logger.info(f"[{user_id}] [{action_name}] 알림 팝업 없음 또는 이미 닫힘: {e}")
-
-                        # 알림 팝업이 확인되었으면 DOM 검증 없이 즉시 성공 처리
-                        if alert_popup_confirmed:
-                            logger.info(f"[{user_id}] [{action_name}] ✅ 알림 팝업으로 퇴근 완료 확인됨 (DOM 검증 생략)")
-                            heartbeat("button_clicked_success")
-                            heartbeat("process_complete")
-                            return True
-
-                        # 알림 팝업이 없었던 경우 DOM 검증 수행 (최대 5회, 각 3초)
-                        max_retries = 5
-                        retry_interval = 3
-                        completed = False
-
-                        for retry in range(max_retries):
-                            time.sleep(retry_interval)
-
-                            if check_punch_out_completed(page, user_id, action_name, attendance_log_id):
-                                completed = True
-                                logger.info(f"[{user_id}] [{action_name}] ✅ 버튼 클릭 후 퇴근 완료 확인됨 (재시도 {retry + 1}/{max_retries})")
-                                break
-                            else:
-                                logger.info(f"[{user_id}] [{action_name}] 퇴근 완료 대기 중... (재시도 {retry + 1}/{max_retries})")
-
-                        # DOM 검증 실패 시 페이지 새로고침 후 최종 재확인
-                        if not completed:
-                            logger.info(f"[{user_id}] [{action_name}] DOM 검증 실패 - 페이지 새로고침 후 최종 재확인")
-                            heartbeat("punch_out_reload_verify")
-                            try:
-                                page.reload(timeout=PAGE_LOAD_TIMEOUT, wait_until="load")
-                                time.sleep(3)
-                                close_all_popups(page, user_id, action_name)
-                                time.sleep(2)
-
-                                if check_punch_out_completed(page, user_id, action_name, attendance_log_id):
-                                    completed = True
-                                    logger.info(f"[{user_id}] [{action_name}] ✅ 페이지 새로고침 후 퇴근 완료 확인됨!")
-                            except Exception as reload_e:
-                                logger.warning(f"[{user_id}] [{action_name}] 페이지 새로고침 실패: {reload_e}")
-
-                        if completed:
-                            heartbeat("button_clicked_success")
-                            heartbeat("process_complete")
-                            return True
-                        else:
-                            # 최종 실패
-                            logger.error(f"[{user_id}] [{action_name}] ❌ 버튼 클릭 후 퇴근 완료 확인 실패 (새로고침 후에도 미확인)")
-
-                            # 스크린샷 저장
-                            os.makedirs("screenshots", exist_ok=True)
-                            path = f"screenshots/punch_out_verify_failed_{user_id}_{int(time.time())}.png"
-                            page.screenshot(path=path, full_page=True)
-                            logger.error(f"[{user_id}] [{action_name}] 검증 실패 스크린샷 저장: {path}")
-
-                            # 페이지 HTML도 저장
-                            html_path = f"screenshots/punch_out_verify_failed_{user_id}_{int(time.time())}.html"
-                            with open(html_path, 'w', encoding='utf-8') as f:
-                                f.write(page.content())
-                            logger.error(f"[{user_id}] [{action_name}] 페이지 HTML 저장: {html_path}")
-
-                            raise Exception("퇴근 버튼 클릭 후 퇴근 완료 상태가 확인되지 않음")
-
+                    # 버튼 클릭 후 완료 상태 확인 (알림 팝업 또는 완료 표시)
+                    if action_name in ("punch_in", "punch_out"):
+                        return verify_punch_result(page, user_id, action_name, attendance_log_id, heartbeat, waits, watcher)
                     break
 
             if not clicked:
@@ -1121,9 +1303,9 @@ def login_and_click_button(user_id, password, button_ids, action_name, attendanc
                 
                 raise Exception(error_msg)
 
-            # 클릭 후 처리 대기
+            # 클릭 후 처리 대기 (네트워크 안정화까지만)
             heartbeat("button_clicked_success")
-            time.sleep(3)
+            waits.wait("after_click_idle", lambda: page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT))
 
             # 완료 시 하트비트 업데이트
             heartbeat("process_complete")
@@ -1134,102 +1316,178 @@ def login_and_click_button(user_id, password, button_ids, action_name, attendanc
     except Exception as e:
         elapsed = time.time() - start_time
         logger.error(f"[{user_id}] [{action_name}] 오류 발생 (소요시간: {elapsed:.2f}s): {e}")
+
+        # 실패 직전 단계까지의 하트비트를 바로 저장 (워치독/원인 분석용)
+        heartbeat_buffer.flush()
         raise
     finally:
-        try:
-            if context:
-                context.close()
-            if browser:
-                browser.close()
-        except:
-            pass
+        if watcher is not None:
+            watcher.stop()
+        logger.info(f"[{user_id}] [{action_name}] {waits.summary()}")
+        logger.info(f"[{user_id}] [{action_name}] {blocker.format_stats()}")
 
 # 크롤링 전용 모듈 - 시그널 핸들러 불필요 (워치독에서 관리)
 
-def process_users(button_ids, action_name):
-    """사용자 처리 함수 (단순 실행)"""
-    users = get_users()
-    if not users:
-        logger.error("활성 사용자를 찾을 수 없습니다")
-        return
+def process_single_user(user_info, button_ids, action_name, browser_pool=None):
+    """사용자 한 명 처리 (사전 체크 → 출석 기록 생성 → 크롤링 → 결과 기록) - 처리 결과 상태 반환"""
+    user_id = user_info["user_id"]
+    password = user_info["password"]
 
-    for user_info in users:
-        user_id = user_info["user_id"]
-        password = user_info["password"]
+    logger.info(f"=== 사용자 처리 시작: {user_id}, 작업: {action_name} ===")
 
-        logger.info(f"=== 사용자 처리 시작: {user_id}, 작업: {action_name} ===")
+    # process_users가 get_punch_eligibility로 미리 조회한 상태가 있으면 재사용 (사용자별 쿼리 생략)
+    precomputed = "password_mismatch" in user_info
 
-        # 비밀번호 불일치 상태 체크 (최우선 체크)
-        if db_manager.is_password_mismatch(user_id):
-            logger.warning(f"[{user_id}] [{action_name}] ⚠️ 비밀번호 불일치 상태 - 크롤링 차단 (비밀번호를 변경해주세요)")
-            continue
+    # 비밀번호 불일치 상태 체크 (최우선 체크)
+    password_mismatch = user_info["password_mismatch"] if precomputed else db_manager.is_password_mismatch(user_id)
+    if password_mismatch:
+        logger.warning(f"[{user_id}] [{action_name}] ⚠️ 비밀번호 불일치 상태 - 크롤링 차단 (비밀번호를 변경해주세요)")
+        return "skipped"
 
-        # 스케줄 체크: 오늘이 출근일인지 확인
-        is_workday = db_manager.is_workday_scheduled(user_id)
-        if not is_workday:
-            logger.info(f"[{user_id}] [{action_name}] 오늘은 휴무일로 스케줄되어 있음 - 스킵")
-            continue
+    # 스케줄 체크: 오늘이 출근일인지 확인
+    is_workday = user_info["is_workday"] if precomputed else db_manager.is_workday_scheduled(user_id)
+    if not is_workday:
+        logger.info(f"[{user_id}] [{action_name}] 오늘은 휴무일로 스케줄되어 있음 - 스킵")
+        return "skipped"
 
-        # 사전 체크: 이미 오늘 성공한 기록이 있는지 확인
+    # 사전 체크: 이미 오늘 성공한 기록이 있는지 확인
+    if precomputed:
+        has_success_today = user_info[f"{action_name}_done"]
+    else:
         has_success_today = db_manager.has_today_success(user_id, action_name)
-        if has_success_today:
-            logger.info(f"[{user_id}] [{action_name}] 오늘자 성공 이력 있음 - 스킵 (attendance_log 생성 안함)")
-            continue
+    # 아웃박스에 아직 DB로 동기화되지 않은 성공 기록이 있어도 스킵 (중복 출퇴근 방지)
+    has_success_today = has_success_today or attendance_outbox.has_local_success(user_id, action_name)
+    if has_success_today:
+        logger.info(f"[{user_id}] [{action_name}] 오늘자 성공 이력 있음 - 스킵 (attendance_log 생성 안함)")
+        return "skipped"
+
+    # 출석 기록 사전 생성 (체크 통과한 경우만)
+    attendance_id = create_attendance_record(user_id, action_name)
+    if not attendance_id:
+        logger.error(f"[{user_id}] [{action_name}] 출석 기록 생성 실패")
+        return "failed"
+
+    status = "failed"
+    try:
+        login_and_click_button(user_id, password, button_ids, action_name, attendance_id, browser_pool)
+        logger.info(f"[{user_id}] [{action_name}] 성공")
+        # 성공으로 상태 업데이트
+        update_attendance_record(attendance_id, "success")
+        status = "success"
 
-        # 출석 기록 사전 생성 (체크 통과한 경우만)
-        attendance_id = create_attendance_record(user_id, action_name)
-        if not attendance_id:
-            logger.error(f"[{user_id}] [{action_name}] 출석 기록 생성 실패")
+    except Exception as e:
+        if "이미 출근 완료" in str(e) or "이미 처리 완료" in str(e) or "이미" in str(e):
+            logger.info(f"[{user_id}] [{action_name}] {e}")
+            # 이미 완료된 상태로 업데이트
+            update_attendance_record(attendance_id, "already_done", str(e))
+            status = "already_done"
+        else:
+            logger.error(f"[{user_id}] [{action_name}] 처리 중 오류: {e}")
+
+            # 스크린샷과 HTML 경로 추출 (에러 메시지에서)
+            screenshot_path = None
+            html_path = None
+            error_msg = str(e)
+
+            # 간단한 경로 추출 (개선 가능)
+            if "screenshots/" in error_msg:
+                lines = error_msg.split('\n')
+                for line in lines:
+                    if "screenshots/" in line and line.endswith(".png"):
+                        screenshot_path = line.split(":")[-1].strip()
+                    elif "screenshots/" in line and line.endswith(".html"):
+                        html_path = line.split(":")[-1].strip()
+
+            # 실패로 상태 업데이트
+            update_attendance_record(attendance_id, "failed", error_msg)
+
+    logger.info(f"=== {user_id} 처리 완료 ===\n")
+    return status
+
+def process_users(button_ids, action_name, engine=None, progress=None):
+    """
+    사용자 처리 함수 - engine: sequential(순차) 또는 async(동시 K명)
+    progress: 사용자별 상태 변경 콜백 progress({user_id: 상태}) (명령 작업 진행 상황용, 선택)
+    반환: {user_id: 처리 결과 상태}
+    """
+    report = progress or (lambda updates: None)
+
+    # 적응형 타임아웃 통계 갱신은 대상 조회와 겹쳐서 백그라운드로 진행 (브라우저 흐름에서 기다리지 않음)
+    timeout_advisor.refresh_async()
+
+    # 비밀번호/스케줄/오늘 성공 이력을 한 번의 쿼리로 조회
+    rows = db_manager.get_punch_eligibility(action_name)
+    if not rows:
+        logger.error("활성 사용자를 찾을 수 없습니다")
+        return {}
+
+    # 처리 대상만 시작 시각을 배정 (비밀번호 불일치/휴무일/오늘 성공 이력은 제외)
+    users = []
+    results = {}
+    for row in rows:
+        if row["password_mismatch"] or not row["is_workday"] or row[f"{action_name}_done"]:
+            logger.info(f"[{row['user_id']}] [{action_name}] 처리 대상 아님 - 스킵 "
+                        f"(비밀번호 불일치: {row['password_mismatch']}, 출근일: {row['is_workday']}, "
+                        f"오늘 성공 이력: {row[f'{action_name}_done']})")
+            results[row["user_id"]] = "skipped"
             continue
+        users.append(row)
 
-        try:
-            delay = random.randint(0, 60)
-            logger.info(f"[{user_id}] [{action_name}] 랜덤 딜레이: {delay}s")
-            time.sleep(delay)
+    report({**results, **{user["user_id"]: "queued" for user in users}})
 
-            login_and_click_button(user_id, password, button_ids, action_name, attendance_id)
-            logger.info(f"[{user_id}] [{action_name}] 성공")
-            # 성공으로 상태 업데이트
-            update_attendance_record(attendance_id, "success")
+    if not users:
+        logger.info(f"[{action_name}] 처리가 필요한 사용자 없음")
+        return results
 
-        except Exception as e:
-            if "이미 출근 완료" in str(e) or "이미 처리 완료" in str(e) or "이미" in str(e):
-                logger.info(f"[{user_id}] [{action_name}] {e}")
-                # 이미 완료된 상태로 업데이트
-                update_attendance_record(attendance_id, "already_done", str(e))
-            else:
-                logger.error(f"[{user_id}] [{action_name}] 처리 중 오류: {e}")
+    engine = engine or CRAWL_ENGINE
+    if engine == "async":
+        from async_engine import AsyncCrawlEngine
+        try:
+            results.update(AsyncCrawlEngine(concurrency=CRAWL_CONCURRENCY).run(users, button_ids, action_name, progress))
+        finally:
+            flush_heartbeats()
+        return results
+
+    # 사용자별 시작 시각을 미리 분산 배정 (대기 시간이 사용자 수만큼 누적되지 않음)
+    scheduler = JitterScheduler(action_name)
+    slots = scheduler.plan(users)
 
-                # 스크린샷과 HTML 경로 추출 (에러 메시지에서)
-                screenshot_path = None
-                html_path = None
-                error_msg = str(e)
+    # 처리 구간 동안 브라우저를 재사용하기 위한 풀 (사용자마다 컨텍스트만 새로 생성)
+    browser_pool = create_browser_pool()
 
-                # 간단한 경로 추출 (개선 가능)
-                if "screenshots/" in error_msg:
-                    lines = error_msg.split('\n')
-                    for line in lines:
-                        if "screenshots/" in line and line.endswith(".png"):
-                            screenshot_path = line.split(":")[-1].strip()
-                        elif "screenshots/" in line and line.endswith(".html"):
-                            html_path = line.split(":")[-1].strip()
+    try:
+        for slot in slots:
+            scheduler.wait_until(slot)
+            scheduler.mark_started(slot)
+            report({slot.user_id: "running"})
+            status = process_single_user(slot.user_info, button_ids, action_name, browser_pool)
+            results[slot.user_id] = status
+            report({slot.user_id: status})
+    finally:
+        browser_pool.stop()
+        scheduler.report(slots)
+        flush_heartbeats()
 
-                # 실패로 상태 업데이트
-                update_attendance_record(attendance_id, "failed", error_msg)
+    return results
 
-        logger.info(f"=== {user_id} 처리 완료 ===\n")
+def flush_heartbeats():
+    """처리 구간 종료 시 남은 하트비트 저장 및 버퍼 통계 로그"""
+    heartbeat_buffer.flush()
+    logger.info(f"하트비트 버퍼 - {heartbeat_buffer.format_stats()}")
 
-def punch_in():
+def punch_in(engine=None, progress=None):
     """출근 처리"""
     logger.info("===== 출근 처리 시작 =====")
-    process_users([PUNCH_IN_BUTTON_ID], "punch_in")
+    results = process_users([PUNCH_IN_BUTTON_ID], "punch_in", engine, progress)
     logger.info("===== 출근 처리 완료 =====")
+    return results
 
-def punch_out():
+def punch_out(engine=None, progress=None):
     """퇴근 처리"""
     logger.info("===== 퇴근 처리 시작 =====")
-    process_users(PUNCH_OUT_BUTTON_IDS, "punch_out")
+    results = process_users(PUNCH_OUT_BUTTON_IDS, "punch_out", engine, progress)
     logger.info("===== 퇴근 처리 완료 =====")
+    return results
 
 # 이 파일은 크롤링 함수만 제공합니다.
 # 실행은 워치독(watchdog.py)에서 관리됩니다.
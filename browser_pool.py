@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+브라우저 풀 모듈
+출퇴근 처리 구간 동안 Chromium 프로세스를 미리 띄워두고
+사용자마다 격리된 BrowserContext만 새로 만들어 재사용
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger('auto_chultae')
+
+
+class _PooledBrowser:
+    """풀에 속한 브라우저 한 개와 사용 통계"""
+
+    def __init__(self, browser, pid, launch_latency):
+        self.browser = browser
+        self.pid = pid
+        self.launch_latency = launch_latency
+        self.contexts_served = 0
+        self.in_use = 0
+
+    def rss_mb(self):
+        """브라우저 프로세스 트리 전체의 RSS (MB)"""
+        if not PSUTIL_AVAILABLE or not self.pid:
+            return 0.0
+        try:
+            proc = psutil.Process(self.pid)
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 0.0
+
+
+class BrowserPool:
+    """
+    Chromium 브라우저 풀
+
+    sync Playwright 객체는 생성한 스레드에서만 사용할 수 있으므로
+    풀도 start()를 호출한 스레드 안에서만 사용해야 합니다.
+    """
+
+    def __init__(self, size=1, max_contexts_per_browser=20, max_rss_mb=1024, launch_args=None, headless=True):
+        self.size = max(1, size)
+        self.max_contexts_per_browser = max_contexts_per_browser
+        self.max_rss_mb = max_rss_mb
+        self.launch_args = launch_args or []
+        self.headless = headless
+
+        self._playwright = None
+        self._browsers = []
+        self._next_index = 0
+        self._lock = threading.Lock()
+
+        # 풀 통계
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "launches": 0,
+            "recycles": 0,
+            "launch_latency_total": 0.0,
+            "launch_latency_max": 0.0
+        }
+
+    def start(self):
+        """Playwright 초기화 및 브라우저 사전 실행"""
+        if self._playwright:
+            return
+        if self.max_rss_mb and not PSUTIL_AVAILABLE:
+            logger.warning(f"psutil 미설치 - RSS 한도({self.max_rss_mb}MB) 재활용 비활성화 (컨텍스트 수 한도만 적용, pip install psutil)")
+
+        self._playwright = sync_playwright().start()
+        for _ in range(self.size):
+            self._browsers.append(self._launch())
+            # 사전 실행도 브라우저를 새로 띄운 것이므로 miss로 집계 (hit 비율 과대 계산 방지)
+            self.stats["misses"] += 1
+        logger.info(f"브라우저 풀 시작 - 크기: {self.size}, 컨텍스트 한도: {self.max_contexts_per_browser}, RSS 한도: {self.max_rss_mb}MB")
+
+    def stop(self):
+        """모든 브라우저와 Playwright 종료"""
+        for pooled in self._browsers:
+            self._close_browser(pooled)
+        self._browsers = []
+
+        if self._playwright:
+            try:
+                self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Playwright 종료 실패: {e}")
+            self._playwright = None
+
+        logger.info(f"브라우저 풀 종료 - {self.format_stats()}")
+
+    def _launch(self):
+        """브라우저 실행 (실행 시간 측정)"""
+        before = self._child_pids()
+        start = time.time()
+        browser = self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+        latency = time.time() - start
+
+        # 실행 전후 자식 프로세스 비교로 브라우저 PID 추정 (RSS 측정용)
+        new_pids = self._child_pids() - before
+        pid = min(new_pids) if new_pids else None
+
+        self.stats["launches"] += 1
+        self.stats["launch_latency_total"] += latency
+        self.stats["launch_latency_max"] = max(self.stats["launch_latency_max"], latency)
+        logger.info(f"브라우저 실행 완료 (소요시간: {latency:.2f}s, PID: {pid})")
+        return _PooledBrowser(browser, pid, latency)
+
+    def _child_pids(self):
+        if not PSUTIL_AVAILABLE:
+            return set()
+        try:
+            return {child.pid for child in psutil.Process(os.getpid()).children(recursive=True)}
+        except psutil.Error:
+            return set()
+
+    def _close_browser(self, pooled):
+        try:
+            pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"브라우저 종료 실패: {e}")
+
+    def _needs_recycle(self, pooled):
+        """컨텍스트 수 또는 RSS 한도 초과 여부"""
+        if not pooled.browser.is_connected():
+            return "disconnected"
+        if self.max_contexts_per_browser and pooled.contexts_served >= self.max_contexts_per_browser:
+            return f"contexts={pooled.contexts_served}"
+        if self.max_rss_mb:
+            rss = pooled.rss_mb()
+            if rss > self.max_rss_mb:
+                return f"rss={rss:.0f}MB"
+        return None
+
+    def _checkout(self):
+        """라운드로빈으로 브라우저 선택 - 필요하면 재실행"""
+        with self._lock:
+            if not self._playwright:
+                self.start()
+
+            index = self._next_index % len(self._browsers)
+            self._next_index += 1
+            pooled = self._browsers[index]
+
+            reason = self._needs_recycle(pooled)
+            if reason and pooled.in_use == 0:
+                logger.info(f"브라우저 재활용 ({reason})")
+                self._close_browser(pooled)
+                pooled = self._launch()
+                self._browsers[index] = pooled
+                self.stats["recycles"] += 1
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+
+            pooled.contexts_served += 1
+            pooled.in_use += 1
+            return pooled
+
+    @contextmanager
+    def context(self, **context_options):
+        """격리된 BrowserContext 대여 (종료 시 컨텍스트만 닫음)"""
+        pooled = self._checkout()
+        context = None
+        try:
+            context = pooled.browser.new_context(**context_options)
+            yield context
+        finally:
+            if context:
+                try:
+                    context.close()
+                except Exception as e:
+                    logger.warning(f"브라우저 컨텍스트 종료 실패: {e}")
+            pooled.in_use -= 1
+
+    def format_stats(self):
+        """풀 통계 문자열"""
+        launches = self.stats["launches"]
+        avg_latency = self.stats["launch_latency_total"] / launches if launches else 0.0
+        return (f"hit: {self.stats['hits']}, miss: {self.stats['misses']}, "
+                f"실행: {launches}회, 재활용: {self.stats['recycles']}회, "
+                f"실행시간 평균/최대: {avg_latency:.2f}s/{self.stats['launch_latency_max']:.2f}s")
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+출퇴근 명령 작업 모듈
+/api/command 요청은 command_jobs 테이블에 작업을 등록하고 즉시 job_id 반환
+실제 출퇴근 처리는 COMMAND_JOB_EXECUTOR에 따라
+- worker: 별도 크롤링 워커 프로세스(crawl_worker.py)가 SKIP LOCKED로 작업을 가져가 처리
+- inline: 웹 서버 프로세스 안의 전용 실행기 스레드에서 처리 (워커 없이 단독 실행할 때)
+같은 명령이 대기/실행 중이면 새로 실행하지 않고 기존 작업을 반환
+테이블은 schema_command_jobs.sql
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from sqlalchemy import text
+from db_manager import db_manager
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 명령 작업 설정 (선택)
+COMMAND_JOB_EXECUTOR = os.getenv("COMMAND_JOB_EXECUTOR", "worker")                # worker: crawl_worker.py가 처리, inline: 웹 서버에서 처리
+COMMAND_JOB_LEASE_SECONDS = int(os.getenv("COMMAND_JOB_LEASE_SECONDS", "30"))     # 실행 중 작업의 updated_at 갱신 주기
+COMMAND_JOB_STALE_SECONDS = int(os.getenv("COMMAND_JOB_STALE_SECONDS", "300"))    # 갱신 없이 이 시간이 지나면 중단된 작업으로 간주
+COMMAND_JOB_POLL_SECONDS = int(os.getenv("COMMAND_JOB_POLL_SECONDS", "5"))       # 워치독 진행 상황 조회 간격
+COMMAND_JOB_TIMEOUT = int(os.getenv("COMMAND_JOB_TIMEOUT", "3600"))              # 워치독이 작업 완료를 기다리는 최대 시간
+COMMAND_JOB_CLAIM_TIMEOUT = int(os.getenv("COMMAND_JOB_CLAIM_TIMEOUT", "120"))    # 이 시간이 지나도록 대기 중이면 워치독이 즉시 실패 처리
+
+SUPPORTED_COMMANDS = ("punch_in", "punch_out")
+INFLIGHT_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("completed", "failed", "abandoned")
+
+# 등록 충돌 후 기존 작업이 바로 끝나 조회되지 않을 때 재시도 횟수
+SUBMIT_ATTEMPTS = 3
+
+
+class CommandJobQueue:
+    """명령 작업 등록/조회/점유 + 실행 (inline 모드에서는 프로세스당 전용 스레드 1개)"""
+
+    def __init__(self, executor_mode=COMMAND_JOB_EXECUTOR, lease_seconds=COMMAND_JOB_LEASE_SECONDS,
+                 stale_seconds=COMMAND_JOB_STALE_SECONDS):
+        self.executor_mode = executor_mode if executor_mode in ("worker", "inline") else "worker"
+        self.lease_seconds = lease_seconds
+        self.stale_seconds = stale_seconds
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    # ==================== 등록/조회 ====================
+
+    def submit(self, command, engine=None):
+        """
+        작업 등록 - (작업 딕셔너리, 새로 생성 여부) 반환
+        같은 명령이 대기/실행 중이면 기존 작업을 반환 (중복 실행 방지)
+        """
+        if command not in SUPPORTED_COMMANDS:
+            raise ValueError(f"알 수 없는 명령: {command}")
+
+        self.expire_stale()
+
+        for _ in range(SUBMIT_ATTEMPTS):
+            job_id = self._insert(command, engine)
+            if job_id:
+                if self.executor_mode == "inline":
+                    self._get_executor().submit(self.execute, job_id, command, engine)
+                logger.info(f"{command} 작업 등록: {job_id} "
+                            f"({'웹 서버 실행기' if self.executor_mode == 'inline' else '크롤링 워커 대기'})")
+                return self.get(job_id), True
+
+            job = self.get_inflight(command)
+            if job is not None:
+                logger.info(f"{command} 작업이 이미 진행 중 - 기존 작업 반환: {job['job_id']} ({job['status']})")
+                return job, False
+            # 조회 사이에 기존 작업이 끝난 경우 - 다시 등록
+
+        raise RuntimeError(f"{command} 작업 등록 실패 - {SUBMIT_ATTEMPTS}회 시도 동안 등록/기존 작업 조회 모두 실패")
+
+    def _insert(self, command, engine):
+        """작업 INSERT - 생성된 job_id (같은 명령이 대기/실행 중이면 None)"""
+        job_id = uuid.uuid4().hex
+        inline = self.executor_mode == "inline"
+
+        session = db_manager.get_session()
+        try:
+            # inline 모드는 바로 실행 중으로 등록 (크롤링 워커가 가져가지 않도록)
+            result = session.execute(
+                text("""
+                    INSERT INTO command_jobs (job_id, command, engine, status, started_at, owner)
+                    VALUES (:job_id, :command, :engine, :status,
+                            CASE WHEN :inline THEN NOW() END, CASE WHEN :inline THEN :owner END)
+                    ON CONFLICT (command) WHERE status IN ('queued', 'running') DO NOTHING
+                    RETURNING job_id
+                """),
+                {"job_id": job_id, "command": command, "engine": engine,
+                 "status": "running" if inline else "queued", "inline": inline, "owner": self.owner()}
+            )
+            created = result.fetchone() is not None
+            session.commit()
+            return job_id if created else None
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def get(self, job_id):
+        """작업 조회 (없으면 None)"""
+        return self._fetch_one("job_id = :value", job_id)
+
+    def get_inflight(self, command):
+        """대기/실행 중인 작업 조회 (없으면 None)"""
+        return self._fetch_one("command = :value AND status IN ('queued', 'running')", command)
+
+    def _fetch_one(self, condition, value):
+        session = db_manager.get_session()
+        try:
+            result = session.execute(
+                text(f"""
+                    SELECT job_id, command, engine, status, progress, error_message,
+                           created_at, started_at, finished_at, updated_at
+                    FROM command_jobs
+                    WHERE {condition}
+                """),
+                {"value": value}
+            )
+            row = result.fetchone()
+            return self._to_dict(row) if row else None
+        finally:
+            session.close()
+
+    @staticmethod
+    def _to_dict(row):
+        progress = row.progress or {}
+        summary = {}
+        for status in progress.values():
+            summary[status] = summary.get(status, 0) + 1
+
+        return {
+            "job_id": row.job_id,
+            "command": row.command,
+            "engine": row.engine,
+            "status": row.status,
+            "progress": progress,
+            "summary": summary,
+            "error_message": row.error_message,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "started_at": row.started_at.isoformat() if row.started_at else None,
+            "finished_at": row.finished_at.isoformat() if row.finished_at else None,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None
+        }
+
+    # ==================== 점유/만료 ====================
+
+    @staticmethod
+    def owner():
+        """작업 소유자 표시 (호스트:pid)"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def claim_next(self):
+        """
+        가장 오래된 대기 작업 하나를 실행 중으로 점유 - (job_id, command, engine) 또는 None
+        FOR UPDATE SKIP LOCKED로 여러 워커가 동시에 조회해도 같은 작업을 중복 점유하지 않음
+        """
+        session = db_manager.get_session()
+        try:
+            result = session.execute(
+                text("""
+                    UPDATE command_jobs
+                    SET status = 'running', started_at = NOW(), updated_at = NOW(), owner = :owner
+                    WHERE job_id = (
+                        SELECT job_id FROM command_jobs
+                        WHERE status = 'queued'
+                        ORDER BY created_at
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT 1
+                    )
+                    RETURNING job_id, command, engine
+                """),
+                {"owner": self.owner()}
+            )
+            row = result.fetchone()
+            session.commit()
+            return (row.job_id, row.command, row.engine) if row else None
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def expire_stale(self):
+        """
+        중단된 작업을 abandoned 처리 - 처리 건수 반환
+        - 실행 중: lease 갱신이 COMMAND_JOB_STALE_SECONDS 동안 없음 (실행 프로세스 종료 등)
+        - 대기 중: COMMAND_JOB_TIMEOUT이 지나도록 가져간 워커 없음 (크롤링 워커 미실행 등)
+        """
+        session = db_manager.get_session()
+        try:
+            result = session.execute(
+                text("""
+                    UPDATE command_jobs
+                    SET status = 'abandoned', finished_at = NOW(), updated_at = NOW(),
+                        error_message = '진행 없음 - 실행 프로세스 중단으로 간주'
+                    WHERE (status = 'running' AND updated_at < NOW() - make_interval(secs => :stale_seconds))
+                    OR (status = 'queued' AND created_at < NOW() - make_interval(secs => :queue_timeout))
+                """),
+                {"stale_seconds": self.stale_seconds, "queue_timeout": COMMAND_JOB_TIMEOUT}
+            )
+            session.commit()
+            if result.rowcount:
+                logger.warning(f"중단된 명령 작업 {result.rowcount}개 abandoned 처리")
+            return result.rowcount
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def abandon_queued(self, job_id, reason):
+        """아직 대기 중인 작업만 abandoned 처리 - 처리했으면 True (이미 워커가 가져갔으면 False)"""
+        session = db_manager.get_session()
+        try:
+            result = session.execute(
+                text("""
+                    UPDATE command_jobs
+                    SET status = 'abandoned', finished_at = NOW(), updated_at = NOW(), error_message = :reason
+                    WHERE job_id = :job_id AND status = 'queued'
+                """),
+                {"job_id": job_id, "reason": reason}
+            )
+            session.commit()
+            return result.rowcount > 0
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    # ==================== 실행 ====================
+
+    def _get_executor(self):
+        """전용 실행기 (fork된 gunicorn 워커에서는 새로 생성)"""
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="CommandJob")
+            return self._executor
+
+    def _update(self, job_id, fields, params=None):
+        session = db_manager.get_session()
+        try:
+            session.execute(
+                text(f"UPDATE command_jobs SET {fields}, updated_at = NOW() WHERE job_id = :job_id"),
+                {"job_id": job_id, **(params or {})}
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"작업 상태 업데이트 실패 ({job_id}): {e}")
+        finally:
+            session.close()
+
+    def report_progress(self, job_id, updates):
+        """사용자별 처리 상태 병합 - updates: {user_id: 상태}"""
+        if updates:
+            self._update(job_id, "progress = progress || CAST(:updates AS JSONB)",
+                         {"updates": json.dumps(updates, ensure_ascii=False)})
+
+    def _keep_lease(self, job_id, done):
+        """실행 중인 동안 updated_at 갱신 (사용자 한 명 처리가 길어도 중단된 작업으로 판정되지 않도록)"""
+        while not done.wait(self.lease_seconds):
+            self._update(job_id, "status = status")
+
+    def execute(self, job_id, command, engine, component="main_server"):
+        """점유한 작업 실행 - 사용자별 진행 상황 기록, 종료 시 completed/failed (component: 서버 하트비트 컴포넌트명)"""
+        label = "출근" if command == "punch_in" else "퇴근"
+        done = threading.Event()
+        threading.Thread(target=self._keep_lease, args=(job_id, done), daemon=True,
+                         name=f"CommandJobLease-{job_id[:8]}").start()
+        try:
+            self._execute(job_id, command, engine, label, component)
+        finally:
+            done.set()
+
+    def _execute(self, job_id, command, engine, label, component):
+        db_manager.log_server_heartbeat(
+            component=component,
+            status="processing",
+            stage=f"{command}_start",
+            user_id=None,
+            action=command
+        )
+
+        try:
+            from auto_chultae import punch_in, punch_out
+            runner = punch_in if command == "punch_in" else punch_out
+            runner(engine, progress=lambda updates: self.report_progress(job_id, updates))
+        except Exception as e:
+            logger.error(f"{label} 처리 오류 ({job_id}): {e}")
+            self._update(job_id, "status = 'failed', finished_at = NOW(), error_message = :error",
+                         {"error": str(e)})
+            db_manager.log_server_heartbeat(
+                component=component,
+                status="error",
+                stage=f"{command}_error",
+                user_id=None,
+                action=command
+            )
+            return
+
+        self._update(job_id, "status = 'completed', finished_at = NOW()")
+        logger.info(f"{label} 처리 완료 ({job_id})")
+        db_manager.log_server_heartbeat(
+            component=component,
+            status="completed",
+            stage=f"{command}_complete",
+            user_id=None,
+            action=command
+        )
+
+
+class CommandJobNotClaimed(RuntimeError):
+    """대기 중인 작업을 가져갈 크롤링 워커가 없음 (워커 미실행/중단)"""
+
+
+def wait_for_command_job(main_server_url, job_id, timeout=COMMAND_JOB_TIMEOUT, poll_interval=COMMAND_JOB_POLL_SECONDS,
+                         claim_timeout=COMMAND_JOB_CLAIM_TIMEOUT):
+    """
+    워치독용 - GET /api/jobs/<job_id>를 주기적으로 조회해 작업 종료까지 대기
+    반환: 종료된 작업 딕셔너리 (시간 초과 시 None)
+    작업이 아직 대기 중인데 크롤링 워커가 응답 없음(server_status)이거나 claim_timeout이 지나면
+    작업을 abandoned 처리하고 CommandJobNotClaimed 발생 - 출퇴근 시간대를 넘기도록 기다리지 않음
+    """
+    import requests
+    from server_status import server_status
+
+    started = time.monotonic()
+    deadline = started + timeout
+    while time.monotonic() < deadline:
+        response = requests.get(f"{main_server_url}/api/jobs/{job_id}", timeout=10)
+        if response.status_code == 404:
+            raise RuntimeError(f"작업을 찾을 수 없음: {job_id}")
+        response.raise_for_status()
+
+        job = response.json()
+        if job["status"] in FINISHED_STATUSES:
+            return job
+
+        if job["status"] == "queued":
+            waited = time.monotonic() - started
+            try:
+                worker = server_status.get_component("crawl_worker")
+            except Exception as e:
+                logger.debug(f"크롤링 워커 상태 조회 실패: {e}")
+                worker = None
+            reason = None
+            if worker and not worker["alive"]:
+                reason = (f"크롤링 워커 응답 없음 (상태: {worker['status']}, 마지막 하트비트: {worker['last_seen']}) - "
+                          f"작업 {job_id} 대기 중")
+            elif waited > claim_timeout:
+                reason = f"작업 {job_id}이 {waited:.0f}초 동안 대기 중 - 가져간 크롤링 워커 없음"
+
+            # 나중에 뜬 워커가 출퇴근 시간대를 넘겨 처리하지 않도록 abandoned 처리 후 실패
+            # (그사이 워커가 가져갔으면 계속 대기)
+            if reason and command_job_queue.abandon_queued(job_id, reason):
+                raise CommandJobNotClaimed(reason)
+
+        time.sleep(poll_interval)
+
+    return None
+
+
+# 전역 명령 작업 큐 인스턴스
+command_job_queue = CommandJobQueue()
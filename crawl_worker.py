@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Auto Chultae 크롤링 워커
+웹 서버(gunicorn)와 분리된 프로세스에서 command_jobs 대기 작업을 SKIP LOCKED로 가져와 출퇴근 처리
+- 웹 서버는 /api/command로 작업 등록만 하고 (COMMAND_JOB_EXECUTOR=worker) 바로 응답
+- 워커를 여러 개 띄워도 같은 작업을 중복 처리하지 않음
+실행: python crawl_worker.py
+"""
+
+import os
+import sys
+import time
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from db_manager import db_manager
+from command_jobs import command_job_queue
+from timeout_advisor import timeout_advisor
+from auto_chultae import logger
+
+# .env 파일 로드
+load_dotenv()
+
+# 크롤링 워커 설정 (선택)
+CRAWL_WORKER_JOBS = int(os.getenv("CRAWL_WORKER_JOBS", "1"))                   # 동시에 실행할 작업 수 (작업 안의 사용자 동시성은 CRAWL_ENGINE/CRAWL_CONCURRENCY)
+CRAWL_WORKER_POLL_SECONDS = float(os.getenv("CRAWL_WORKER_POLL_SECONDS", "2"))  # 대기 작업 조회 간격
+CRAWL_WORKER_HEARTBEAT_SECONDS = 30                                             # 서버 하트비트/만료 작업 정리 주기
+
+WORKER_COMPONENT = "crawl_worker"
+
+
+class CrawlWorker:
+    """command_jobs 대기 작업을 가져와 최대 max_jobs개까지 동시에 실행"""
+
+    def __init__(self, max_jobs=CRAWL_WORKER_JOBS, poll_seconds=CRAWL_WORKER_POLL_SECONDS):
+        self.max_jobs = max(1, max_jobs)
+        self.poll_seconds = poll_seconds
+        self.executor = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="CrawlJob")
+        self.active = {}  # job_id -> Future
+        self.stop_event = threading.Event()
+        self._last_heartbeat = 0.0
+
+    def _reap(self):
+        """끝난 작업 정리"""
+        for job_id, future in list(self.active.items()):
+            if future.done():
+                del self.active[job_id]
+                if future.exception():
+                    logger.error(f"작업 실행 오류 ({job_id}): {future.exception()}")
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        if now - self._last_heartbeat < CRAWL_WORKER_HEARTBEAT_SECONDS:
+            return
+        self._last_heartbeat = now
+
+        db_manager.log_server_heartbeat(
+            component=WORKER_COMPONENT,
+            status="processing" if self.active else "running",
+            stage=f"jobs_{len(self.active)}" if self.active else "waiting",
+            user_id=None,
+            action=None
+        )
+        try:
+            command_job_queue.expire_stale()
+        except Exception as e:
+            logger.warning(f"만료 작업 정리 실패: {e}")
+
+    def _claim(self):
+        """빈 슬롯만큼 대기 작업 점유 후 실행 - 점유한 작업 수 반환"""
+        claimed = 0
+        while len(self.active) < self.max_jobs and not self.stop_event.is_set():
+            job = command_job_queue.claim_next()
+            if job is None:
+                break
+            job_id, command, engine = job
+            logger.info(f"작업 점유: {job_id} ({command}, 엔진: {engine or '기본'})")
+            self.active[job_id] = self.executor.submit(
+                command_job_queue.execute, job_id, command, engine, WORKER_COMPONENT
+            )
+            claimed += 1
+        return claimed
+
+    def run(self):
+        logger.info(f"크롤링 워커 시작 - 동시 작업 {self.max_jobs}개, 조회 간격 {self.poll_seconds}초")
+
+        while not self.stop_event.is_set():
+            self._reap()
+            self._heartbeat()
+            # 적응형 타임아웃 통계는 출퇴근 흐름 밖에서 미리 갱신 (주기 내에는 아무 작업 없음)
+            timeout_advisor.refresh_async()
+
+            try:
+                if self._claim():
+                    continue
+            except Exception as e:
+                logger.warning(f"대기 작업 조회 실패: {e}")
+
+            self.stop_event.wait(self.poll_seconds)
+
+        # 새 작업은 받지 않고 실행 중인 작업은 끝까지 처리 (중간에 끊으면 출퇴근 상태가 불분명해짐)
+        if self.active:
+            logger.info(f"실행 중인 작업 {len(self.active)}개 완료 대기 후 종료")
+        self.executor.shutdown(wait=True)
+
+        db_manager.log_server_heartbeat(
+            component=WORKER_COMPONENT,
+            status="stopped",
+            stage="shutdown",
+            user_id=None,
+            action=None
+        )
+        logger.info("크롤링 워커 종료")
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    """크롤링 워커 시작"""
+    worker = CrawlWorker()
+
+    def signal_handler(signum, frame):
+        logger.info("종료 신호 수신 - 새 작업 점유 중단")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    if not db_manager.test_connection():
+        logger.error("데이터베이스 연결 실패!")
+        sys.exit(1)
+
+    db_manager.log_system("INFO", WORKER_COMPONENT, "크롤링 워커 시작")
+    worker.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,15 +4,23 @@
 """
 
 import os
+import sys
+import json
+import base64
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from contextlib import contextmanager
 import threading
 import queue
-from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, String, Boolean, DateTime, Text
+import time
+from sqlalchemy import create_engine, text, insert, or_, MetaData, Table, Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool, NullPool
+from sqlalchemy.exc import SQLAlchemyError, OperationalError, InterfaceError, TimeoutError as PoolTimeoutError
 from dotenv import load_dotenv
+from session_cache import session_cache
+from log_spill import LogSpill
 
 load_dotenv()
 
@@ -21,31 +29,253 @@ DB_URL = os.getenv("DATABASE_URL")
 if not DB_URL:
     raise ValueError("DATABASE_URL 환경변수가 설정되지 않았습니다. .env 파일에 DATABASE_URL을 설정해주세요.")
 
+# 프로세스 역할별 연결 풀 프로필
+# 사용자별 크롤링 서브프로세스가 모두 큰 풀을 가지면 max_connections를 초과하므로 역할에 맞게 축소
+# (pool_size=0은 NullPool - 사용할 때만 연결하고 반납 즉시 종료, PgBouncer 앞단에서 권장)
+POOL_PROFILES = {
+    "api": {"pool_size": 5, "max_overflow": 5},        # gunicorn 워커 (요청 처리)
+    "watchdog": {"pool_size": 2, "max_overflow": 3},   # 스케줄러 (주기 작업만)
+    "crawler": {"pool_size": 4, "max_overflow": 4},    # 크롤링 워커 (작업 점유 + 사용자별 동시 처리)
+    "worker": {"pool_size": 0, "max_overflow": 0},     # 사용자 1명 처리 후 종료하는 서브프로세스
+    "default": {"pool_size": 2, "max_overflow": 2}     # CLI 등 기타
+}
+
+
+def detect_pool_role():
+    """DB_POOL_ROLE 환경변수 우선, 없으면 실행 인자로 역할 추정"""
+    role = os.getenv("DB_POOL_ROLE")
+    if role:
+        return role if role in POOL_PROFILES else "default"
+
+    script = os.path.basename(sys.argv[0]) if sys.argv else ""
+    if "--user" in sys.argv:
+        return "worker"
+    if script.startswith("watchdog"):
+        return "watchdog"
+    if script == "crawl_worker.py":
+        return "crawler"
+    if "gunicorn" in script or script in ("main_server.py", "web_api.py"):
+        return "api"
+    return "default"
+
+
+class PoolMetrics:
+    """연결 풀 대기/사용 통계 (체크아웃 대기 시간, 타임아웃, 사용 중/오버플로 연결 수)"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, waited, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            if timed_out:
+                self.timeouts += 1
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """체크아웃 대기 시간을 기록하는 QueuePool"""
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record(time.monotonic() - started, timed_out=True)
+            raise
+        pool_metrics.record(time.monotonic() - started)
+        return connection
+
+
+class InstrumentedNullPool(NullPool):
+    """연결 생성 시간을 기록하는 NullPool"""
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.record(time.monotonic() - started, timed_out=True)
+            raise
+        pool_metrics.record(time.monotonic() - started)
+        return connection
+
+
+DB_POOL_ROLE = detect_pool_role()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or POOL_PROFILES[DB_POOL_ROLE]["pool_size"])
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or POOL_PROFILES[DB_POOL_ROLE]["max_overflow"])
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT") or 30)
+
+if DB_POOL_SIZE > 0:
+    pool_options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,    # 연결 대기 타임아웃
+        "pool_recycle": 300
+    }
+else:
+    pool_options = {"poolclass": InstrumentedNullPool}
+
 # SQLAlchemy 설정 (데드락 방지 강화)
 engine = create_engine(
     DB_URL,
     pool_pre_ping=True,
-    pool_recycle=300,
-    pool_size=10,           # 연결 풀 크기 증가
-    max_overflow=20,        # 최대 오버플로 연결
-    pool_timeout=30,        # 연결 대기 타임아웃
-    connect_args={"connect_timeout": 10}  # PostgreSQL 연결 타임아웃
+    connect_args={"connect_timeout": 10},  # PostgreSQL 연결 타임아웃
+    **pool_options
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# 비동기 로그 큐 설정 (선택)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))          # 08:00 일괄 처리 등 순간 폭주 대비
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "200"))            # 한 번에 저장할 최대 로그 수
+LOG_BATCH_WAIT_MS = int(os.getenv("LOG_BATCH_WAIT_MS", "200"))      # 배치를 채우기 위해 기다리는 최대 시간
+LOG_QUEUE_HIGH_WATER = int(os.getenv("LOG_QUEUE_HIGH_WATER", str(LOG_QUEUE_SIZE * 8 // 10)))  # 이 이상 쌓이면 디스크로 스필
+LOG_SPILL_REPLAY_INTERVAL = int(os.getenv("LOG_SPILL_REPLAY_INTERVAL", "30"))  # 초 - DB 복구 확인/재전송 주기
+
+# DB 연결 불가로 판단하는 예외 (데이터 오류와 달리 재시도하면 성공할 수 있어 스필 대상)
+DB_UNAVAILABLE_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
 Base = declarative_base()
 
+# 일괄 INSERT용 테이블 정의 (SQLAlchemy Core insert().values(rows)로 다중 행 INSERT)
+metadata = MetaData()
+
+heartbeat_status_table = Table(
+    "heartbeat_status", metadata,
+    Column("stage", String(100)),
+    Column("user_id", String(100)),
+    Column("action_type", String(50)),
+    Column("pid", Integer),
+    Column("timestamp", DateTime),
+    Column("attendance_log_id", Integer)
+)
+
+system_logs_table = Table(
+    "system_logs", metadata,
+    Column("log_level", String(20)),
+    Column("component", String(50)),
+    Column("stage", String(100)),
+    Column("message", Text),
+    Column("user_id", String(100)),
+    Column("action_type", String(50)),
+    Column("created_at", DateTime)
+)
+
+server_heartbeat_table = Table(
+    "server_heartbeat", metadata,
+    Column("component", String(50), primary_key=True),
+    Column("status", String(50)),
+    Column("pid", Integer),
+    Column("stage", String(100)),
+    Column("user_id", String(100)),
+    Column("action", String(50)),
+    Column("timestamp", DateTime),
+    Column("updated_at", DateTime)
+)
+
 logger = logging.getLogger(__name__)
 
+
+def day_range(date_from=None, date_to=None):
+    """
+    날짜 조건을 반열림 타임스탬프 구간 [시작, 끝)으로 변환
+    (DATE(컬럼) = :date 대신 컬럼 >= :start AND 컬럼 < :end 로 조회해야 인덱스 사용 가능)
+
+    date_from/date_to는 date 또는 'YYYY-MM-DD' 문자열, 둘 다 생략하면 오늘 하루
+    """
+    def to_datetime(value):
+        if isinstance(value, str):
+            return datetime.strptime(value, '%Y-%m-%d')
+        return datetime.combine(value, datetime.min.time())
+
+    if date_from is None and date_to is None:
+        date_from = date_to = datetime.now().date()
+
+    start = to_datetime(date_from) if date_from is not None else None
+    end = to_datetime(date_to) + timedelta(days=1) if date_to is not None else None
+    return start, end
+
+
+# 목록 조회 API 페이지 크기 (요청 limit은 1..PAGE_LIMIT_MAX로 보정)
+PAGE_LIMIT_DEFAULT = 50
+PAGE_LIMIT_MAX = 200
+
+
+def encode_cursor(sort_value, row_id):
+    """
+    키셋 페이지네이션 커서 생성 - 마지막 행의 (정렬 시각, id)를 불투명 문자열로 인코딩
+    (OFFSET 대신 이 위치 다음부터 조회하므로 깊은 페이지도 첫 페이지와 같은 비용)
+    """
+    payload = json.dumps({"t": sort_value.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """커서 문자열을 (정렬 시각, id)로 복원 - 형식이 잘못되면 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(payload["t"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+
+
+def clamp_limit(limit, default=PAGE_LIMIT_DEFAULT):
+    """요청 파라미터 limit을 1..PAGE_LIMIT_MAX 범위로 보정 (없거나 숫자가 아니면 기본값)"""
+    if limit is None:
+        return default
+    return max(1, min(limit, PAGE_LIMIT_MAX))
+
+
+def split_page(rows, limit, sort_key):
+    """
+    limit + 1개로 조회한 행을 (현재 페이지, 다음 커서)로 분리
+    sort_key(row) -> (정렬 시각, id), 다음 페이지가 없으면 커서는 None
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    if not page:
+        return page, None
+    return page, encode_cursor(*sort_key(page[-1]))
+
 class DatabaseManager:
     def __init__(self):
         self.engine = engine
         self.SessionLocal = SessionLocal
         # 비동기 로깅을 위한 큐와 워커 스레드 (데드락 방지)
-        self.log_queue = queue.Queue(maxsize=1000)
+        self.log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
         self.log_worker_running = False
         self.log_worker_thread = None
+        self.log_stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "max_batch": 0,
+            "spilled": 0,
+            "replayed": 0
+        }
+        self._log_stats_lock = threading.Lock()
+        # DB 장애 시 로그를 보관하는 디스크 스필 버퍼
+        self.log_spill = LogSpill()
+        self._db_down_since = None
+        self._last_spill_check = 0.0
         self._start_log_worker()
 
+    def _count_log(self, key, amount=1):
+        with self._log_stats_lock:
+            self.log_stats[key] += amount
+
     def _start_log_worker(self):
         """로그 워커 스레드 시작 (백그라운드에서 비동기 로깅 처리)"""
         if self.log_worker_running:
@@ -61,30 +291,237 @@ class DatabaseManager:
         logger.debug("DB 로그 워커 스레드 시작됨")
 
     def _log_worker(self):
-        """로그 워커 스레드 - 큐에서 로그 항목을 가져와 DB에 저장"""
+        """로그 워커 스레드 - 큐에서 최대 LOG_BATCH_SIZE개 또는 LOG_BATCH_WAIT_MS 동안 모아 한 번에 저장"""
         while self.log_worker_running:
             try:
-                # 0.1초 타임아웃으로 큐에서 로그 항목 대기
+                # 0.1초 타임아웃으로 첫 로그 항목 대기
                 log_item = self.log_queue.get(timeout=0.1)
+            except queue.Empty:
+                # 타임아웃 - 한가한 동안 스필된 로그 재전송
+                try:
+                    self._maybe_replay_spill()
+                except Exception as e:
+                    logger.error(f"로그 스필 재전송 오류: {e}")
+                continue
 
-                if log_item is None:  # 종료 신호
+            batch = []
+            stopping = log_item is None  # 종료 신호
+            if not stopping:
+                batch.append(log_item)
+            self.log_queue.task_done()
+
+            # 배치 채우기 (크기 또는 대기 시간 도달까지)
+            deadline = time.monotonic() + LOG_BATCH_WAIT_MS / 1000
+            while not stopping and len(batch) < LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    log_item = self.log_queue.get(timeout=remaining)
+                except queue.Empty:
                     break
-
-                # 로그 타입에 따라 처리
-                if log_item['type'] == 'system':
-                    self._write_system_log(log_item)
-                elif log_item['type'] == 'heartbeat':
-                    self._write_heartbeat_log(log_item)
-
                 self.log_queue.task_done()
+                if log_item is None:
+                    stopping = True
+                else:
+                    batch.append(log_item)
 
-            except queue.Empty:
-                # 타임아웃 - 계속 진행
-                continue
+            if stopping:
+                # 종료 전 큐에 남은 로그까지 함께 저장
+                batch.extend(self._drain_log_queue())
+
+            try:
+                if self._db_down_since is not None:
+                    # DB 장애 중에는 연결 타임아웃을 기다리지 않고 바로 디스크에 보관
+                    self._spill_logs(batch)
+                else:
+                    self._write_log_batch(batch)
+                self._maybe_replay_spill()
             except Exception as e:
                 logger.error(f"로그 워커 오류: {e}")
 
-        logger.debug("DB 로그 워커 스레드 종료됨")
+            if stopping:
+                break
+
+        # 종료 신호 전에 루프가 끝난 경우에도 남은 로그 저장
+        try:
+            remaining = self._drain_log_queue()
+            if self._db_down_since is not None:
+                self._spill_logs(remaining)
+            else:
+                self._write_log_batch(remaining)
+        except Exception as e:
+            logger.error(f"로그 워커 종료 중 저장 오류: {e}")
+        self.log_spill.close()
+
+        logger.debug(f"DB 로그 워커 스레드 종료됨 - {self.format_log_stats()}")
+
+    def _drain_log_queue(self):
+        """큐에 남은 로그 항목을 대기 없이 모두 꺼냄"""
+        items = []
+        while True:
+            try:
+                log_item = self.log_queue.get_nowait()
+            except queue.Empty:
+                return items
+            self.log_queue.task_done()
+            if log_item is not None:
+                items.append(log_item)
+
+    def _insert_log_batch(self, batch):
+        """
+        로그 배치를 한 트랜잭션에서 저장 - 실패 시 예외 발생
+        - system_logs: 다중 행 INSERT 한 번
+        - server_heartbeat: 컴포넌트별 마지막 상태만 남겨 다중 행 UPSERT 한 번
+          (재전송된 오래된 하트비트가 더 최근 행을 덮어쓰지 않도록 timestamp가 더 새로울 때만 갱신)
+        반환: (저장한 행 수, 병합된 하트비트 수)
+        """
+        # 발생 시각은 큐 적재 시점 값 사용 (스필 후 재전송돼도 원래 시각 유지, 이전 스필 파일은 현재 시각)
+        system_rows = [
+            {**item['data'], "created_at": item['data'].get("created_at") or datetime.now()}
+            for item in batch if item['type'] == 'system'
+        ]
+        heartbeat_rows = {}
+        heartbeat_count = 0
+        for item in batch:
+            if item['type'] == 'heartbeat':
+                heartbeat_rows[item['data']['component']] = item['data']
+                heartbeat_count += 1
+
+        session = self.get_session()
+        try:
+            if system_rows:
+                session.execute(insert(system_logs_table).values(system_rows))
+
+            if heartbeat_rows:
+                stmt = pg_insert(server_heartbeat_table).values(list(heartbeat_rows.values()))
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["component"],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in ("status", "pid", "stage", "user_id", "action", "timestamp", "updated_at")
+                    },
+                    where=or_(
+                        server_heartbeat_table.c.timestamp.is_(None),
+                        server_heartbeat_table.c.timestamp < stmt.excluded.timestamp
+                    )
+                )
+                session.execute(stmt)
+
+            session.commit()
+            return len(system_rows) + len(heartbeat_rows), heartbeat_count - len(heartbeat_rows)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _write_log_batch(self, batch, spill_on_unavailable=True):
+        """
+        로그 배치 저장
+        - DB 연결 불가: 배치 전체를 디스크 스필 (spill_on_unavailable=False면 예외 전달)
+        - 그 외 오류: 항목별 저장으로 재시도 (문제 행 하나 때문에 전체가 유실되지 않도록)
+        """
+        if not batch:
+            return
+
+        try:
+            written, coalesced = self._insert_log_batch(batch)
+            with self._log_stats_lock:
+                self.log_stats["written"] += written
+                self.log_stats["coalesced"] += coalesced
+                self.log_stats["batches"] += 1
+                self.log_stats["max_batch"] = max(self.log_stats["max_batch"], len(batch))
+            return
+
+        except DB_UNAVAILABLE_ERRORS as e:
+            if not spill_on_unavailable:
+                raise
+            self._mark_db_down(e)
+            self._spill_logs(batch)
+            return
+
+        except SQLAlchemyError as e:
+            logger.warning(f"로그 배치 저장 실패 - 항목별 저장으로 재시도 ({len(batch)}개): {e}")
+
+        for item in batch:
+            if item['type'] == 'system':
+                ok = self._write_system_log(item)
+            else:
+                ok = self._write_heartbeat_log(item)
+            self._count_log("written" if ok else "dropped")
+
+    def _spill_logs(self, items):
+        """로그 항목을 디스크 스필 버퍼에 보관"""
+        if not items:
+            return
+        if self.log_spill.append(items):
+            self._count_log("spilled", len(items))
+        else:
+            self._count_log("dropped", len(items))
+
+    def _mark_db_down(self, error):
+        if self._db_down_since is None:
+            self._db_down_since = time.monotonic()
+            self._last_spill_check = time.monotonic()
+            logger.error(f"DB 연결 불가 - 복구될 때까지 로그를 디스크에 보관 ({self.log_spill.spill_dir}): {error}")
+
+    def _maybe_replay_spill(self):
+        """LOG_SPILL_REPLAY_INTERVAL마다 DB 복구 확인 후 스필된 로그를 일괄 재전송"""
+        now = time.monotonic()
+        if now - self._last_spill_check < LOG_SPILL_REPLAY_INTERVAL:
+            return
+        self._last_spill_check = now
+
+        if self._db_down_since is not None:
+            try:
+                with self.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+            except SQLAlchemyError:
+                return
+            logger.info(f"DB 연결 복구 - 장애 시간 {now - self._db_down_since:.0f}초, 스필된 로그 재전송 시작")
+            self._db_down_since = None
+
+        if not self.log_spill.has_pending():
+            return
+
+        try:
+            replayed = self.log_spill.replay(
+                lambda items: self._write_log_batch(items, spill_on_unavailable=False),
+                LOG_BATCH_SIZE
+            )
+        except DB_UNAVAILABLE_ERRORS as e:
+            self._mark_db_down(e)
+            return
+        self._count_log("replayed", replayed)
+
+    def get_log_stats(self):
+        """로그 큐 통계 (적재/저장/드롭/병합 수, 배치 크기)"""
+        with self._log_stats_lock:
+            stats = dict(self.log_stats)
+        stats["queue_size"] = self.log_queue.qsize()
+        stats["avg_batch"] = round((stats["written"] + stats["coalesced"]) / stats["batches"], 1) if stats["batches"] else 0.0
+        return stats
+
+    def get_log_health(self):
+        """로그 큐 상태 (워커 동작 여부, 대기/한도, DB 장애 지속 시간, 스필 대기 여부)"""
+        stats = self.get_log_stats()
+        return {
+            "worker_alive": bool(self.log_worker_thread and self.log_worker_thread.is_alive()),
+            "queue_size": stats["queue_size"],
+            "queue_high_water": LOG_QUEUE_HIGH_WATER,
+            "dropped": stats["dropped"],
+            "spilled": stats["spilled"],
+            "spill_pending": self.log_spill.has_pending(),
+            "db_down_seconds": round(time.monotonic() - self._db_down_since) if self._db_down_since is not None else None
+        }
+
+    def format_log_stats(self):
+        """로그 큐 통계 문자열"""
+        stats = self.get_log_stats()
+        return (f"적재: {stats['enqueued']}, 저장: {stats['written']} ({stats['batches']}배치, 평균 {stats['avg_batch']}개, "
+                f"최대 {stats['max_batch']}개), 병합: {stats['coalesced']}, 스필: {stats['spilled']}, "
+                f"재전송: {stats['replayed']}, 드롭: {stats['dropped']}, 대기: {stats['queue_size']}")
 
     def _write_system_log(self, log_item):
         """시스템 로그 실제 DB 저장"""
@@ -93,15 +530,17 @@ class DatabaseManager:
             session.execute(
                 text("""
                     INSERT INTO system_logs
-                    (log_level, component, stage, message, user_id, action_type)
-                    VALUES (:log_level, :component, :stage, :message, :user_id, :action_type)
+                    (log_level, component, stage, message, user_id, action_type, created_at)
+                    VALUES (:log_level, :component, :stage, :message, :user_id, :action_type, COALESCE(:created_at, NOW()))
                 """),
-                log_item['data']
+                {"created_at": None, **log_item['data']}
             )
             session.commit()
+            return True
         except SQLAlchemyError as e:
             session.rollback()
             logger.error(f"시스템 로그 저장 실패: {e}")
+            return False
         finally:
             session.close()
 
@@ -122,13 +561,16 @@ class DatabaseManager:
                         action = EXCLUDED.action,
                         timestamp = EXCLUDED.timestamp,
                         updated_at = EXCLUDED.updated_at
+                    WHERE server_heartbeat.timestamp IS NULL OR server_heartbeat.timestamp < EXCLUDED.timestamp
                 """),
                 log_item['data']
             )
             session.commit()
+            return True
         except SQLAlchemyError as e:
             session.rollback()
             logger.error(f"하트비트 로그 저장 실패: {e}")
+            return False
         finally:
             session.close()
 
@@ -144,12 +586,36 @@ class DatabaseManager:
         except queue.Full:
             pass
 
-        # 워커 스레드 종료 대기
+        # 워커 스레드 종료 대기 (남은 로그 저장 포함)
         if self.log_worker_thread and self.log_worker_thread.is_alive():
-            self.log_worker_thread.join(timeout=2.0)
+            self.log_worker_thread.join(timeout=5.0)
 
         logger.debug("DB 로그 워커 종료 완료")
 
+    def get_pool_stats(self):
+        """연결 풀 통계 (역할, 크기, 사용 중/오버플로 연결 수, 체크아웃 대기 시간)"""
+        pool = self.engine.pool
+        with pool_metrics._lock:
+            checkouts = pool_metrics.checkouts
+            stats = {
+                "role": DB_POOL_ROLE,
+                "pool_class": type(pool).__name__,
+                "checkouts": checkouts,
+                "timeouts": pool_metrics.timeouts,
+                "wait_avg_ms": round(pool_metrics.wait_total / checkouts * 1000, 1) if checkouts else 0.0,
+                "wait_max_ms": round(pool_metrics.wait_max * 1000, 1)
+            }
+
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "max_overflow": DB_MAX_OVERFLOW,
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0)
+            })
+        return stats
+
     def get_session(self):
         """데이터베이스 세션 반환"""
         return self.SessionLocal()
@@ -244,6 +710,23 @@ class DatabaseManager:
         finally:
             session.close()
 
+    def _enqueue_log(self, log_item):
+        """
+        로그 항목을 큐에 추가 (블로킹 없음)
+        큐가 LOG_QUEUE_HIGH_WATER 이상 쌓였거나 가득 차면 드롭하지 않고 디스크 스필 버퍼에 보관
+        """
+        if self.log_queue.qsize() < LOG_QUEUE_HIGH_WATER:
+            try:
+                self.log_queue.put_nowait(log_item)
+                self._count_log("enqueued")
+                return True
+            except queue.Full:
+                pass
+
+        logger.debug(f"로그 큐 포화 ({self.log_queue.qsize()}개) - 디스크 스필: {log_item['data'].get('component')}")
+        self._spill_logs([log_item])
+        return True
+
     def log_system(self, log_level, component, message, stage=None, user_id=None, action_type=None):
         """시스템 로그 저장 (비동기 큐 사용)"""
         try:
@@ -255,17 +738,13 @@ class DatabaseManager:
                     "stage": stage,
                     "message": message,
                     "user_id": user_id,
-                    "action_type": action_type
+                    "action_type": action_type,
+                    "created_at": datetime.now()
                 }
             }
 
-            # 큐가 가득 차면 블로킹하지 않고 즉시 실패
-            self.log_queue.put_nowait(log_item)
-            return True
+            return self._enqueue_log(log_item)
 
-        except queue.Full:
-            logger.warning(f"로그 큐가 가득참 - 시스템 로그 드롭: {component}")
-            return False
         except Exception as e:
             logger.error(f"시스템 로그 큐 추가 실패: {e}")
             return False
@@ -318,21 +797,22 @@ class DatabaseManager:
         """오늘자 성공 출퇴근 이력이 있는지 확인"""
         session = self.get_session()
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
+            day_start, day_end = day_range()
             result = session.execute(
                 text("""
-                    SELECT COUNT(*) as count
-                    FROM attendance_logs
-                    WHERE user_id = :user_id
-                    AND action_type = :action_type
-                    AND status IN ('success', 'already_done')
-                    AND DATE(attempt_time) = :today
+                    SELECT EXISTS (
+                        SELECT 1
+                        FROM attendance_logs
+                        WHERE user_id = :user_id
+                        AND action_type = :action_type
+                        AND status IN ('success', 'already_done')
+                        AND attempt_time >= :day_start AND attempt_time < :day_end
+                    )
                 """),
-                {"user_id": user_id, "action_type": action_type, "today": today}
+                {"user_id": user_id, "action_type": action_type, "day_start": day_start, "day_end": day_end}
             )
 
-            count = result.fetchone()
-            return count[0] > 0 if count else False
+            return bool(result.scalar())
 
         except SQLAlchemyError as e:
             logger.error(f"오늘자 성공 이력 확인 실패: {e}")
@@ -341,6 +821,93 @@ class DatabaseManager:
             session.close()
 
 
+    def get_punch_eligibility(self, action_type, date=None, user_id=None):
+        """
+        활성 사용자별 출퇴근 대상 여부를 한 번의 쿼리로 조회
+        (사용자마다 is_workday_scheduled/has_today_success/is_password_mismatch를 호출하던 N+1 대체)
+
+        eligible 판정 (워치독 기준):
+        - punch_in: 출근일 + 오늘 출근 성공 이력 없음 + 비밀번호 정상
+        - punch_out: 오늘 출근 성공 이력 있음 + 퇴근 성공 이력 없음 + 비밀번호 정상 (스케줄 무관)
+        """
+        if date is None:
+            date = datetime.now().date()
+        day_start, day_end = day_range(date, date)
+
+        query = """
+            SELECT u.user_id,
+                   u.password,
+                   COALESCE(u.password_mismatch, false) AS password_mismatch,
+                   COALESCE(s.is_workday, :default_workday) AS is_workday,
+                   EXISTS (
+                       SELECT 1 FROM attendance_logs a
+                       WHERE a.user_id = u.user_id
+                       AND a.action_type = 'punch_in'
+                       AND a.status IN ('success', 'already_done')
+                       AND a.attempt_time >= :day_start AND a.attempt_time < :day_end
+                   ) AS punch_in_done,
+                   EXISTS (
+                       SELECT 1 FROM attendance_logs a
+                       WHERE a.user_id = u.user_id
+                       AND a.action_type = 'punch_out'
+                       AND a.status IN ('success', 'already_done')
+                       AND a.attempt_time >= :day_start AND a.attempt_time < :day_end
+                   ) AS punch_out_done
+            FROM users u
+            LEFT JOIN attendance_schedules s
+                ON s.user_id = u.user_id AND s.schedule_date = :date
+            WHERE u.is_active = true
+        """
+        params = {
+            "date": date,
+            # 스케줄이 없으면 기본적으로 평일은 출근일로 간주 (is_workday_scheduled와 동일)
+            "default_workday": date.weekday() < 5,
+            "day_start": day_start,
+            "day_end": day_end
+        }
+        if user_id:
+            query += " AND u.user_id = :user_id"
+            params["user_id"] = user_id
+        query += " ORDER BY u.user_id"
+
+        session = self.get_session()
+        try:
+            result = session.execute(text(query), params)
+
+            rows = []
+            for row in result.fetchall():
+                if row.password_mismatch:
+                    skip_reason = "비밀번호 불일치"
+                elif action_type == "punch_in" and not row.is_workday:
+                    skip_reason = "휴무일"
+                elif action_type == "punch_in" and row.punch_in_done:
+                    skip_reason = "오늘 출근 완료"
+                elif action_type == "punch_out" and row.punch_out_done:
+                    skip_reason = "오늘 퇴근 완료"
+                elif action_type == "punch_out" and not row.punch_in_done:
+                    skip_reason = "오늘 출근 이력 없음"
+                else:
+                    skip_reason = None
+
+                rows.append({
+                    "user_id": row.user_id,
+                    "password": row.password,
+                    "password_mismatch": row.password_mismatch,
+                    "is_workday": row.is_workday,
+                    "punch_in_done": row.punch_in_done,
+                    "punch_out_done": row.punch_out_done,
+                    "eligible": skip_reason is None,
+                    "skip_reason": skip_reason
+                })
+            return rows
+
+        except SQLAlchemyError as e:
+            logger.error(f"출퇴근 대상 조회 실패: {e}")
+            return []
+        finally:
+            session.close()
+
+
     def get_active_users(self):
         """활성 사용자 목록 조회"""
         session = self.get_session()
@@ -467,20 +1034,27 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def get_user_change_logs(self, user_id, limit=50):
-        """특정 사용자의 변경 로그 조회"""
+    def get_user_change_logs(self, user_id, limit=50, cursor=None):
+        """
+        특정 사용자의 변경 로그 조회 (최신순, 키셋 페이지네이션)
+        cursor: 이전 페이지 마지막 행의 (changed_at, id) - 그보다 오래된 로그부터 조회
+        """
         session = self.get_session()
         try:
-            result = session.execute(
-                text("""
-                    SELECT id, user_id, changed_by, change_type, field_name, old_value, new_value, changed_at, ip_address, user_agent, notes
-                    FROM user_change_logs
-                    WHERE user_id = :user_id
-                    ORDER BY changed_at DESC
-                    LIMIT :limit
-                """),
-                {"user_id": user_id, "limit": limit}
-            )
+            query = """
+                SELECT id, user_id, changed_by, change_type, field_name, old_value, new_value, changed_at, ip_address, user_agent, notes
+                FROM user_change_logs
+                WHERE user_id = :user_id
+            """
+            params = {"user_id": user_id, "limit": limit}
+
+            if cursor:
+                query += " AND (changed_at, id) < (:cursor_time, :cursor_id)"
+                params["cursor_time"], params["cursor_id"] = cursor
+
+            query += " ORDER BY changed_at DESC, id DESC LIMIT :limit"
+
+            result = session.execute(text(query), params)
             return result.fetchall()
 
         except SQLAlchemyError as e:
@@ -516,6 +1090,9 @@ class DatabaseManager:
             if result.rowcount > 0:
                 logger.info(f"사용자 {user_id} 비밀번호 업데이트 완료")
 
+                # 저장된 로그인 세션 무효화 (이전 비밀번호로 만든 세션)
+                session_cache.invalidate(user_id)
+
                 # 변경 로그 기록
                 self.log_user_change(
                     user_id=user_id,
@@ -543,29 +1120,57 @@ class DatabaseManager:
         if date is None:
             date = datetime.now().date()
 
-        session = self.get_session()
-        try:
-            result = session.execute(
-                text("""
-                    SELECT is_workday FROM attendance_schedules
-                    WHERE user_id = :user_id AND schedule_date = :date
-                """),
-                {"user_id": user_id, "date": date}
-            )
+        # 사용자 1년치 스케줄 캐시에서 조회 (변경 시 NOTIFY로 무효화)
+        from schedule_cache import schedule_cache
 
-            row = result.fetchone()
-            if row is None:
+        try:
+            schedule = schedule_cache.get_day(user_id, date)
+            if schedule is None:
                 # 스케줄이 없으면 기본적으로 평일은 출근일로 간주
                 weekday = date.weekday()  # 0=월요일, 6=일요일
                 return weekday < 5  # 월-금요일만 출근일
 
-            return row.is_workday
+            return schedule["is_workday"]
 
         except SQLAlchemyError as e:
             logger.error(f"스케줄 확인 실패: {e}")
             # 에러 시 기본적으로 평일은 출근일로 간주
             weekday = date.weekday() if date else datetime.now().weekday()
             return weekday < 5
+
+    def create_default_schedules(self, start_date, end_date, user_ids=None):
+        """
+        기간 내 기본 스케줄(평일 출근, 주말 휴무) 일괄 생성 - INSERT ... SELECT generate_series 한 번
+        이미 있는 날짜는 유지 (ON CONFLICT DO NOTHING), user_ids 생략 시 활성 사용자 전체
+        반환: 새로 생성된 스케줄 수 (실패 시 None)
+        """
+        if user_ids is None:
+            users_query = "SELECT user_id FROM users WHERE is_active = true"
+            params = {}
+        else:
+            users_query = "SELECT unnest(CAST(:user_ids AS varchar[])) AS user_id"
+            params = {"user_ids": list(user_ids)}
+
+        session = self.get_session()
+        try:
+            result = session.execute(
+                text(f"""
+                    INSERT INTO attendance_schedules
+                    (user_id, schedule_date, is_workday, schedule_type, punch_in_time, punch_out_time)
+                    SELECT u.user_id, d::date, EXTRACT(ISODOW FROM d) < 6, 'regular', '08:00', '18:00'
+                    FROM ({users_query}) u
+                    CROSS JOIN generate_series(CAST(:start_date AS date), CAST(:end_date AS date), INTERVAL '1 day') AS d
+                    ON CONFLICT (user_id, schedule_date) DO NOTHING
+                """),
+                {**params, "start_date": start_date, "end_date": end_date}
+            )
+            session.commit()
+            return result.rowcount
+
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"기본 스케줄 일괄 생성 실패: {e}")
+            return None
         finally:
             session.close()
 
@@ -592,6 +1197,9 @@ class DatabaseManager:
             if result.rowcount > 0:
                 logger.warning(f"사용자 {user_id} 비밀번호 불일치 상태로 설정")
 
+                # 저장된 로그인 세션 무효화
+                session_cache.invalidate(user_id)
+
                 # 변경 로그 기록
                 self.log_user_change(
                     user_id=user_id,
@@ -731,13 +1339,8 @@ class DatabaseManager:
                 }
             }
 
-            # 큐가 가득 차면 블로킹하지 않고 즉시 실패
-            self.log_queue.put_nowait(log_item)
-            return True
+            return self._enqueue_log(log_item)
 
-        except queue.Full:
-            logger.warning(f"로그 큐가 가득참 - 하트비트 로그 드롭: {component}")
-            return False
         except Exception as e:
             logger.error(f"하트비트 로그 큐 추가 실패: {e}")
             return False
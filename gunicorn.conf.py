@@ -21,11 +21,15 @@ host = parsed.hostname or '127.0.0.1'
 port = parsed.port or 9000
 
 # Gunicorn 설정
+# 크롤링은 crawl_worker.py가 별도 프로세스에서 처리하므로 웹 워커는 짧은 요청 기준으로 설정
+# gevent 사용 시: pip install gevent psycogreen 후 GUNICORN_WORKER_CLASS=gevent (psycogreen으로 psycopg2 패치 필요)
 bind = f"{host}:{port}"
-workers = 2  # CPU 코어 수 * 2 (최소 2개)
-worker_class = "sync"
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))  # CPU 코어 수 * 2 (최소 2개)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '4'))  # gthread 워커당 요청 처리 스레드
 worker_connections = 1000
-timeout = 300  # 크롤링 작업은 최대 5분 소요될 수 있음
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))  # 웹 요청 기준 (크롤링은 요청 안에서 실행하지 않음)
+graceful_timeout = 30
 keepalive = 5
 max_requests = 1000
 max_requests_jitter = 100
@@ -41,7 +45,12 @@ access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
 # 프로세스 이름
 proc_name = "auto_chultae_main_server"
 
+# 워커 프로세스마다 서버 하트비트 스레드 시작 (gunicorn 실행 시 main_server.main()은 호출되지 않음)
+def post_fork(server, worker):
+    from main_server import start_heartbeat_worker
+    start_heartbeat_worker()
+
 # 디렉토리 생성
 os.makedirs("logs", exist_ok=True)
 
-print(f"Gunicorn 설정: {bind}, workers: {workers}")
\ No newline at end of file
+print(f"Gunicorn 설정: {bind}, workers: {workers}, worker_class: {worker_class}, threads: {threads}")
\ No newline at end of file
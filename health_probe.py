@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+헬스체크 프로브 모듈
+백그라운드 스레드가 HEALTH_PROBE_INTERVAL초마다 DB/로그 큐/크롤링 워커 상태를 점검해 스냅샷으로 보관
+/api/health는 스냅샷만 반환 (요청마다 DB 연결을 열지 않음), ?deep=1이면 즉시 재점검
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+from sqlalchemy import text
+from db_manager import db_manager
+from server_status import server_status
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 헬스체크 설정 (선택)
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))          # 백그라운드 점검 주기 (초)
+HEALTH_DB_TIMEOUT_MS = int(os.getenv("HEALTH_DB_TIMEOUT_MS", "2000"))           # DB 점검 쿼리 제한 시간
+
+# 스냅샷이 이보다 오래되면 프로브가 멈춘 것으로 판단 (DB 점검이 연결 대기에 걸린 경우 등)
+HEALTH_SNAPSHOT_STALE_SECONDS = HEALTH_PROBE_INTERVAL * 3
+
+
+class HealthProbe:
+    """주기적으로 상태를 점검하고 최신 스냅샷을 제공"""
+
+    def __init__(self, interval=HEALTH_PROBE_INTERVAL):
+        self.interval = interval
+        self._snapshot = None
+        self._snapshot_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    # ==================== 조회 ====================
+
+    def snapshot(self, deep=False):
+        """최신 상태 스냅샷 - deep=True면 즉시 재점검 후 반환"""
+        self._ensure_thread()
+
+        if deep or self._snapshot is None:
+            self.refresh()
+
+        with self._lock:
+            snapshot = dict(self._snapshot)
+            age = time.monotonic() - self._snapshot_at
+
+        snapshot["age_seconds"] = round(age, 2)
+        snapshot["pid"] = os.getpid()
+        if age > HEALTH_SNAPSHOT_STALE_SECONDS:
+            snapshot["status"] = "degraded"
+            snapshot["issues"] = snapshot["issues"] + [f"상태 점검 지연 ({age:.0f}초 전 스냅샷)"]
+        return snapshot
+
+    # ==================== 점검 ====================
+
+    def refresh(self):
+        """전체 점검 후 스냅샷 교체 (동시에 여러 번 점검하지 않음)"""
+        with self._refresh_lock:
+            database, crawler = self._check_database()
+            log_queue = db_manager.get_log_health()
+
+            issues = []
+            if not database["connected"]:
+                issues.append(f"DB 연결 실패: {database['error']}")
+            if not log_queue["worker_alive"]:
+                issues.append("로그 워커 중단")
+            if log_queue["queue_size"] >= log_queue["queue_high_water"]:
+                issues.append(f"로그 큐 적체 ({log_queue['queue_size']}개)")
+            if crawler and crawler.get("worker_alive") is False:
+                issues.append("크롤링 워커 응답 없음")
+
+            snapshot = {
+                "status": "unhealthy" if not database["connected"] else ("degraded" if issues else "healthy"),
+                "timestamp": datetime.now().isoformat(),
+                "database": "connected" if database["connected"] else "disconnected",
+                "database_latency_ms": database["latency_ms"],
+                "db_pool": db_manager.get_pool_stats(),
+                "log_queue": log_queue,
+                "crawler": crawler,
+                "issues": issues
+            }
+
+            with self._lock:
+                self._snapshot = snapshot
+                self._snapshot_at = time.monotonic()
+
+    def _check_database(self):
+        """SELECT 1 (제한 시간 적용) + 크롤링 워커 상태/작업 대기열 조회 - (DB 상태, 크롤링 상태)"""
+        started = time.monotonic()
+        session = db_manager.get_session()
+        try:
+            session.execute(text(f"SET LOCAL statement_timeout = {HEALTH_DB_TIMEOUT_MS}"))
+            session.execute(text("SELECT 1"))
+            database = {"connected": True, "latency_ms": round((time.monotonic() - started) * 1000, 1), "error": None}
+            crawler = self._check_crawler(session)
+            session.commit()
+            return database, crawler
+        except Exception as e:
+            session.rollback()
+            return {"connected": False, "latency_ms": None, "error": str(e)}, None
+        finally:
+            session.close()
+
+    def _check_crawler(self, session):
+        """크롤링 워커 생존 여부(server_status)와 명령 작업 대기/실행 수 (테이블이 없으면 None)"""
+        try:
+            worker = server_status.get_component("crawl_worker")
+            with session.begin_nested():
+                jobs = session.execute(
+                    text("""
+                        SELECT
+                            COUNT(*) FILTER (WHERE status = 'queued') AS queued,
+                            COUNT(*) FILTER (WHERE status = 'running') AS running
+                        FROM command_jobs
+                        WHERE status IN ('queued', 'running')
+                    """)
+                ).fetchone()
+        except Exception as e:
+            logger.debug(f"크롤링 워커 상태 조회 실패: {e}")
+            return None
+
+        from command_jobs import COMMAND_JOB_EXECUTOR
+        return {
+            "executor": COMMAND_JOB_EXECUTOR,
+            # inline 모드는 웹 서버가 직접 처리하므로 워커 상태를 판단하지 않음
+            "worker_alive": worker["alive"] if COMMAND_JOB_EXECUTOR == "worker" else None,
+            "worker_heartbeat_age_seconds": worker["age_seconds"],
+            "jobs_queued": jobs.queued,
+            "jobs_running": jobs.running
+        }
+
+    # ==================== 백그라운드 스레드 ====================
+
+    def _ensure_thread(self):
+        """점검 스레드 시작 (fork된 gunicorn 워커에서는 새로 시작)"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._probe_loop, daemon=True, name="HealthProbe")
+            self._thread.start()
+
+    def _probe_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"헬스체크 점검 실패: {e}")
+            time.sleep(self.interval)
+
+
+# 전역 헬스체크 프로브 인스턴스
+health_probe = HealthProbe()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+하트비트 버퍼 모듈
+크롤링 단계별 하트비트를 메모리에 모았다가 크기/주기 단위로 다중 행 INSERT
+(크롤링 경로에서 하트비트마다 발생하던 DB 왕복 제거)
+"""
+
+import os
+import atexit
+import logging
+import threading
+from dotenv import load_dotenv
+from sqlalchemy import insert
+from db_manager import db_manager, heartbeat_status_table
+from attendance_outbox import attendance_outbox
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 하트비트 버퍼 설정 (선택)
+HEARTBEAT_BATCH_SIZE = int(os.getenv("HEARTBEAT_BATCH_SIZE", "50"))             # 이 개수가 쌓이면 즉시 저장
+HEARTBEAT_FLUSH_INTERVAL = float(os.getenv("HEARTBEAT_FLUSH_INTERVAL", "2"))    # 초 - 최대 저장 지연
+HEARTBEAT_MAX_BUFFER = int(os.getenv("HEARTBEAT_MAX_BUFFER", "5000"))           # DB 장애 시 보관 한도
+
+
+class HeartbeatBuffer:
+    """heartbeat_status 일괄 저장 버퍼 (백그라운드 스레드가 주기적으로 저장)"""
+
+    def __init__(self, batch_size=HEARTBEAT_BATCH_SIZE, flush_interval=HEARTBEAT_FLUSH_INTERVAL,
+                 max_buffer=HEARTBEAT_MAX_BUFFER):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._pid = None
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "flushes": 0,
+            "dropped": 0
+        }
+
+    def _ensure_worker(self):
+        """저장 스레드 시작 (fork된 자식 프로세스에서는 새로 시작)"""
+        if self._running and self._pid == os.getpid():
+            return
+
+        self._pid = os.getpid()
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, daemon=True, name="HeartbeatBuffer")
+        self._thread.start()
+
+    def _worker(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def add(self, row):
+        """하트비트 행 추가 - 배치 크기에 도달하면 저장 스레드를 깨움"""
+        with self._lock:
+            self._ensure_worker()
+            self._rows.append(row)
+            self.stats["enqueued"] += 1
+
+            overflow = len(self._rows) - self.max_buffer
+            if overflow > 0:
+                del self._rows[:overflow]
+                self.stats["dropped"] += overflow
+                logger.warning(f"하트비트 버퍼 초과 - 오래된 하트비트 {overflow}개 드롭")
+
+            if len(self._rows) >= self.batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        """버퍼에 쌓인 하트비트를 한 번의 다중 행 INSERT로 저장 - 실패 시 버퍼로 되돌림"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return True
+
+            # 아웃박스 임시 출석 ID는 동기화된 경우 실제 ID로 교체 (미동기화분은 동기화 시 DB에서 교체)
+            resolved = {}
+            for row in rows:
+                log_id = row.get("attendance_log_id")
+                if log_id not in resolved:
+                    resolved[log_id] = attendance_outbox.resolve(log_id)
+                row["attendance_log_id"] = resolved[log_id]
+
+            session = db_manager.get_session()
+            try:
+                session.execute(insert(heartbeat_status_table).values(rows))
+                session.commit()
+                self.stats["written"] += len(rows)
+                self.stats["flushes"] += 1
+                logger.debug(f"하트비트 {len(rows)}개 일괄 저장")
+                return True
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"하트비트 일괄 저장 실패 - {len(rows)}개 재시도 대기: {e}")
+                with self._lock:
+                    self._rows = rows + self._rows
+                    overflow = len(self._rows) - self.max_buffer
+                    if overflow > 0:
+                        del self._rows[:overflow]
+                        self.stats["dropped"] += overflow
+                return False
+            finally:
+                session.close()
+
+    def close(self):
+        """저장 스레드 종료 후 남은 하트비트 저장 (프로세스 종료 시 호출)"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self.flush()
+        logger.debug(f"하트비트 버퍼 종료 - {self.format_stats()}")
+
+    def format_stats(self):
+        """버퍼 통계 문자열"""
+        flushes = self.stats["flushes"]
+        avg_batch = self.stats["written"] / flushes if flushes else 0.0
+        return (f"적재: {self.stats['enqueued']}, 저장: {self.stats['written']} ({flushes}회, 평균 {avg_batch:.1f}개), "
+                f"드롭: {self.stats['dropped']}")
+
+
+# 전역 하트비트 버퍼 인스턴스
+heartbeat_buffer = HeartbeatBuffer()
+
+# 프로그램 종료 시 남은 하트비트 저장 (db_manager 정리보다 먼저 실행됨)
+atexit.register(heartbeat_buffer.close)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+시작 시각 분산 스케줄러
+사용자마다 허용 시간대 안의 랜덤 시작 오프셋을 미리 배정하고
+각자 오프셋이 되면 실행 (대기 시간이 사용자 수만큼 누적되지 않음)
+"""
+
+import os
+import time
+import random
+import logging
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 시작 분산 설정 (선택)
+JITTER_MAX_SECONDS = int(os.getenv("JITTER_MAX_SECONDS", "60"))
+JITTER_RESERVE_SECONDS = int(os.getenv("JITTER_RESERVE_SECONDS", "180"))  # 마감 전 크롤링 자체에 남겨둘 시간
+
+# 액션별 허용 시간대 마감 (워치독 재시도 구간과 동일)
+WINDOW_ENDS = {
+    "punch_in": os.getenv("PUNCH_IN_WINDOW_END", "08:40"),
+    "punch_out": os.getenv("PUNCH_OUT_WINDOW_END", "19:00")
+}
+
+
+class StartSlot:
+    """사용자 한 명의 계획된 시작 시각"""
+
+    def __init__(self, user_info, offset, planned_at):
+        self.user_info = user_info
+        self.offset = offset
+        self.planned_at = planned_at
+        self.actual_at = None
+
+    @property
+    def user_id(self):
+        return self.user_info["user_id"]
+
+    @property
+    def lag(self):
+        """계획 대비 실제 시작 지연 (초)"""
+        if not self.actual_at:
+            return None
+        return (self.actual_at - self.planned_at).total_seconds()
+
+
+class JitterScheduler:
+    """허용 시간대 안에서 사용자별 랜덤 시작 오프셋 배정"""
+
+    def __init__(self, action_name, max_jitter=JITTER_MAX_SECONDS, reserve_seconds=JITTER_RESERVE_SECONDS):
+        self.action_name = action_name
+        self.max_jitter = max_jitter
+        self.reserve_seconds = reserve_seconds
+        self.started_at = None
+        self._started_monotonic = None
+
+    def _window_remaining(self, now):
+        """마감까지 남은 시간 중 오프셋으로 쓸 수 있는 초"""
+        window_end = WINDOW_ENDS.get(self.action_name)
+        if not window_end:
+            return self.max_jitter
+
+        hour, minute = map(int, window_end.split(":"))
+        end_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return max(0, (end_at - now).total_seconds() - self.reserve_seconds)
+
+    def plan(self, users):
+        """사용자별 시작 슬롯 생성 (오프셋 오름차순)"""
+        self.started_at = datetime.now()
+        self._started_monotonic = time.monotonic()
+
+        # 마감이 가까우면 분산 폭을 줄이고, 이미 지났으면 바로 시작
+        spread = min(self.max_jitter, self._window_remaining(self.started_at))
+
+        slots = []
+        for user_info in users:
+            offset = random.uniform(0, spread) if spread > 0 else 0.0
+            slots.append(StartSlot(user_info, offset, self.started_at + timedelta(seconds=offset)))
+        slots.sort(key=lambda slot: slot.offset)
+
+        logger.info(f"[{self.action_name}] 시작 시각 분산 계획 - 사용자 {len(slots)}명, 분산 폭: {spread:.0f}s")
+        return slots
+
+    def seconds_until(self, slot):
+        """슬롯 시작까지 남은 초 (지났으면 0)"""
+        elapsed = time.monotonic() - self._started_monotonic
+        return max(0.0, slot.offset - elapsed)
+
+    def wait_until(self, slot):
+        """슬롯 시작 시각까지 대기 (동기 실행용)"""
+        remaining = self.seconds_until(slot)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def mark_started(self, slot):
+        """실제 시작 시각 기록 및 계획 대비 지연 로그"""
+        slot.actual_at = datetime.now()
+        logger.info(f"[{slot.user_id}] [{self.action_name}] 시작 - 계획: {slot.planned_at.strftime('%H:%M:%S')}, "
+                    f"실제: {slot.actual_at.strftime('%H:%M:%S')} (지연: {slot.lag:+.1f}s)")
+
+    def report(self, slots):
+        """전체 사용자의 계획 대비 실제 시작 시각 요약"""
+        lags = [slot.lag for slot in slots if slot.lag is not None]
+        if not lags:
+            return
+        logger.info(f"[{self.action_name}] 시작 시각 요약 - 사용자 {len(lags)}명, "
+                    f"평균 지연: {sum(lags) / len(lags):.1f}s, 최대 지연: {max(lags):.1f}s")
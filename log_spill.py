@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+로그 스필 버퍼 모듈
+DB 장애 또는 로그 큐 포화 시 로그 항목을 logs/spill 아래 추가 전용 세그먼트 파일(JSON Lines)에 기록하고
+DB가 복구되면 오래된 세그먼트부터 일괄 재전송
+"""
+
+import os
+import json
+import time
+import glob
+import logging
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 스필 버퍼 설정 (선택)
+LOG_SPILL_DIR = os.getenv("LOG_SPILL_DIR", os.path.join("logs", "spill"))
+LOG_SPILL_SEGMENT_BYTES = int(os.getenv("LOG_SPILL_SEGMENT_MB", "5")) * 1024 * 1024     # 세그먼트 하나의 최대 크기
+LOG_SPILL_MAX_BYTES = int(os.getenv("LOG_SPILL_MAX_MB", "200")) * 1024 * 1024          # 디스크 사용 한도 (초과 시 드롭)
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"직렬화할 수 없는 값: {type(value).__name__}")
+
+
+def _decode(obj):
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class LogSpill:
+    """프로세스별 세그먼트 파일에 로그 항목을 추가하고 재전송하는 스필 버퍼"""
+
+    def __init__(self, spill_dir=LOG_SPILL_DIR, segment_bytes=LOG_SPILL_SEGMENT_BYTES, max_bytes=LOG_SPILL_MAX_BYTES):
+        self.spill_dir = spill_dir
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_path = None
+        self._seq = 0
+
+        self.stats = {
+            "spilled": 0,
+            "replayed": 0,
+            "dropped": 0,
+            "segments_replayed": 0
+        }
+
+    # ==================== 기록 ====================
+
+    def _segment_name(self):
+        self._seq += 1
+        return os.path.join(self.spill_dir, f"spill-{os.getpid()}-{time.time_ns()}-{self._seq:04d}.jsonl")
+
+    def _close_segment(self):
+        if self._file:
+            self._file.close()
+        self._file = None
+        self._file_path = None
+
+    def _disk_usage(self):
+        return sum(os.path.getsize(path) for path in glob.glob(os.path.join(self.spill_dir, "spill-*")))
+
+    def append(self, items):
+        """로그 항목들을 현재 세그먼트 끝에 추가 - 디스크 한도 초과 시 드롭 후 False"""
+        if not items:
+            return True
+
+        lines = "".join(json.dumps(item, default=_encode, ensure_ascii=False) + "\n" for item in items)
+
+        with self._lock:
+            try:
+                # fork된 자식 프로세스는 부모의 세그먼트를 이어 쓰지 않음
+                if self._file_path and not os.path.basename(self._file_path).startswith(f"spill-{os.getpid()}-"):
+                    self._file = None
+                    self._file_path = None
+
+                if self._file is None:
+                    os.makedirs(self.spill_dir, exist_ok=True)
+                    if self._disk_usage() + len(lines) > self.max_bytes:
+                        self.stats["dropped"] += len(items)
+                        logger.error(f"로그 스필 디스크 한도 초과 - 로그 {len(items)}개 드롭")
+                        return False
+                    self._file_path = self._segment_name()
+                    self._file = open(self._file_path, "a", encoding="utf-8")
+
+                self._file.write(lines)
+                self._file.flush()
+                self.stats["spilled"] += len(items)
+
+                if self._file.tell() >= self.segment_bytes:
+                    self._close_segment()
+                return True
+
+            except OSError as e:
+                self.stats["dropped"] += len(items)
+                logger.error(f"로그 스필 파일 기록 실패 - 로그 {len(items)}개 드롭: {e}")
+                self._close_segment()
+                return False
+
+    # ==================== 재전송 ====================
+
+    def has_pending(self):
+        """재전송 대기 중인 세그먼트 존재 여부"""
+        return bool(glob.glob(os.path.join(self.spill_dir, "spill-*")))
+
+    def _claim_segments(self):
+        """
+        재전송할 세그먼트를 이름을 바꿔 점유 (여러 프로세스가 같은 세그먼트를 중복 재전송하지 않도록)
+        - 자기 프로세스 세그먼트: 쓰던 세그먼트를 닫고 점유
+        - 다른 프로세스 세그먼트: 해당 프로세스가 종료된 경우에만 점유
+        """
+        my_pid = os.getpid()
+        with self._lock:
+            self._close_segment()
+
+        claimed = []
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, "spill-*"))):
+            name = os.path.basename(path)
+            parts = name.split("-")
+            try:
+                owner_pid = int(parts[1])
+            except (IndexError, ValueError):
+                continue
+
+            if name.endswith(".jsonl"):
+                if owner_pid != my_pid and _pid_alive(owner_pid):
+                    continue
+            elif ".replay-" in name:
+                # 재전송 도중 종료된 프로세스가 점유했던 세그먼트 회수
+                replay_pid = int(name.rsplit(".replay-", 1)[1])
+                if replay_pid != my_pid and _pid_alive(replay_pid):
+                    continue
+            else:
+                continue
+
+            target = path.split(".replay-")[0] + f".replay-{my_pid}"
+            try:
+                if target != path:
+                    os.rename(path, target)
+                claimed.append(target)
+            except FileNotFoundError:
+                # 다른 프로세스가 먼저 점유
+                continue
+
+        return claimed
+
+    def _read_segment(self, path):
+        items = []
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    items.append(json.loads(line, object_hook=_decode))
+                except ValueError:
+                    # 기록 도중 종료되어 잘린 마지막 줄 등
+                    self.stats["dropped"] += 1
+                    logger.warning(f"로그 스필 손상된 줄 건너뜀: {os.path.basename(path)}:{line_no}")
+        return items
+
+    def replay(self, write_batch, batch_size):
+        """
+        오래된 세그먼트부터 batch_size개씩 write_batch(items)로 재전송
+        write_batch는 실패 시 예외 발생 - 실패하면 남은 항목을 새 세그먼트로 되돌리고 중단
+        반환: 재전송한 항목 수
+        """
+        replayed = 0
+        segments = self._claim_segments()
+
+        for index, path in enumerate(segments):
+            try:
+                items = self._read_segment(path)
+            except OSError as e:
+                logger.error(f"로그 스필 세그먼트 읽기 실패: {path}: {e}")
+                continue
+
+            sent = 0
+            try:
+                while sent < len(items):
+                    chunk = items[sent:sent + batch_size]
+                    write_batch(chunk)
+                    sent += len(chunk)
+            except Exception as e:
+                logger.warning(f"로그 스필 재전송 중단 - DB 미복구 ({replayed + sent}개 전송, 나머지 보관): {e}")
+                # 전송하지 못한 항목만 새 세그먼트로 보관 (이미 보낸 항목 중복 방지)
+                self.append(items[sent:])
+                self._remove(path)
+                # 점유했던 나머지 세그먼트는 원래 이름으로 되돌림
+                for pending in segments[index + 1:]:
+                    self._release(pending)
+                self.stats["replayed"] += replayed + sent
+                return replayed + sent
+
+            self._remove(path)
+            replayed += sent
+            self.stats["segments_replayed"] += 1
+
+        self.stats["replayed"] += replayed
+        if replayed:
+            logger.info(f"로그 스필 재전송 완료 - {replayed}개 ({len(segments)}개 세그먼트)")
+        return replayed
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"로그 스필 세그먼트 삭제 실패: {path}: {e}")
+
+    def _release(self, path):
+        try:
+            os.rename(path, path.split(".replay-")[0])
+        except OSError as e:
+            logger.warning(f"로그 스필 세그먼트 반환 실패: {path}: {e}")
+
+    def close(self):
+        """쓰던 세그먼트 닫기"""
+        with self._lock:
+            self._close_segment()
+
+    def format_stats(self):
+        """스필 통계 문자열"""
+        return (f"스필: {self.stats['spilled']}, 재전송: {self.stats['replayed']} "
+                f"({self.stats['segments_replayed']}개 세그먼트), 드롭: {self.stats['dropped']}")
@@ -43,7 +43,12 @@ import threading
 import time
 import hashlib
 from datetime import timedelta
-from db_manager import db_manager
+from db_manager import db_manager, day_range, clamp_limit, decode_cursor, split_page
+from schedule_cache import schedule_cache
+from command_jobs import command_job_queue, SUPPORTED_COMMANDS
+from health_probe import health_probe
+from server_status import server_status
+from response_cache import response_cache
 from sqlalchemy import text
 
 # 로깅 설정
@@ -81,6 +86,7 @@ if SINGLE_USER_MODE:
 
     try:
         from auto_chultae import login_and_click_button, PUNCH_IN_BUTTON_ID, PUNCH_OUT_BUTTON_IDS, create_attendance_record, update_attendance_record
+        from attendance_outbox import attendance_outbox
 
         # 사용자 정보 조회
         session = db_manager.get_session()
@@ -101,14 +107,24 @@ if SINGLE_USER_MODE:
         finally:
             session.close()
 
+        # 비밀번호/스케줄/이력을 한 번의 쿼리로 조회
+        rows = db_manager.get_punch_eligibility(args.action, user_id=user_id)
+        if not rows:
+            # 활성 사용자인데 결과가 없으면 조회 실패 - 휴무일/이력을 모르는 채로 출퇴근하지 않음
+            logger.error(f"[{user_id}] 출퇴근 대상 조회 실패 - 종료")
+            sys.exit(1)
+        eligibility = rows[0]
+
         # 비밀번호 불일치 상태 체크 (최우선)
-        if db_manager.is_password_mismatch(user_id):
+        if eligibility["password_mismatch"]:
             logger.warning(f"[{user_id}] ⚠️ 비밀번호 불일치 상태 - 크롤링 차단 (비밀번호를 변경해주세요)")
             sys.exit(1)
 
         # 스케줄 및 이력 확인
-        is_workday = db_manager.is_workday_scheduled(user_id)
-        has_success_today = db_manager.has_today_success(user_id, args.action)
+        is_workday = eligibility["is_workday"]
+        has_success_today = eligibility[f"{args.action}_done"]
+        # 아웃박스에 아직 DB로 동기화되지 않은 성공 기록이 있어도 종료 (워치독 재시도 시 중복 출퇴근 방지)
+        has_success_today = has_success_today or attendance_outbox.has_local_success(user_id, args.action)
 
         if not is_workday and args.action == 'punch_in':
             logger.info(f"[{user_id}] 오늘은 휴무일 - 종료")
@@ -206,6 +222,12 @@ def heartbeat_worker():
         update_server_heartbeat()
         time.sleep(30)  # 30초마다 하트비트 업데이트
 
+def start_heartbeat_worker():
+    """하트비트 워커 스레드 시작 (gunicorn 실행 시 gunicorn.conf.py post_fork에서 워커마다 호출)"""
+    heartbeat_thread = threading.Thread(target=heartbeat_worker, daemon=True, name="ServerHeartbeat")
+    heartbeat_thread.start()
+    logger.info("하트비트 워커 스레드 시작")
+
 # 웹 API 라우트들
 @app.route('/api/web/auth/register', methods=['POST'])
 def register():
@@ -327,43 +349,15 @@ def login():
 @app.route('/api/web/server/status', methods=['GET'])
 @jwt_required()
 def get_server_status():
-    """서버 상태 조회"""
+    """서버 상태 조회 - server_heartbeat 기준 컴포넌트별 생존 여부와 마지막 하트비트 경과 시간"""
     try:
-        session = db_manager.get_session()
-        try:
-            # 최근 하트비트 상태 조회 (5분 이내)
-            five_minutes_ago = datetime.now() - timedelta(minutes=5)
-
-            result = session.execute(
-                text("""
-                    SELECT stage, COUNT(*) as count
-                    FROM heartbeat_status
-                    WHERE timestamp > :five_minutes_ago
-                    GROUP BY stage
-                """),
-                {"five_minutes_ago": five_minutes_ago}
-            )
-            statuses = result.fetchall()
-
-            status = {
-                'main': False,
-                'watchdog': False
-            }
-
-            # 최근 활동이 있으면 온라인으로 간주
-            for s in statuses:
-                if 'main' in s.stage.lower() or 'server' in s.stage.lower():
-                    status['main'] = True
-                elif 'watchdog' in s.stage.lower():
-                    status['watchdog'] = True
-
-            # 기본적으로 현재 요청이 성공하면 메인 서버는 온라인
-            status['main'] = True
-
-            return jsonify({'success': True, 'status': status})
-
-        finally:
-            session.close()
+        components = server_status.get_status()
+        status = {
+            'main': components['main_server']['alive'],
+            'watchdog': components['watchdog']['alive'],
+            'crawl_worker': components['crawl_worker']['alive']
+        }
+        return jsonify({'success': True, 'status': status, 'components': components})
 
     except Exception as e:
         logger.error(f"서버 상태 조회 오류: {e}")
@@ -371,23 +365,25 @@ def get_server_status():
 
 @app.route('/api/web/user/summary', methods=['GET'])
 @jwt_required()
+@response_cache.cached('user_summary')
 def get_today_status():
     """오늘의 출근 상태 조회"""
     try:
         current_user = get_jwt_identity()
         session = db_manager.get_session()
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
+            day_start, day_end = day_range()
 
             result = session.execute(
                 text("""
                     SELECT action_type, status, attempt_time
                     FROM attendance_logs
-                    WHERE user_id = :user_id AND DATE(attempt_time) = :today
+                    WHERE user_id = :user_id
+                    AND attempt_time >= :day_start AND attempt_time < :day_end
                     AND status IN ('success', 'already_done')
                     ORDER BY attempt_time DESC
                 """),
-                {"user_id": current_user, "today": today}
+                {"user_id": current_user, "day_start": day_start, "day_end": day_end}
             )
             logs = result.fetchall()
 
@@ -417,21 +413,32 @@ def get_logs():
     """로그 조회"""
     try:
         current_user = get_jwt_identity()
-        limit = request.args.get('limit', 50, type=int)
+        limit = clamp_limit(request.args.get('limit', type=int))
+        cursor = request.args.get('cursor')
+
+        try:
+            cursor = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'error': '잘못된 커서입니다'}), 400
 
         session = db_manager.get_session()
         try:
-            result = session.execute(
-                text("""
-                    SELECT id, user_id, action_type, status, error_message, attempt_time
-                    FROM attendance_logs
-                    WHERE user_id = :user_id
-                    ORDER BY attempt_time DESC
-                    LIMIT :limit
-                """),
-                {"user_id": current_user, "limit": limit}
-            )
-            logs = result.fetchall()
+            query = """
+                SELECT id, user_id, action_type, status, error_message, attempt_time
+                FROM attendance_logs
+                WHERE user_id = :user_id
+            """
+            params = {"user_id": current_user, "limit": limit + 1}
+
+            # 키셋 페이지네이션: 이전 페이지 마지막 행보다 오래된 기록부터 조회
+            if cursor:
+                query += " AND (attempt_time, id) < (:cursor_time, :cursor_id)"
+                params["cursor_time"], params["cursor_id"] = cursor
+
+            query += " ORDER BY attempt_time DESC, id DESC LIMIT :limit"
+
+            result = session.execute(text(query), params)
+            logs, next_cursor = split_page(result.fetchall(), limit, lambda log: (log.attempt_time, log.id))
 
             log_list = []
             for log in logs:
@@ -444,7 +451,7 @@ def get_logs():
                     'timestamp': log.attempt_time.isoformat()
                 })
 
-            return jsonify({'success': True, 'logs': log_list})
+            return jsonify({'success': True, 'logs': log_list, 'next_cursor': next_cursor})
 
         finally:
             session.close()
@@ -499,6 +506,7 @@ def get_heartbeats(attendance_id):
 
 @app.route('/api/web/user/status', methods=['GET'])
 @jwt_required()
+@response_cache.cached('user_status')
 def get_user_status():
     """사용자 활성화 상태 조회"""
     try:
@@ -546,6 +554,8 @@ def update_user_status():
             success = db_manager.deactivate_user(current_user, changed_by=current_user, ip_address=ip_address, user_agent=user_agent)
 
         if success:
+            # 이 프로세스 캐시는 즉시 무효화 (다른 워커는 users 트리거 NOTIFY로 무효화)
+            response_cache.invalidate(current_user)
             logger.info(f"사용자 {current_user} 활성화 상태 변경: {is_active}")
             return jsonify({'success': True, 'message': '상태가 변경되었습니다'})
         else:
@@ -598,6 +608,7 @@ def update_password():
                 db_manager.clear_password_mismatch(current_user, changed_by=current_user, ip_address=ip_address, user_agent=user_agent)
                 logger.info(f"사용자 {current_user} 비밀번호 불일치 상태 해제")
 
+            response_cache.invalidate(current_user)
             logger.info(f"사용자 {current_user} 비밀번호 변경 완료")
             return jsonify({'success': True, 'message': '비밀번호가 변경되었습니다'})
         else:
@@ -613,10 +624,17 @@ def get_change_logs():
     """사용자 변경 로그 조회"""
     try:
         current_user = get_jwt_identity()
-        limit = request.args.get('limit', 50, type=int)
+        limit = clamp_limit(request.args.get('limit', type=int))
+        cursor = request.args.get('cursor')
 
-        # 사용자 변경 로그 조회
-        logs = db_manager.get_user_change_logs(current_user, limit=limit)
+        try:
+            cursor = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'error': '잘못된 커서입니다'}), 400
+
+        # 사용자 변경 로그 조회 (다음 페이지 여부 확인용으로 1개 더 조회)
+        logs = db_manager.get_user_change_logs(current_user, limit=limit + 1, cursor=cursor)
+        logs, next_cursor = split_page(logs, limit, lambda log: (log.changed_at, log.id))
 
         log_list = []
         for log in logs:
@@ -633,7 +651,7 @@ def get_change_logs():
                 'notes': log.notes
             })
 
-        return jsonify({'success': True, 'logs': log_list})
+        return jsonify({'success': True, 'logs': log_list, 'next_cursor': next_cursor})
 
     except Exception as e:
         logger.error(f"변경 로그 조회 오류: {e}")
@@ -701,6 +719,7 @@ def delete_user_account():
 
 @app.route('/api/web/schedules', methods=['GET'])
 @jwt_required()
+@response_cache.cached('schedules', args=('year', 'month'))
 def get_schedules():
     """사용자 스케줄 조회 (월별)"""
     try:
@@ -708,45 +727,26 @@ def get_schedules():
         year = request.args.get('year', datetime.now().year, type=int)
         month = request.args.get('month', datetime.now().month, type=int)
 
-        session = db_manager.get_session()
-        try:
-            # 해당 월의 첫날과 마지막날 계산
-            from calendar import monthrange
-            last_day = monthrange(year, month)[1]
-            start_date = f"{year}-{month:02d}-01"
-            end_date = f"{year}-{month:02d}-{last_day}"
-
-            result = session.execute(
-                text("""
-                    SELECT schedule_date, is_workday, schedule_type,
-                           punch_in_time, punch_out_time, notes
-                    FROM attendance_schedules
-                    WHERE user_id = :user_id
-                    AND schedule_date BETWEEN :start_date AND :end_date
-                    ORDER BY schedule_date
-                """),
-                {
-                    "user_id": current_user,
-                    "start_date": start_date,
-                    "end_date": end_date
-                }
-            )
-
-            schedules = []
-            for row in result.fetchall():
-                schedules.append({
-                    'date': row.schedule_date.strftime('%Y-%m-%d'),
-                    'is_workday': row.is_workday,
-                    'schedule_type': row.schedule_type,
-                    'punch_in_time': row.punch_in_time.strftime('%H:%M') if row.punch_in_time else None,
-                    'punch_out_time': row.punch_out_time.strftime('%H:%M') if row.punch_out_time else None,
-                    'notes': row.notes
-                })
-
-            return jsonify({'success': True, 'schedules': schedules})
+        # 해당 월의 첫날과 마지막날 계산
+        from calendar import monthrange
+        import datetime as dt
+        last_day = monthrange(year, month)[1]
+
+        # 사용자 1년치 스케줄 캐시에서 해당 월만 추출
+        rows = schedule_cache.get_range(current_user, dt.date(year, month, 1), dt.date(year, month, last_day))
+
+        schedules = []
+        for row in rows:
+            schedules.append({
+                'date': row['schedule_date'].strftime('%Y-%m-%d'),
+                'is_workday': row['is_workday'],
+                'schedule_type': row['schedule_type'],
+                'punch_in_time': row['punch_in_time'].strftime('%H:%M') if row['punch_in_time'] else None,
+                'punch_out_time': row['punch_out_time'].strftime('%H:%M') if row['punch_out_time'] else None,
+                'notes': row['notes']
+            })
 
-        finally:
-            session.close()
+        return jsonify({'success': True, 'schedules': schedules})
 
     except Exception as e:
         logger.error(f"스케줄 조회 오류: {e}")
@@ -815,6 +815,9 @@ def toggle_schedule():
                 )
 
             session.commit()
+            # 이 프로세스 캐시는 즉시 무효화 (다른 프로세스는 트리거 NOTIFY로 무효화)
+            schedule_cache.invalidate(current_user, int(schedule_date[:4]))
+            response_cache.invalidate(current_user)
 
             # 업데이트된 스케줄 정보 반환
             result = session.execute(
@@ -843,61 +846,39 @@ def toggle_schedule():
 @app.route('/api/web/schedules/bulk', methods=['POST'])
 @jwt_required()
 def create_bulk_schedules():
-    """기본 평일 스케줄 대량 생성"""
+    """기본 평일 스케줄 대량 생성 (scope: month - 해당 월, year - 1년 전체)"""
     try:
         current_user = get_jwt_identity()
         data = request.get_json()
         year = data.get('year', datetime.now().year)
         month = data.get('month', datetime.now().month)
+        scope = data.get('scope', 'month')
 
-        session = db_manager.get_session()
-        try:
-            from calendar import monthrange
-            import datetime as dt
-
-            # 해당 월의 모든 날짜 생성
-            last_day = monthrange(year, month)[1]
-
-            for day in range(1, last_day + 1):
-                date_obj = dt.date(year, month, day)
+        from calendar import monthrange
+        import datetime as dt
 
-                # 기존 스케줄이 있는지 확인
-                result = session.execute(
-                    text("""
-                        SELECT id FROM attendance_schedules
-                        WHERE user_id = :user_id AND schedule_date = :date
-                    """),
-                    {"user_id": current_user, "date": date_obj}
-                )
-
-                if result.fetchone():
-                    continue  # 이미 있으면 스킵
-
-                # 평일(월-금)만 출근일로 설정
-                is_workday = date_obj.weekday() < 5  # 0=월요일, 4=금요일
-
-                session.execute(
-                    text("""
-                        INSERT INTO attendance_schedules
-                        (user_id, schedule_date, is_workday, schedule_type, punch_in_time, punch_out_time)
-                        VALUES (:user_id, :date, :is_workday, 'regular', '08:00', '18:00')
-                    """),
-                    {
-                        "user_id": current_user,
-                        "date": date_obj,
-                        "is_workday": is_workday
-                    }
-                )
+        if scope == 'year':
+            start_date, end_date = dt.date(year, 1, 1), dt.date(year, 12, 31)
+            period = f'{year}년'
+        elif scope == 'month':
+            start_date, end_date = dt.date(year, month, 1), dt.date(year, month, monthrange(year, month)[1])
+            period = f'{year}년 {month}월'
+        else:
+            return jsonify({'error': 'scope는 month 또는 year만 가능합니다'}), 400
 
-            session.commit()
+        # 기간 전체를 한 번의 INSERT ... SELECT로 생성 (이미 있는 날짜는 유지)
+        created = db_manager.create_default_schedules(start_date, end_date, user_ids=[current_user])
+        if created is None:
+            return jsonify({'error': '스케줄 생성 중 오류가 발생했습니다'}), 500
 
-            return jsonify({
-                'success': True,
-                'message': f'{year}년 {month}월 기본 스케줄이 생성되었습니다'
-            })
+        schedule_cache.invalidate(current_user, year)
+        response_cache.invalidate(current_user)
 
-        finally:
-            session.close()
+        return jsonify({
+            'success': True,
+            'message': f'{period} 기본 스케줄이 생성되었습니다',
+            'created': created
+        })
 
     except Exception as e:
         logger.error(f"대량 스케줄 생성 오류: {e}")
@@ -906,50 +887,30 @@ def create_bulk_schedules():
 
 @app.route('/api/web/schedules/yearly', methods=['GET'])
 @jwt_required()
+@response_cache.cached('yearly_schedules', args=('year',))
 def get_yearly_schedules():
     """사용자 1년치 스케줄 조회 (성능 최적화용)"""
     try:
         current_user = get_jwt_identity()
         year = request.args.get('year', datetime.now().year, type=int)
 
-        session = db_manager.get_session()
-        try:
-            # 1년치 스케줄 조회
-            start_date = f"{year}-01-01"
-            end_date = f"{year}-12-31"
-
-            result = session.execute(
-                text("""
-                    SELECT schedule_date, is_workday, schedule_type
-                    FROM attendance_schedules
-                    WHERE user_id = :user_id
-                    AND schedule_date BETWEEN :start_date AND :end_date
-                    ORDER BY schedule_date
-                """),
-                {
-                    "user_id": current_user,
-                    "start_date": start_date,
-                    "end_date": end_date
-                }
-            )
-
-            schedules = []
-            for row in result:
-                schedules.append({
-                    'date': row.schedule_date.strftime('%Y-%m-%d'),
-                    'is_workday': row.is_workday,
-                    'schedule_type': row.schedule_type
-                })
+        # 1년치 스케줄 조회 (캐시)
+        rows = schedule_cache.get_year(current_user, year)
 
-            return jsonify({
-                'success': True,
-                'schedules': schedules,
-                'year': year,
-                'count': len(schedules)
+        schedules = []
+        for day in sorted(rows):
+            schedules.append({
+                'date': day.strftime('%Y-%m-%d'),
+                'is_workday': rows[day]['is_workday'],
+                'schedule_type': rows[day]['schedule_type']
             })
 
-        finally:
-            session.close()
+        return jsonify({
+            'success': True,
+            'schedules': schedules,
+            'year': year,
+            'count': len(schedules)
+        })
 
     except Exception as e:
         logger.error(f"1년치 스케줄 조회 오류: {e}")
@@ -957,105 +918,37 @@ def get_yearly_schedules():
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """헬스체크 엔드포인트"""
+    """헬스체크 엔드포인트 - 백그라운드 점검 스냅샷 반환 (?deep=1이면 즉시 재점검)"""
     try:
-        db_connected = db_manager.test_connection()
-        status = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'database': 'connected' if db_connected else 'disconnected',
-            'pid': os.getpid()
-        }
-        return jsonify(status), 200
+        deep = request.args.get('deep', '').lower() in ('1', 'true')
+        return jsonify(health_probe.snapshot(deep=deep)), 200
     except Exception as e:
         logger.error(f"헬스체크 오류: {e}")
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
 
 @app.route('/api/command', methods=['POST'])
 def handle_command():
-    """워치독에서 오는 명령 처리"""
+    """워치독에서 오는 명령 처리 - 작업 등록 후 job_id 즉시 반환 (처리는 전용 실행기에서 진행)"""
     try:
         data = request.get_json()
         command = data.get('command')
+        # 크롤링 엔진 선택 (sequential/async, 미지정 시 CRAWL_ENGINE 환경변수)
+        engine = data.get('engine')
 
-        if command == 'punch_in':
-            logger.info("출근 명령 수신")
-            db_manager.log_server_heartbeat(
-                component="main_server",
-                status="processing",
-                stage="punch_in_start",
-                user_id=None,
-                action="punch_in"
-            )
-
-            # auto_chultae 모듈 직접 호출
-            try:
-                from auto_chultae import punch_in
-                punch_in()
-                logger.info("출근 처리 완료")
-
-            except Exception as e:
-                logger.error(f"출근 처리 오류: {e}")
-                db_manager.log_server_heartbeat(
-                    component="main_server",
-                    status="error",
-                    stage="punch_in_error",
-                    user_id=None,
-                    action="punch_in"
-                )
-                raise e
-
-            db_manager.log_server_heartbeat(
-                component="main_server",
-                status="completed",
-                stage="punch_in_complete",
-                user_id=None,
-                action="punch_in"
-            )
-
-            return jsonify({'status': 'success', 'message': '출근 처리 완료'}), 200
-
-        elif command == 'punch_out':
-            logger.info("퇴근 명령 수신")
-            db_manager.log_server_heartbeat(
-                component="main_server",
-                status="processing",
-                stage="punch_out_start",
-                user_id=None,
-                action="punch_out"
-            )
-
-            # auto_chultae 모듈 직접 호출
-            try:
-                from auto_chultae import punch_out
-                punch_out()
-                logger.info("퇴근 처리 완료")
-
-            except Exception as e:
-                logger.error(f"퇴근 처리 오류: {e}")
-                db_manager.log_server_heartbeat(
-                    component="main_server",
-                    status="error",
-                    stage="punch_out_error",
-                    user_id=None,
-                    action="punch_out"
-                )
-                raise e
-
-            db_manager.log_server_heartbeat(
-                component="main_server",
-                status="completed",
-                stage="punch_out_complete",
-                user_id=None,
-                action="punch_out"
-            )
-
-            return jsonify({'status': 'success', 'message': '퇴근 처리 완료'}), 200
-
-        else:
+        if command not in SUPPORTED_COMMANDS:
             logger.warning(f"알 수 없는 명령: {command}")
             return jsonify({'status': 'error', 'message': f'알 수 없는 명령: {command}'}), 400
 
+        logger.info(f"{'출근' if command == 'punch_in' else '퇴근'} 명령 수신")
+        job, created = command_job_queue.submit(command, engine)
+
+        return jsonify({
+            'status': 'accepted' if created else 'in_progress',
+            'message': '작업 등록' if created else '같은 명령이 이미 진행 중 - 기존 작업 반환',
+            'job_id': job['job_id'],
+            'job': job
+        }), 202 if created else 200
+
     except Exception as e:
         logger.error(f"명령 처리 오류: {e}")
         db_manager.log_server_heartbeat(
@@ -1067,6 +960,19 @@ def handle_command():
         )
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_command_job(job_id):
+    """명령 작업 상태 및 사용자별 진행 상황 조회"""
+    try:
+        job = command_job_queue.get(job_id)
+        if not job:
+            return jsonify({'status': 'error', 'message': '작업을 찾을 수 없습니다'}), 404
+        return jsonify(job), 200
+
+    except Exception as e:
+        logger.error(f"작업 조회 오류: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 def signal_handler(signum, frame):
     """시그널 핸들러"""
     logger.info("종료 신호 수신")
@@ -1109,6 +1015,7 @@ def main():
             """백그라운드에서 크롤링 실행"""
             try:
                 from auto_chultae import login_and_click_button, PUNCH_IN_BUTTON_ID, PUNCH_OUT_BUTTON_IDS, create_attendance_record, update_attendance_record
+                from attendance_outbox import attendance_outbox
 
                 # 사용자 정보 조회
                 session = db_manager.get_session()
@@ -1131,16 +1038,28 @@ def main():
                 finally:
                     session.close()
 
+                # 비밀번호/스케줄/이력을 한 번의 쿼리로 조회
+                rows = db_manager.get_punch_eligibility(args.action, user_id=user_id)
+                if not rows:
+                    # 활성 사용자인데 결과가 없으면 조회 실패 - 휴무일/이력을 모르는 채로 출퇴근하지 않음
+                    logger.error(f"[{user_id}] 출퇴근 대상 조회 실패 - 종료")
+                    crawling_success['status'] = 'failed'
+                    crawling_done.set()
+                    return
+                eligibility = rows[0]
+
                 # 비밀번호 불일치 상태 체크 (최우선)
-                if db_manager.is_password_mismatch(user_id):
+                if eligibility["password_mismatch"]:
                     logger.warning(f"[{user_id}] ⚠️ 비밀번호 불일치 상태 - 크롤링 차단")
                     crawling_success['status'] = 'password_mismatch'
                     crawling_done.set()
                     return
 
                 # 스케줄 및 이력 확인
-                is_workday = db_manager.is_workday_scheduled(user_id)
-                has_success_today = db_manager.has_today_success(user_id, args.action)
+                is_workday = eligibility["is_workday"]
+                has_success_today = eligibility[f"{args.action}_done"]
+                # 아웃박스에 아직 DB로 동기화되지 않은 성공 기록이 있어도 종료 (워치독 재시도 시 중복 출퇴근 방지)
+                has_success_today = has_success_today or attendance_outbox.has_local_success(user_id, args.action)
 
                 if not is_workday and args.action == 'punch_in':
                     logger.info(f"[{user_id}] 오늘은 휴무일 - 종료")
@@ -1188,6 +1107,16 @@ def main():
                 crawling_done.set()
                 # 크롤링 완료 후 5초 뒤에 서버 종료
                 time.sleep(5)
+
+                # os._exit는 atexit를 건너뛰므로 아웃박스/하트비트 버퍼를 직접 정리 (남은 기록 DB 동기화)
+                try:
+                    from attendance_outbox import attendance_outbox
+                    from heartbeat_buffer import heartbeat_buffer
+                    heartbeat_buffer.close()
+                    attendance_outbox.close()
+                except Exception as e:
+                    logger.error(f"종료 전 기록 동기화 실패: {e}")
+
                 logger.info(f"크롤링 완료 - 서버 종료")
                 os._exit(0)
 
@@ -1220,9 +1149,7 @@ def main():
         db_manager.log_system("INFO", "main_server", "메인 서버 시작")
 
     # 하트비트 워커 스레드 시작
-    heartbeat_thread = threading.Thread(target=heartbeat_worker, daemon=True)
-    heartbeat_thread.start()
-    logger.info("하트비트 워커 스레드 시작")
+    start_heartbeat_worker()
 
     # Flask 서버 설정 - MAIN_SERVER_URL에서 파싱 (필수)
     main_server_url = os.getenv('MAIN_SERVER_URL')
@@ -1241,8 +1168,9 @@ def main():
 
     logger.info(f"Flask 서버 시작: {host}:{port}")
     logger.info("API 엔드포인트:")
-    logger.info("  - GET /api/health : 헬스체크")
-    logger.info("  - POST /api/command : 명령 실행 (punch_in, punch_out)")
+    logger.info("  - GET /api/health : 헬스체크 (?deep=1: 즉시 점검)")
+    logger.info("  - POST /api/command : 명령 작업 등록 (punch_in, punch_out)")
+    logger.info("  - GET /api/jobs/<job_id> : 명령 작업 진행 상황")
 
     # 초기 하트비트
     update_server_heartbeat()
@@ -79,6 +79,25 @@ def show_active_users():
     for user in users:
         print(f"  - {user['user_id']}")
 
+def create_schedules(year, month=None, user_ids=None):
+    """기본 스케줄 일괄 생성 (사용자 미지정 시 활성 사용자 전체)"""
+    import calendar
+    from datetime import date
+
+    if month:
+        start_date, end_date = date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+        period = f"{year}년 {month}월"
+    else:
+        start_date, end_date = date(year, 1, 1), date(year, 12, 31)
+        period = f"{year}년"
+
+    created = db_manager.create_default_schedules(start_date, end_date, user_ids=user_ids or None)
+    target = ", ".join(user_ids) if user_ids else "활성 사용자 전체"
+    if created is None:
+        print(f"❌ {period} 기본 스케줄 생성 실패 ({target})")
+    else:
+        print(f"✅ {period} 기본 스케줄 {created}건 생성 ({target}, 기존 스케줄은 유지)")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Auto Chultae 사용자 관리")
@@ -105,6 +124,12 @@ def main():
     password_parser.add_argument('user_id', help='사용자 ID')
     password_parser.add_argument('new_password', help='새 비밀번호')
 
+    # 기본 스케줄 일괄 생성
+    schedules_parser = subparsers.add_parser('schedules', help='기본 스케줄 일괄 생성 (평일 출근, 주말 휴무)')
+    schedules_parser.add_argument('year', type=int, help='연도')
+    schedules_parser.add_argument('--month', type=int, help='월 (생략 시 1년 전체)')
+    schedules_parser.add_argument('--user', action='append', dest='user_ids', help='사용자 ID (여러 번 지정 가능, 생략 시 활성 사용자 전체)')
+
 
     args = parser.parse_args()
 
@@ -125,6 +150,8 @@ def main():
         deactivate_user(args.user_id)
     elif args.command == 'password':
         update_password(args.user_id, args.new_password)
+    elif args.command == 'schedules':
+        create_schedules(args.year, args.month, args.user_ids)
     else:
         parser.print_help()
 
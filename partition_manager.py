@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+로그 파티션 관리 모듈
+heartbeat_status / system_logs 일별 파티션을 미리 생성하고
+보관 기간이 지난 파티션은 DROP(또는 DETACH) - 대량 DELETE 없이 즉시 정리
+(테이블 전환은 schema_log_partitioning.sql)
+"""
+
+import os
+import re
+import logging
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import text
+from db_manager import db_manager
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 파티션 관리 설정 (선택)
+LOG_PARTITION_PREMAKE_DAYS = int(os.getenv("LOG_PARTITION_PREMAKE_DAYS", "7"))       # 미리 만들어 둘 미래 파티션 일수
+HEARTBEAT_RETENTION_DAYS = int(os.getenv("HEARTBEAT_RETENTION_DAYS", "30"))
+SYSTEM_LOG_RETENTION_DAYS = int(os.getenv("SYSTEM_LOG_RETENTION_DAYS", "90"))
+LOG_PARTITION_EXPIRE_MODE = os.getenv("LOG_PARTITION_EXPIRE_MODE", "drop")            # drop: 삭제, detach: 분리만 (보관용)
+
+# 파티션 테이블: 테이블명 -> 보관 일수
+PARTITIONED_TABLES = {
+    "heartbeat_status": HEARTBEAT_RETENTION_DAYS,
+    "system_logs": SYSTEM_LOG_RETENTION_DAYS
+}
+
+# 파티션 범위 표현식에서 상한 추출 - FOR VALUES FROM (...) TO ('2025-12-09 00:00:00')
+PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+# 파티션 키 정의에서 컬럼명 추출 - RANGE ("timestamp") / RANGE (created_at)
+PARTITION_KEY = re.compile(r'RANGE \("?([A-Za-z_][A-Za-z0-9_]*)"?\)')
+
+
+class PartitionManager:
+    """일별 로그 파티션 생성/만료 처리"""
+
+    def __init__(self, tables=None, premake_days=LOG_PARTITION_PREMAKE_DAYS, expire_mode=LOG_PARTITION_EXPIRE_MODE):
+        self.tables = tables if tables is not None else PARTITIONED_TABLES
+        self.premake_days = premake_days
+        self.expire_mode = expire_mode if expire_mode in ("drop", "detach") else "drop"
+
+    def _is_partitioned(self, session, table):
+        result = session.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table}
+        )
+        return result.fetchone() is not None
+
+    def _list_partitions(self, session, table):
+        """(파티션명, 상한 시각) 목록 - 기본 파티션은 상한 None"""
+        result = session.execute(
+            text("""
+                SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table)
+            """),
+            {"table": table}
+        )
+
+        partitions = []
+        for row in result.fetchall():
+            match = PARTITION_UPPER_BOUND.search(row.bound or "")
+            upper = datetime.fromisoformat(match.group(1)) if match else None
+            partitions.append((row.relname, upper))
+        return partitions
+
+    def _partition_key(self, session, table):
+        """범위 파티션 키 컬럼명 - RANGE ("timestamp") / RANGE (created_at)"""
+        result = session.execute(text("SELECT pg_get_partkeydef(to_regclass(:table))"), {"table": table})
+        match = PARTITION_KEY.search(result.scalar() or "")
+        return match.group(1) if match else None
+
+    def _default_partition(self, session, table):
+        """기본(DEFAULT) 파티션명 (없으면 None)"""
+        result = session.execute(
+            text("""
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table)
+                  AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'
+            """),
+            {"table": table}
+        )
+        row = result.fetchone()
+        return row.relname if row else None
+
+    def ensure_partitions(self, session, table, today=None):
+        """
+        마지막 파티션 다음 날(또는 오늘)부터 premake_days일 뒤까지의 일별 파티션 생성
+        유지보수가 밀려 기본 파티션에 들어간 행이 있으면 새 파티션으로 옮긴 뒤 연결
+        (기본 파티션에 해당 범위 행이 있으면 PARTITION OF 생성이 실패하므로)
+        날짜별 SAVEPOINT - 하루 생성이 실패해도 나머지 생성과 만료 처리는 계속 진행
+        """
+        if today is None:
+            today = datetime.now().date()
+
+        covered_until = max((upper for _, upper in self._list_partitions(session, table) if upper), default=None)
+        # 마지막 파티션 이후 빠진 날짜도 채움 (기본 파티션에 쌓인 행을 일별 파티션으로 옮겨 만료 대상이 되도록)
+        first_day = covered_until.date() if covered_until and covered_until.date() < today else today
+        last_day = today + timedelta(days=self.premake_days)
+
+        key = self._partition_key(session, table)
+        default = self._default_partition(session, table)
+        created = []
+
+        day = first_day
+        while day <= last_day:
+            day_start = datetime.combine(day, datetime.min.time())
+            day_end = day_start + timedelta(days=1)
+            day += timedelta(days=1)
+            if covered_until and day_start < covered_until:
+                continue
+
+            name = f"{table}_p{day_start:%Y%m%d}"
+            bounds = f"FROM ('{day_start:%Y-%m-%d}') TO ('{day_end:%Y-%m-%d}')"
+
+            # 같은 이름의 테이블이 이미 있으면 생성하지 않음 (생성 수에 포함하지 않음)
+            if session.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+                continue
+
+            try:
+                with session.begin_nested():
+                    moved = 0
+                    if default and key:
+                        moved = session.execute(
+                            text(f'SELECT COUNT(*) FROM {default} WHERE "{key}" >= :start AND "{key}" < :end'),
+                            {"start": day_start, "end": day_end}
+                        ).scalar()
+
+                    if moved:
+                        # 같은 구조의 테이블에 기본 파티션 행을 옮긴 뒤 범위 파티션으로 연결
+                        logger.warning(f"{table} 기본 파티션에 {day_start:%Y-%m-%d} 범위 행 {moved}개 - {name}로 이동 후 연결")
+                        session.execute(text(
+                            f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                        ))
+                        session.execute(
+                            text(f'INSERT INTO {name} SELECT * FROM {default} WHERE "{key}" >= :start AND "{key}" < :end'),
+                            {"start": day_start, "end": day_end}
+                        )
+                        session.execute(
+                            text(f'DELETE FROM {default} WHERE "{key}" >= :start AND "{key}" < :end'),
+                            {"start": day_start, "end": day_end}
+                        )
+                        session.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+                    else:
+                        session.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+                created.append(name)
+            except Exception as e:
+                logger.error(f"{table} 파티션 생성 실패 ({name}): {e}")
+
+        if default:
+            remaining = session.execute(text(f"SELECT COUNT(*) FROM {default}")).scalar()
+            if remaining:
+                logger.warning(f"{table} 기본 파티션 {default}에 {remaining}개 행 보관 중 (시각 NULL 또는 범위 밖)")
+
+        return created
+
+    def expire_partitions(self, session, table, retention_days, now=None):
+        """상한이 보관 기간 이전인 파티션 삭제 (기본 파티션 제외)"""
+        if now is None:
+            now = datetime.now()
+        cutoff = datetime.combine((now - timedelta(days=retention_days)).date(), datetime.min.time())
+
+        expired = []
+        for name, upper in self._list_partitions(session, table):
+            if upper is None or upper > cutoff:
+                continue
+            if self.expire_mode == "detach":
+                session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            else:
+                session.execute(text(f"DROP TABLE {name}"))
+            expired.append(name)
+
+        return expired
+
+    def run(self):
+        """전체 파티션 테이블 유지보수 - 테이블별로 커밋 (한 테이블 실패가 다른 테이블에 영향 없음)"""
+        summary = {}
+        for table, retention_days in self.tables.items():
+            session = db_manager.get_session()
+            try:
+                if not self._is_partitioned(session, table):
+                    logger.debug(f"{table} 파티션 테이블 아님 - 유지보수 건너뜀 (schema_log_partitioning.sql 미적용)")
+                    continue
+
+                created = self.ensure_partitions(session, table)
+                expired = self.expire_partitions(session, table, retention_days)
+                session.commit()
+
+                summary[table] = (created, expired)
+                logger.info(f"{table} 파티션 유지보수 - 생성 {len(created)}개, "
+                            f"{'분리' if self.expire_mode == 'detach' else '삭제'} {len(expired)}개 "
+                            f"(보관 {retention_days}일)")
+                for name in expired:
+                    logger.info(f"{table} 만료 파티션 정리: {name}")
+            except Exception as e:
+                session.rollback()
+                logger.error(f"{table} 파티션 유지보수 실패: {e}")
+            finally:
+                session.close()
+
+        return summary
+
+
+# 전역 파티션 관리자 인스턴스
+partition_manager = PartitionManager()
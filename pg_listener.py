@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Postgres LISTEN 공용 모듈
+프로세스당 전용 연결 하나로 여러 채널의 NOTIFY를 받아 구독자 콜백으로 전달 (스케줄 캐시, 응답 캐시)
+연결이 끊기거나 새로 맺어질 때는 on_reset 콜백 호출 - 그동안 놓친 알림이 있을 수 있으므로 캐시 비우기용
+"""
+
+import os
+import time
+import select
+import logging
+import threading
+from dotenv import load_dotenv
+from db_manager import db_manager
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# PgBouncer transaction 모드에서는 LISTEN이 동작하지 않으므로 Postgres 직접 주소 (미지정 시 기본 연결 사용)
+DATABASE_LISTEN_URL = os.getenv("DATABASE_LISTEN_URL")
+
+LISTEN_RECONNECT_DELAY = 5  # 초
+LISTEN_POLL_TIMEOUT = 5.0   # 초 - 새 구독 채널 반영 주기
+
+
+class PgListener:
+    """채널별 구독자에게 NOTIFY 전달 (fork된 gunicorn 워커에서는 새 연결로 다시 시작)"""
+
+    def __init__(self):
+        self._subscribers = {}  # channel -> [(on_notify, on_reset)]
+        self._active_channels = set()  # 현재 연결에서 LISTEN 중인 채널
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._pid = None
+
+    def subscribe(self, channel, on_notify, on_reset=None):
+        """채널 구독 - on_notify(payload), on_reset() (연결/재연결/끊김 시)"""
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append((on_notify, on_reset))
+
+    def is_listening(self, channel):
+        """현재 연결에서 해당 채널을 LISTEN 중인지 (아니면 캐시를 쓰지 않아야 함)"""
+        self.ensure_started()
+        return channel in self._active_channels
+
+    def ensure_started(self):
+        """LISTEN 스레드 시작 (fork된 자식 프로세스에서는 새로 시작)"""
+        if self._running and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._running and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._running = True
+            self._active_channels = set()
+            self._thread = threading.Thread(target=self._listen_loop, daemon=True, name="PgListener")
+            self._thread.start()
+
+    def _reset(self, channels):
+        for channel in channels:
+            for _, on_reset in self._subscribers.get(channel, []):
+                if on_reset:
+                    try:
+                        on_reset()
+                    except Exception as e:
+                        logger.warning(f"LISTEN 초기화 콜백 오류 ({channel}): {e}")
+
+    def _listen_new_channels(self, dbapi_connection):
+        """아직 LISTEN하지 않은 구독 채널 추가 - LISTEN 이전 캐시는 변경을 놓쳤을 수 있으므로 초기화"""
+        with self._lock:
+            pending = [channel for channel in self._subscribers if channel not in self._active_channels]
+        if not pending:
+            return
+
+        with dbapi_connection.cursor() as cursor:
+            for channel in pending:
+                cursor.execute(f"LISTEN {channel}")
+        self._reset(pending)
+        self._active_channels.update(pending)
+        logger.info(f"LISTEN 시작: {', '.join(pending)}")
+
+    def _dispatch(self, notify):
+        for on_notify, _ in self._subscribers.get(notify.channel, []):
+            try:
+                on_notify(notify.payload)
+            except Exception as e:
+                logger.warning(f"NOTIFY 처리 오류 ({notify.channel}): {e}")
+
+    def _listen_loop(self):
+        while self._running:
+            connection = None
+            try:
+                # 풀과 무관한 전용 연결 (autocommit이어야 알림 수신)
+                if DATABASE_LISTEN_URL:
+                    import psycopg2
+                    connection = dbapi_connection = psycopg2.connect(DATABASE_LISTEN_URL, connect_timeout=10)
+                else:
+                    connection = db_manager.engine.raw_connection()
+                    connection.detach()
+                    dbapi_connection = connection.driver_connection
+                dbapi_connection.autocommit = True
+
+                while self._running:
+                    self._listen_new_channels(dbapi_connection)
+                    if select.select([dbapi_connection], [], [], LISTEN_POLL_TIMEOUT) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        self._dispatch(dbapi_connection.notifies.pop(0))
+
+            except Exception as e:
+                logger.warning(f"LISTEN 연결 끊김 - {LISTEN_RECONNECT_DELAY}초 후 재연결 (그동안 캐시 미사용): {e}")
+            finally:
+                channels = list(self._active_channels)
+                self._active_channels = set()
+                self._reset(channels)
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+            time.sleep(LISTEN_RECONNECT_DELAY)
+
+
+# 전역 LISTEN 인스턴스
+pg_listener = PgListener()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+출퇴근 등록 응답 검증 모듈
+출퇴근 버튼이 보내는 등록 XHR 응답을 가로채 상태 코드와 응답 본문으로
+성공/실패를 바로 판정 (DOM 폴링은 응답을 못 잡았거나 성공 근거가 없을 때의 폴백)
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 출퇴근 등록 요청 URL 정규식 (선택) - 미설정 시 응답 검증 없이 DOM 검증만 수행
+PUNCH_RESPONSE_URL_PATTERN = os.getenv("PUNCH_RESPONSE_URL_PATTERN")
+
+# 응답 본문에서 실패로 판정할 키워드
+FAILURE_KEYWORDS = ("실패", "오류", "error", "fail")
+
+# 응답 본문에서 성공으로 판정할 키워드 (실패 키워드가 함께 있으면 성공으로 보지 않음)
+SUCCESS_KEYWORDS = ("했습니다", "완료", "success")
+
+# 응답 JSON의 resultCode/code 값
+SUCCESS_CODES = ("success", "ok", "s", "0", "00", "0000", "200")
+FAILURE_CODES = ("fail", "error", "e", "-1")
+
+
+class PunchVerdict:
+    """등록 응답 판정 결과"""
+
+    def __init__(self, success, status, detail, elapsed):
+        self.success = success
+        self.status = status
+        self.detail = detail
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return f"PunchVerdict(success={self.success}, status={self.status}, detail={self.detail!r}, elapsed={self.elapsed:.2f}s)"
+
+
+class PunchResponseWatcher:
+    """
+    페이지의 출퇴근 등록 응답 감시
+
+    버튼 클릭 전에 start()로 리스너를 등록해 두어야 클릭 직후 도착한 응답도 놓치지 않습니다.
+    """
+
+    def __init__(self, page, user_id, action_name, url_pattern=PUNCH_RESPONSE_URL_PATTERN):
+        self.page = page
+        self.user_id = user_id
+        self.action_name = action_name
+        self._pattern = re.compile(url_pattern) if url_pattern else None
+        self._responses = []
+        self._started_at = None
+
+    @property
+    def enabled(self):
+        return self._pattern is not None
+
+    def _matches(self, response):
+        request = response.request
+        return (request.resource_type in ("xhr", "fetch")
+                and request.method != "GET"
+                and bool(self._pattern.search(response.url)))
+
+    def _on_response(self, response):
+        if self._matches(response):
+            self._responses.append(response)
+
+    def start(self):
+        """응답 리스너 등록"""
+        if not self.enabled:
+            return
+        self._started_at = time.time()
+        self.page.on("response", self._on_response)
+
+    def stop(self):
+        """응답 리스너 해제"""
+        if not self.enabled or self._started_at is None:
+            return
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception as e:
+            logger.debug(f"[{self.user_id}] [{self.action_name}] 응답 리스너 해제 실패: {e}")
+        self._started_at = None
+
+    def wait(self, timeout_ms):
+        """등록 응답 판정 결과 반환 - 미설정 시 None, 타임아웃 시 예외"""
+        if not self.enabled or self._started_at is None:
+            return None
+
+        if self._responses:
+            response = self._responses[-1]
+        else:
+            try:
+                response = self.page.wait_for_event("response", predicate=self._matches, timeout=timeout_ms)
+            except Exception as e:
+                logger.info(f"[{self.user_id}] [{self.action_name}] 출퇴근 등록 응답 미수신 (DOM 검증으로 진행): {e}")
+                raise
+
+        verdict = self._judge(response)
+        if verdict:
+            logger.info(f"[{self.user_id}] [{self.action_name}] 출퇴근 등록 응답 판정: {verdict}")
+        return verdict
+
+    def _judge(self, response):
+        """
+        상태 코드와 응답 본문으로 성공/실패 판정
+        성공은 명시적인 근거(success/result == True, 성공 코드/메시지)가 있을 때만 인정하고
+        판단할 수 없으면 None 반환 (세션 만료 로그인 페이지, 200 오류 페이지 등은 DOM 검증으로 확인)
+        """
+        if response is None:
+            return None
+
+        elapsed = time.time() - self._started_at
+        status = response.status
+        if status >= 400:
+            return PunchVerdict(False, status, f"HTTP {status}", elapsed)
+
+        try:
+            body = response.text()
+        except Exception as e:
+            logger.info(f"[{self.user_id}] [{self.action_name}] 등록 응답 본문 확인 불가 (DOM 검증으로 진행): {e}")
+            return None
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+
+        if isinstance(payload, dict):
+            for key in ("success", "result", "isSuccess"):
+                if payload.get(key) is False:
+                    return PunchVerdict(False, status, self._payload_message(payload), elapsed)
+            code = str(payload.get("resultCode", payload.get("code", ""))).lower()
+            if code in FAILURE_CODES:
+                return PunchVerdict(False, status, self._payload_message(payload), elapsed)
+
+            message = self._payload_message(payload)
+            if (any(payload.get(key) is True for key in ("success", "result", "isSuccess"))
+                    or code in SUCCESS_CODES
+                    or self._has_success_message(message)):
+                return PunchVerdict(True, status, message, elapsed)
+            return self._undetermined(status, message)
+
+        # HTML 응답은 로그인 페이지/오류 페이지일 수 있어 응답만으로 판정하지 않음
+        if body.lstrip().startswith("<"):
+            return self._undetermined(status, f"HTML 응답 ({len(body)} bytes)")
+
+        lowered = body.lower()
+        for keyword in FAILURE_KEYWORDS:
+            if keyword in lowered:
+                return PunchVerdict(False, status, body.strip()[:200], elapsed)
+        if self._has_success_message(body):
+            return PunchVerdict(True, status, body.strip()[:200], elapsed)
+        return self._undetermined(status, body.strip()[:200])
+
+    def _undetermined(self, status, detail):
+        logger.info(f"[{self.user_id}] [{self.action_name}] 등록 응답에 성공 근거 없음 (HTTP {status}, DOM 검증으로 진행): {detail}")
+        return None
+
+    @staticmethod
+    def _has_success_message(message):
+        lowered = message.lower()
+        if any(keyword in lowered for keyword in FAILURE_KEYWORDS):
+            return False
+        return any(keyword in lowered for keyword in SUCCESS_KEYWORDS)
+
+    def _payload_message(self, payload):
+        for key in ("message", "msg", "resultMsg", "errorMessage"):
+            if payload.get(key):
+                return str(payload[key])[:200]
+        return json.dumps(payload, ensure_ascii=False)[:200]
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+요청 차단 모듈
+버튼 클릭에 필요 없는 이미지/폰트/미디어와 외부 호스트 요청을
+context.route 단계에서 중단해 프록시 대역폭과 페이지 로드 시간 절감
+"""
+
+import os
+import logging
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 요청 차단 설정 (선택)
+# off: 차단 안 함, light: 이미지/폰트/미디어 차단, strict: light + 외부 호스트 차단
+REQUEST_BLOCK_PROFILE = os.getenv("REQUEST_BLOCK_PROFILE", "light")
+REQUEST_BLOCK_ALLOW_HOSTS = [h.strip() for h in os.getenv("REQUEST_BLOCK_ALLOW_HOSTS", "").split(",") if h.strip()]
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# 차단한 요청의 예상 크기 (바이트) - 응답을 받지 않으므로 리소스 종류별 평균값으로 추정
+ESTIMATED_BYTES = {
+    "image": 30 * 1024,
+    "font": 60 * 1024,
+    "media": 500 * 1024,
+    "script": 50 * 1024,
+    "stylesheet": 20 * 1024
+}
+DEFAULT_ESTIMATED_BYTES = 10 * 1024
+
+
+class RequestBlocker:
+    """컨텍스트 단위 요청 차단기 (실행별 차단 통계 포함)"""
+
+    def __init__(self, first_party_urls, profile=REQUEST_BLOCK_PROFILE, allow_hosts=None):
+        self.profile = profile if profile in ("off", "light", "strict") else "light"
+        self.allow_hosts = {urlparse(url).hostname for url in first_party_urls if url}
+        self.allow_hosts.update(allow_hosts if allow_hosts is not None else REQUEST_BLOCK_ALLOW_HOSTS)
+        self.allow_hosts.discard(None)
+
+        self.stats = {
+            "allowed": 0,
+            "blocked": 0,
+            "blocked_by_type": 0,
+            "blocked_by_host": 0,
+            "saved_bytes": 0
+        }
+
+    @property
+    def enabled(self):
+        return self.profile != "off"
+
+    def install(self, context):
+        """컨텍스트에 라우트 등록"""
+        if not self.enabled:
+            return
+        context.route("**/*", self._handle)
+
+    def _is_allowed_host(self, host):
+        if not host:
+            return True
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.allow_hosts)
+
+    def _block_reason(self, request):
+        # 메인 프레임 이동은 차단하지 않음 (로그인/출퇴근 페이지 자체)
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            return None
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            return "type"
+        if self.profile == "strict" and not self._is_allowed_host(urlparse(request.url).hostname):
+            return "host"
+        return None
+
+    def _handle(self, route):
+        request = route.request
+        try:
+            reason = self._block_reason(request)
+        except Exception as e:
+            logger.debug(f"요청 차단 판정 실패 (허용): {e}")
+            reason = None
+
+        if reason is None:
+            self.stats["allowed"] += 1
+            route.continue_()
+            return
+
+        self.stats["blocked"] += 1
+        self.stats[f"blocked_by_{reason}"] += 1
+        self.stats["saved_bytes"] += ESTIMATED_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+        route.abort("blockedbyclient")
+
+    def format_stats(self):
+        """차단 통계 문자열"""
+        if not self.enabled:
+            return "요청 차단 비활성화"
+        return (f"요청 차단({self.profile}) - 허용: {self.stats['allowed']}, 차단: {self.stats['blocked']} "
+                f"(종류: {self.stats['blocked_by_type']}, 호스트: {self.stats['blocked_by_host']}), "
+                f"절감 추정: {self.stats['saved_bytes'] / 1024:.0f}KB")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+응답 캐시 모듈
+대시보드 조회 API 응답을 (user_id, 엔드포인트, 파라미터) 단위로 RESPONSE_CACHE_TTL초 동안 메모리에 보관
+사용자 데이터가 바뀌면 NOTIFY로 모든 gunicorn 워커의 해당 사용자 캐시를 즉시 무효화
+- schedule_changed: attendance_schedules 트리거 (schema_schedule_notify.sql)
+- user_data_changed: users / attendance_logs 트리거 (schema_user_data_notify.sql)
+(LISTEN 연결이 끊긴 동안에는 캐시를 쓰지 않음 - 변경 누락 방지)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import date
+from functools import wraps
+from dotenv import load_dotenv
+from pg_listener import pg_listener
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 응답 캐시 설정 (선택)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))  # 초 - NOTIFY 누락 대비 최대 보관 시간
+
+# 무효화 채널 (payload: {"user_id": ...})
+RESPONSE_CACHE_CHANNELS = ("schedule_changed", "user_data_changed")
+
+
+class ResponseCache:
+    """사용자별 응답 캐시 + LISTEN 기반 무효화"""
+
+    def __init__(self, enabled=RESPONSE_CACHE_ENABLED, ttl_seconds=RESPONSE_CACHE_TTL):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = {}  # user_id -> {(엔드포인트, 파라미터): (저장 시각, 응답 본문)}
+        self._generation = 0  # 무효화할 때마다 증가
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0
+        }
+
+    # ==================== 조회 ====================
+
+    def _is_listening(self):
+        return all(pg_listener.is_listening(channel) for channel in RESPONSE_CACHE_CHANNELS)
+
+    def get(self, user_id, key):
+        """캐시된 응답 본문 (없거나 만료되었으면 None)"""
+        if not self._is_listening():
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                self.stats["hits"] += 1
+                return entry[1]
+        return None
+
+    def put(self, user_id, key, body, generation):
+        """응답 본문 저장 - 조회 시작 후 무효화되었으면 저장하지 않음 (오래된 응답 캐시 방지)"""
+        if not self._is_listening():
+            return
+        with self._lock:
+            if generation == self._generation:
+                self._entries.setdefault(user_id, {})[key] = (time.monotonic(), body)
+
+    def cached(self, endpoint, args=()):
+        """
+        Flask 뷰 데코레이터 - @jwt_required() 아래에 적용
+        키: (JWT 사용자, endpoint, 요청 파라미터 args 값, 오늘 날짜) - 200 응답만 캐시
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*view_args, **view_kwargs):
+                if not self.enabled:
+                    return view(*view_args, **view_kwargs)
+
+                from flask import request, current_app
+                from flask_jwt_extended import get_jwt_identity
+
+                user_id = get_jwt_identity()
+                # 파라미터 기본값이 오늘 날짜/연월인 엔드포인트가 있으므로 날짜도 키에 포함
+                key = (endpoint, tuple(request.args.get(name) for name in args), date.today().isoformat())
+
+                body = self.get(user_id, key)
+                if body is not None:
+                    return current_app.response_class(body, mimetype="application/json")
+
+                self.stats["misses"] += 1
+                generation = self._generation
+                result = view(*view_args, **view_kwargs)
+
+                response, status = (result[0], result[1]) if isinstance(result, tuple) else (result, None)
+                if (status or response.status_code) == 200:
+                    self.put(user_id, key, response.get_data(), generation)
+                return result
+            return wrapper
+        return decorator
+
+    # ==================== 무효화 ====================
+
+    def invalidate(self, user_id=None):
+        """캐시 무효화 - user_id 생략 시 전체"""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+            self.stats["invalidations"] += 1
+
+    def _handle_notify(self, payload):
+        try:
+            self.invalidate(json.loads(payload)["user_id"])
+        except (ValueError, KeyError, TypeError):
+            # 형식을 알 수 없으면 전체 무효화
+            self.invalidate()
+
+    def format_stats(self):
+        """캐시 통계 문자열"""
+        return (f"응답 캐시 - 적중: {self.stats['hits']}, 미스: {self.stats['misses']}, "
+                f"무효화: {self.stats['invalidations']}, LISTEN: {'연결' if self._is_listening() else '끊김'}")
+
+
+# 전역 응답 캐시 인스턴스
+response_cache = ResponseCache()
+for _channel in RESPONSE_CACHE_CHANNELS:
+    pg_listener.subscribe(_channel, response_cache._handle_notify, response_cache.invalidate)
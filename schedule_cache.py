@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+스케줄 캐시 모듈
+사용자별 1년치 attendance_schedules를 메모리에 올려두고
+attendance_schedules 트리거가 보내는 NOTIFY(schedule_changed)로 즉시 무효화
+(LISTEN 연결이 끊긴 동안에는 캐시를 쓰지 않고 DB를 직접 조회 - 변경 누락 방지)
+트리거는 schema_schedule_notify.sql, LISTEN 연결은 pg_listener.py
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import date as date_type
+from dotenv import load_dotenv
+from sqlalchemy import text
+from db_manager import db_manager
+from pg_listener import pg_listener
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 스케줄 캐시 설정 (선택)
+SCHEDULE_CACHE_ENABLED = os.getenv("SCHEDULE_CACHE_ENABLED", "true").lower() == "true"
+SCHEDULE_CACHE_TTL = int(os.getenv("SCHEDULE_CACHE_TTL", "3600"))  # 초 - NOTIFY 누락 대비 최대 보관 시간
+
+SCHEDULE_NOTIFY_CHANNEL = "schedule_changed"
+
+
+class ScheduleCache:
+    """사용자/연도 단위 스케줄 캐시 + LISTEN 기반 무효화"""
+
+    def __init__(self, enabled=SCHEDULE_CACHE_ENABLED, ttl_seconds=SCHEDULE_CACHE_TTL):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = {}  # (user_id, year) -> (로드 시각, {date: 스케줄})
+        self._generation = 0  # 무효화할 때마다 증가
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0
+        }
+
+    # ==================== 조회 ====================
+
+    def get_year(self, user_id, year):
+        """사용자의 해당 연도 스케줄 {date: {...}} 반환 (캐시 미스 시 한 번의 쿼리로 1년치 로드)"""
+        if not self.enabled:
+            return self._load(user_id, year)
+
+        key = (user_id, year)
+
+        # LISTEN 중일 때만 캐시 사용 (연결이 끊긴 동안의 변경은 알 수 없음)
+        if self._is_listening():
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                    self.stats["hits"] += 1
+                    return entry[1]
+
+        self.stats["misses"] += 1
+        generation = self._generation
+        loaded_at = time.monotonic()
+        schedules = self._load(user_id, year)
+
+        if self._is_listening():
+            with self._lock:
+                # 로드 도중 무효화되었으면 저장하지 않음 (오래된 데이터 캐시 방지)
+                if generation == self._generation:
+                    self._entries[key] = (loaded_at, schedules)
+        return schedules
+
+    def get_range(self, user_id, start_date, end_date):
+        """기간 내 스케줄 목록 (날짜순)"""
+        schedules = []
+        for year in range(start_date.year, end_date.year + 1):
+            schedules.extend(
+                schedule for day, schedule in self.get_year(user_id, year).items()
+                if start_date <= day <= end_date
+            )
+        return sorted(schedules, key=lambda s: s["schedule_date"])
+
+    def get_day(self, user_id, day):
+        """특정 날짜 스케줄 (없으면 None)"""
+        return self.get_year(user_id, day.year).get(day)
+
+    def _load(self, user_id, year):
+        session = db_manager.get_session()
+        try:
+            result = session.execute(
+                text("""
+                    SELECT schedule_date, is_workday, schedule_type,
+                           punch_in_time, punch_out_time, notes
+                    FROM attendance_schedules
+                    WHERE user_id = :user_id
+                    AND schedule_date >= :start_date AND schedule_date < :end_date
+                    ORDER BY schedule_date
+                """),
+                {"user_id": user_id, "start_date": date_type(year, 1, 1), "end_date": date_type(year + 1, 1, 1)}
+            )
+            return {row.schedule_date: dict(row._mapping) for row in result.fetchall()}
+        finally:
+            session.close()
+
+    # ==================== 무효화 ====================
+
+    def invalidate(self, user_id=None, year=None):
+        """캐시 무효화 - user_id 생략 시 전체, year 생략 시 해당 사용자 전체 연도"""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == user_id and (year is None or k[1] == year)]:
+                    del self._entries[key]
+            self.stats["invalidations"] += 1
+
+    def _handle_notify(self, payload):
+        try:
+            change = json.loads(payload)
+            self.invalidate(change.get("user_id"), change.get("year"))
+            logger.debug(f"스케줄 변경 알림 - 캐시 무효화: {change}")
+        except (ValueError, AttributeError):
+            # 형식을 알 수 없으면 전체 무효화
+            self.invalidate()
+
+    def _is_listening(self):
+        return pg_listener.is_listening(SCHEDULE_NOTIFY_CHANNEL)
+
+    def format_stats(self):
+        """캐시 통계 문자열"""
+        return (f"스케줄 캐시 - 적중: {self.stats['hits']}, 미스: {self.stats['misses']}, "
+                f"무효화: {self.stats['invalidations']}, LISTEN: {'연결' if self._is_listening() else '끊김'}")
+
+
+# 전역 스케줄 캐시 인스턴스
+schedule_cache = ScheduleCache()
+pg_listener.subscribe(SCHEDULE_NOTIFY_CHANNEL, schedule_cache._handle_notify, schedule_cache.invalidate)
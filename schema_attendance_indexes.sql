@@ -0,0 +1,33 @@
+-- 출퇴근 이력 조회용 복합 인덱스
+-- DATE(attempt_time) = :today 조건을 반열림 구간(attempt_time >= :start AND attempt_time < :end)으로 바꾼 쿼리용
+-- 운영 중 테이블 잠금을 피하기 위해 CONCURRENTLY 사용 (트랜잭션 밖에서 실행: psql -f schema_attendance_indexes.sql)
+
+-- 오늘 성공 이력 확인 (has_today_success, get_punch_eligibility, 오늘 상태/요약 조회)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attendance_logs_user_action_time_success
+    ON attendance_logs(user_id, action_type, attempt_time)
+    WHERE status IN ('success', 'already_done');
+
+-- 사용자별 출퇴근 기록 조회 (날짜 범위 필터 + 최신순 정렬, 주간 통계)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attendance_logs_user_time
+    ON attendance_logs(user_id, attempt_time DESC);
+
+-- 사용자별 크롤링 진행상태 조회 (날짜 범위 필터 + 최신순 정렬)
+-- 주의: schema_log_partitioning.sql 적용 전에만 실행 (파티션 테이블에는 CONCURRENTLY 불가 - 전환 후에는 부모 인덱스가 대신함)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_heartbeat_status_user_time
+    ON heartbeat_status(user_id, timestamp DESC);
+
+-- 통계 갱신 (새 인덱스를 플래너가 바로 사용하도록)
+ANALYZE attendance_logs;
+ANALYZE heartbeat_status;
+
+-- 확인: 아래 실행 계획에 Index Scan / Index Only Scan using idx_attendance_logs_user_action_time_success 가 나와야 함
+-- EXPLAIN SELECT EXISTS (
+--     SELECT 1 FROM attendance_logs
+--     WHERE user_id = 'test' AND action_type = 'punch_in'
+--     AND status IN ('success', 'already_done')
+--     AND attempt_time >= CURRENT_DATE AND attempt_time < CURRENT_DATE + INTERVAL '1 day'
+-- );
+
+COMMENT ON INDEX idx_attendance_logs_user_action_time_success IS '사용자/액션별 당일 성공 이력 확인용 부분 인덱스';
+COMMENT ON INDEX idx_attendance_logs_user_time IS '사용자별 출퇴근 기록 기간 조회용 인덱스';
+COMMENT ON INDEX idx_heartbeat_status_user_time IS '사용자별 하트비트 기간 조회용 인덱스';
@@ -0,0 +1,17 @@
+-- 출석 기록 아웃박스 동기화용 멱등 키
+-- attendance_outbox.py가 로컬 SQLite 기록을 동기화할 때 INSERT ... ON CONFLICT (idempotency_key)로 중복 생성 방지
+-- (기존 행과 DB에 직접 기록된 행은 NULL - UNIQUE 인덱스에서 NULL끼리는 충돌하지 않음)
+
+ALTER TABLE attendance_logs ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(64);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_logs_idempotency_key ON attendance_logs(idempotency_key);
+
+-- 아웃박스 기록 버전 - 여러 프로세스가 같은 기록을 동기화할 때 더 새 버전만 반영 (이전 상태로 덮어쓰기 방지)
+ALTER TABLE attendance_logs ADD COLUMN IF NOT EXISTS outbox_version INTEGER;
+
+-- 임시 ID로 저장된 하트비트를 실제 ID로 교체할 때 사용
+CREATE INDEX IF NOT EXISTS idx_heartbeat_status_attendance_log_id ON heartbeat_status(attendance_log_id);
+
+-- 컬럼 설명 주석
+COMMENT ON COLUMN attendance_logs.idempotency_key IS '아웃박스 동기화 멱등 키 (로컬 기록 생성 시 발급)';
+COMMENT ON COLUMN attendance_logs.outbox_version IS '마지막으로 반영된 아웃박스 기록 버전 (직접 기록된 행은 NULL)';
@@ -0,0 +1,31 @@
+-- 출퇴근 명령 작업 테이블
+-- /api/command는 작업을 등록하고 job_id를 즉시 반환, 실제 처리는 crawl_worker.py가 SKIP LOCKED로 가져가 담당
+-- 진행 상황은 GET /api/jobs/<job_id> (gunicorn 워커가 여러 개여도 같은 작업을 조회할 수 있도록 DB에 저장)
+
+CREATE TABLE IF NOT EXISTS command_jobs (
+    job_id VARCHAR(32) PRIMARY KEY,
+    command VARCHAR(20) NOT NULL,
+    engine VARCHAR(20),
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, completed, failed, abandoned
+    progress JSONB NOT NULL DEFAULT '{}'::jsonb,    -- {user_id: queued/running/success/already_done/failed/skipped}
+    error_message TEXT,
+    owner VARCHAR(100),                             -- 처리 중인 호스트:pid
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 같은 명령은 동시에 하나만 대기/실행 (중복 요청은 기존 작업 ID 반환)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_command_jobs_inflight ON command_jobs(command)
+    WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_command_jobs_created_at ON command_jobs(created_at);
+
+-- 크롤링 워커의 대기 작업 조회 (WHERE status = 'queued' ORDER BY created_at FOR UPDATE SKIP LOCKED)
+CREATE INDEX IF NOT EXISTS idx_command_jobs_queued ON command_jobs(created_at) WHERE status = 'queued';
+
+-- 테이블 설명 주석
+COMMENT ON TABLE command_jobs IS '워치독 출퇴근 명령 작업 (비동기 실행, 사용자별 진행 상황)';
+COMMENT ON COLUMN command_jobs.progress IS '사용자별 처리 상태';
+COMMENT ON COLUMN command_jobs.updated_at IS '마지막 진행 시각 (실행 중 주기적 갱신) - COMMAND_JOB_STALE_SECONDS 동안 변화가 없으면 abandoned 처리';
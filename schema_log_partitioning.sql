@@ -0,0 +1,79 @@
+-- heartbeat_status / system_logs 일별 범위 파티셔닝
+-- 기존 테이블을 그대로 "이전 데이터" 파티션으로 붙여 데이터 복사 없이 전환
+-- 이후 일별 파티션 생성과 보관 기간이 지난 파티션 삭제는 partition_manager.py (워치독 매일 실행)가 담당
+--
+-- 주의: system_logs의 시각 컬럼은 created_at (INSERT 시 DEFAULT CURRENT_TIMESTAMP)으로 가정
+--       컬럼명이 다르면 아래 system_logs 구간을 수정 (partition_manager.py는 파티션 키 컬럼을 카탈로그에서 조회)
+-- 실행: psql -f schema_log_partitioning.sql (서비스 중지 후 실행 권장)
+--
+-- 적용 순서: schema_attendance_indexes.sql -> schema_pagination_indexes.sql -> 이 스크립트
+--       파티션 테이블에는 CREATE/DROP INDEX CONCURRENTLY를 쓸 수 없으므로 위 두 스크립트의 heartbeat_status 구문은
+--       전환 후 실패함 - 전환 후에는 다시 실행하지 말 것 (heartbeat_status 인덱스는 아래에서 부모 테이블에 생성)
+
+BEGIN;
+
+-- ==================== heartbeat_status ====================
+
+ALTER TABLE heartbeat_status RENAME TO heartbeat_status_legacy;
+
+CREATE TABLE heartbeat_status (
+    LIKE heartbeat_status_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (timestamp);
+
+-- id 시퀀스 소유권 이전 (이전 데이터 파티션을 삭제해도 시퀀스 유지)
+ALTER SEQUENCE IF EXISTS heartbeat_status_id_seq OWNED BY heartbeat_status.id;
+
+-- 범위 밖(시각 NULL 등) 행 보관용
+CREATE TABLE heartbeat_status_default PARTITION OF heartbeat_status DEFAULT;
+
+-- 시각이 없는 행은 범위 파티션에 붙일 수 없으므로 기본 파티션으로 이동
+INSERT INTO heartbeat_status SELECT * FROM heartbeat_status_legacy WHERE timestamp IS NULL;
+DELETE FROM heartbeat_status_legacy WHERE timestamp IS NULL;
+
+-- 기존 데이터 전체를 내일 0시 이전 구간 파티션으로 연결 (오늘 들어오는 행도 여기에 저장)
+DO $$
+BEGIN
+    EXECUTE format(
+        'ALTER TABLE heartbeat_status ATTACH PARTITION heartbeat_status_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+        CURRENT_DATE + 1
+    );
+END $$;
+
+-- 파티션 인덱스 (모든 파티션에 자동 생성)
+CREATE INDEX IF NOT EXISTS idx_heartbeat_status_p_user_time_id ON heartbeat_status(user_id, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_heartbeat_status_p_log_time ON heartbeat_status(attendance_log_id, timestamp);
+
+-- ==================== system_logs ====================
+
+ALTER TABLE system_logs RENAME TO system_logs_legacy;
+
+CREATE TABLE system_logs (
+    LIKE system_logs_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (created_at);
+
+ALTER SEQUENCE IF EXISTS system_logs_id_seq OWNED BY system_logs.id;
+
+CREATE TABLE system_logs_default PARTITION OF system_logs DEFAULT;
+
+INSERT INTO system_logs SELECT * FROM system_logs_legacy WHERE created_at IS NULL;
+DELETE FROM system_logs_legacy WHERE created_at IS NULL;
+
+DO $$
+BEGIN
+    EXECUTE format(
+        'ALTER TABLE system_logs ATTACH PARTITION system_logs_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+        CURRENT_DATE + 1
+    );
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_system_logs_p_created_at ON system_logs(created_at);
+CREATE INDEX IF NOT EXISTS idx_system_logs_p_component_created_at ON system_logs(component, created_at);
+
+COMMIT;
+
+-- 테이블 설명 주석
+COMMENT ON TABLE heartbeat_status IS '크롤링 단계별 하트비트 (일별 파티션, 보관 기간 경과 시 파티션 삭제)';
+COMMENT ON TABLE system_logs IS '시스템 로그 (일별 파티션, 보관 기간 경과 시 파티션 삭제)';
+
+-- 일별 파티션 즉시 생성 (워치독 없이 실행할 때)
+-- python -c "from partition_manager import partition_manager; partition_manager.run()"
@@ -0,0 +1,26 @@
+-- 키셋 페이지네이션용 복합 인덱스
+-- WHERE user_id = :user_id AND (시각, id) < (:cursor_time, :cursor_id) ORDER BY 시각 DESC, id DESC LIMIT :limit
+-- 조건을 인덱스 범위 탐색 한 번으로 처리 (OFFSET처럼 앞 페이지 행을 건너뛰며 읽지 않음)
+-- 운영 중 테이블 잠금을 피하기 위해 CONCURRENTLY 사용 (트랜잭션 밖에서 실행: psql -f schema_pagination_indexes.sql)
+
+-- 출퇴근 기록 조회 (/api/web/user/attendance)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_attendance_logs_user_time_id
+    ON attendance_logs(user_id, attempt_time DESC, id DESC);
+
+-- 크롤링 진행상태 조회 (/api/web/user/heartbeat)
+-- 주의: heartbeat_status 구문은 schema_log_partitioning.sql 적용 전에만 실행
+--       (파티션 테이블에는 CONCURRENTLY 불가 - 전환 후에는 idx_heartbeat_status_p_user_time_id가 대신함)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_heartbeat_status_user_time_id
+    ON heartbeat_status(user_id, timestamp DESC, id DESC);
+
+-- 사용자 변경 로그 조회 (/api/web/user/change-logs)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_change_logs_user_changed_at_id
+    ON user_change_logs(user_id, changed_at DESC, id DESC);
+
+-- 위 인덱스와 앞부분이 같아 중복되는 인덱스 정리 (schema_attendance_indexes.sql)
+DROP INDEX CONCURRENTLY IF EXISTS idx_attendance_logs_user_time;
+DROP INDEX CONCURRENTLY IF EXISTS idx_heartbeat_status_user_time;
+
+COMMENT ON INDEX idx_attendance_logs_user_time_id IS '출퇴근 기록 키셋 페이지네이션용 인덱스';
+COMMENT ON INDEX idx_heartbeat_status_user_time_id IS '하트비트 키셋 페이지네이션용 인덱스';
+COMMENT ON INDEX idx_user_change_logs_user_changed_at_id IS '변경 로그 키셋 페이지네이션용 인덱스';
@@ -0,0 +1,35 @@
+-- 스케줄 변경 알림 트리거
+-- attendance_schedules가 바뀌면 schedule_changed 채널로 {"user_id": ..., "year": ...} 알림
+-- schedule_cache.py가 LISTEN으로 받아 해당 사용자/연도 캐시를 즉시 무효화
+-- (같은 트랜잭션 안의 동일 알림은 Postgres가 하나로 합침 - 월 단위 대량 생성도 알림 1건)
+
+CREATE OR REPLACE FUNCTION notify_schedule_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify('schedule_changed', json_build_object(
+            'user_id', OLD.user_id,
+            'year', EXTRACT(YEAR FROM OLD.schedule_date)::int
+        )::text);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM pg_notify('schedule_changed', json_build_object(
+            'user_id', NEW.user_id,
+            'year', EXTRACT(YEAR FROM NEW.schedule_date)::int
+        )::text);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_attendance_schedules_notify ON attendance_schedules;
+
+CREATE TRIGGER trg_attendance_schedules_notify
+    AFTER INSERT OR UPDATE OR DELETE ON attendance_schedules
+    FOR EACH ROW EXECUTE FUNCTION notify_schedule_changed();
+
+-- 캐시 로드 쿼리 (사용자별 연도 범위 조회)
+CREATE INDEX IF NOT EXISTS idx_attendance_schedules_user_date ON attendance_schedules(user_id, schedule_date);
+
+COMMENT ON FUNCTION notify_schedule_changed() IS '스케줄 변경 시 schedule_changed 채널로 사용자/연도 알림 (스케줄 캐시 무효화용)';
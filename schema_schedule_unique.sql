@@ -0,0 +1,25 @@
+-- 스케줄 (user_id, schedule_date) 유일 제약
+-- 기본 스케줄 일괄 생성(INSERT ... SELECT generate_series ... ON CONFLICT DO NOTHING)의 충돌 대상
+
+-- 중복 스케줄 정리 (같은 사용자/날짜는 가장 나중에 생성된 행만 유지)
+DELETE FROM attendance_schedules a
+USING attendance_schedules b
+WHERE a.user_id = b.user_id
+  AND a.schedule_date = b.schedule_date
+  AND a.id < b.id;
+
+-- 유일 제약 추가 (이미 있으면 건너뜀)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_attendance_schedules_user_date'
+    ) THEN
+        ALTER TABLE attendance_schedules
+            ADD CONSTRAINT uq_attendance_schedules_user_date UNIQUE (user_id, schedule_date);
+    END IF;
+END $$;
+
+-- 유일 제약 인덱스와 중복되는 인덱스 정리 (schema_schedule_notify.sql)
+DROP INDEX IF EXISTS idx_attendance_schedules_user_date;
+
+COMMENT ON CONSTRAINT uq_attendance_schedules_user_date ON attendance_schedules IS '사용자별 날짜당 스케줄 1건';
@@ -0,0 +1,33 @@
+-- 사용자 데이터 변경 알림 트리거
+-- users / attendance_logs가 바뀌면 user_data_changed 채널로 {"user_id": ...} 알림
+-- response_cache.py가 LISTEN으로 받아 모든 gunicorn 워커의 해당 사용자 응답 캐시를 즉시 무효화
+-- (크롤링 워커/아웃박스 동기화가 기록한 출퇴근 결과도 웹 서버 캐시에 바로 반영)
+-- 스케줄 변경은 기존 schedule_changed 트리거 사용 (schema_schedule_notify.sql)
+
+CREATE OR REPLACE FUNCTION notify_user_data_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify('user_data_changed', json_build_object('user_id', OLD.user_id)::text);
+    END IF;
+
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id) THEN
+        PERFORM pg_notify('user_data_changed', json_build_object('user_id', NEW.user_id)::text);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_notify ON users;
+
+CREATE TRIGGER trg_users_notify
+    AFTER UPDATE OR DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_user_data_changed();
+
+DROP TRIGGER IF EXISTS trg_attendance_logs_notify ON attendance_logs;
+
+CREATE TRIGGER trg_attendance_logs_notify
+    AFTER INSERT OR UPDATE OR DELETE ON attendance_logs
+    FOR EACH ROW EXECUTE FUNCTION notify_user_data_changed();
+
+COMMENT ON FUNCTION notify_user_data_changed() IS '사용자/출퇴근 기록 변경 시 user_data_changed 채널로 사용자 알림 (응답 캐시 무효화용)';
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+서버 상태 모듈
+컴포넌트별 한 행만 유지되는 server_heartbeat 테이블(UPSERT)로 생존 여부와 마지막 하트비트 경과 시간 판단
+조회 결과는 SERVER_STATUS_CACHE_SECONDS 동안 메모리에 보관 - 크롤링 트래픽과 무관하게 일정한 비용
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+from sqlalchemy import text
+from db_manager import db_manager
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 서버 상태 설정 (선택)
+SERVER_STATUS_CACHE_SECONDS = float(os.getenv("SERVER_STATUS_CACHE_SECONDS", "5"))
+SERVER_STATUS_MISSED_BEATS = int(os.getenv("SERVER_STATUS_MISSED_BEATS", "3"))  # 하트비트를 이 횟수만큼 놓치면 중단으로 판단
+
+# 컴포넌트 -> 하트비트 주기 (초)
+SERVER_COMPONENTS = {
+    "main_server": 30,   # main_server.heartbeat_worker
+    "watchdog": 60,      # watchdog.monitor_main_server
+    "crawl_worker": 30   # crawl_worker.CRAWL_WORKER_HEARTBEAT_SECONDS
+}
+
+# 정상 종료 시 기록하는 상태 (하트비트가 최근이어도 중단으로 판단)
+STOPPED_STATUSES = ("stopped", "shutting_down")
+
+
+class ServerStatusService:
+    """server_heartbeat 기반 컴포넌트 생존 여부 조회 (짧은 메모리 캐시)"""
+
+    def __init__(self, components=None, cache_seconds=SERVER_STATUS_CACHE_SECONDS, missed_beats=SERVER_STATUS_MISSED_BEATS):
+        self.components = components if components is not None else SERVER_COMPONENTS
+        self.cache_seconds = cache_seconds
+        self.missed_beats = missed_beats
+        self._cached = None
+        self._cached_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_status(self):
+        """컴포넌트별 상태 {component: {alive, status, stage, pid, last_seen, age_seconds}}"""
+        with self._lock:
+            if self._cached is not None and time.monotonic() - self._cached_at < self.cache_seconds:
+                return self._cached
+
+        rows = self._load()
+        now = datetime.now()
+
+        status = {}
+        for component, interval in self.components.items():
+            row = rows.get(component)
+            if row is None or row.updated_at is None:
+                status[component] = {
+                    "alive": False, "status": "unknown", "stage": None,
+                    "pid": None, "last_seen": None, "age_seconds": None
+                }
+                continue
+
+            age = (now - row.updated_at).total_seconds()
+            status[component] = {
+                "alive": age <= interval * self.missed_beats and row.status not in STOPPED_STATUSES,
+                "status": row.status,
+                "stage": row.stage,
+                "pid": row.pid,
+                "last_seen": row.updated_at.isoformat(),
+                "age_seconds": round(age, 1)
+            }
+
+        with self._lock:
+            self._cached = status
+            self._cached_at = time.monotonic()
+        return status
+
+    def get_component(self, component):
+        """단일 컴포넌트 상태 (등록되지 않은 컴포넌트는 None)"""
+        return self.get_status().get(component)
+
+    def _load(self):
+        # 기본키 조회 - 컴포넌트 수만큼의 행만 읽음
+        session = db_manager.get_session()
+        try:
+            result = session.execute(
+                text("""
+                    SELECT component, status, stage, pid, updated_at
+                    FROM server_heartbeat
+                    WHERE component = ANY(:components)
+                """),
+                {"components": list(self.components)}
+            )
+            return {row.component: row for row in result.fetchall()}
+        finally:
+            session.close()
+
+
+# 전역 서버 상태 서비스 인스턴스
+server_status = ServerStatusService()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+로그인 세션 캐시 모듈
+로그인 성공 후 Playwright storage_state를 암호화해 저장하고
+다음 실행에서 로그인 폼을 건너뛰는 데 사용
+"""
+
+import os
+import json
+import hashlib
+import logging
+from dotenv import load_dotenv
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 세션 캐시 설정 (선택) - SESSION_CACHE_KEY가 없으면 캐시 비활성화
+SESSION_CACHE_DIR = os.getenv("SESSION_CACHE_DIR", "sessions")
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "3600"))  # 초
+SESSION_CACHE_KEY = os.getenv("SESSION_CACHE_KEY")
+
+
+class SessionCache:
+    """사용자별 storage_state 암호화 파일 캐시 (Fernet, TTL 적용)"""
+
+    def __init__(self, cache_dir, ttl_seconds, key=None):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._fernet = None
+
+        if not key:
+            logger.info("SESSION_CACHE_KEY 미설정 - 로그인 세션 캐시 비활성화")
+        elif not CRYPTOGRAPHY_AVAILABLE:
+            logger.warning("cryptography 패키지 없음 - 로그인 세션 캐시 비활성화")
+        else:
+            try:
+                self._fernet = Fernet(key.encode('utf-8'))
+            except ValueError as e:
+                logger.error(f"SESSION_CACHE_KEY 형식 오류 - 로그인 세션 캐시 비활성화: {e}")
+
+    @property
+    def enabled(self):
+        return self._fernet is not None
+
+    def _path(self, user_id):
+        # 파일명에 사용자 ID가 드러나지 않도록 해시 사용
+        digest = hashlib.sha256(user_id.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.session")
+
+    def load(self, user_id):
+        """저장된 storage_state 반환 (없거나 만료/손상 시 None)"""
+        if not self.enabled:
+            return None
+
+        path = self._path(user_id)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                token = f.read()
+            # Fernet 토큰에 생성 시각이 포함되어 있어 TTL 검사를 함께 수행
+            state = json.loads(self._fernet.decrypt(token, ttl=self.ttl_seconds))
+            logger.info(f"[{user_id}] 로그인 세션 캐시 적중")
+            return state
+        except InvalidToken:
+            logger.info(f"[{user_id}] 로그인 세션 캐시 만료 또는 손상 - 삭제")
+            self.invalidate(user_id)
+            return None
+        except Exception as e:
+            logger.warning(f"[{user_id}] 로그인 세션 캐시 읽기 실패: {e}")
+            return None
+
+    def save(self, user_id, storage_state):
+        """storage_state 암호화 저장"""
+        if not self.enabled:
+            return False
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            token = self._fernet.encrypt(json.dumps(storage_state).encode('utf-8'))
+
+            # 임시 파일에 쓴 후 교체 (다른 프로세스가 읽는 중 손상 방지)
+            path = self._path(user_id)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(token)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+
+            logger.info(f"[{user_id}] 로그인 세션 캐시 저장")
+            return True
+        except Exception as e:
+            logger.warning(f"[{user_id}] 로그인 세션 캐시 저장 실패: {e}")
+            return False
+
+    def invalidate(self, user_id):
+        """저장된 세션 삭제 (비밀번호 변경/불일치 시 호출)"""
+        try:
+            os.remove(self._path(user_id))
+            logger.info(f"[{user_id}] 로그인 세션 캐시 무효화")
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"[{user_id}] 로그인 세션 캐시 무효화 실패: {e}")
+            return False
+
+
+# 전역 세션 캐시 인스턴스
+session_cache = SessionCache(SESSION_CACHE_DIR, SESSION_CACHE_TTL, SESSION_CACHE_KEY)
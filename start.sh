@@ -47,6 +47,15 @@ cleanup_related_processes() {
         pkill -9 -f "main_server\|gunicorn.*main_server" 2>/dev/null
     fi
 
+    # crawl_worker 관련 프로세스
+    local worker_pids=$(pgrep -f "python.*crawl_worker.py" 2>/dev/null)
+    if [ ! -z "$worker_pids" ]; then
+        echo "   crawl_worker 관련 프로세스 종료 중: $worker_pids"
+        kill $worker_pids 2>/dev/null
+        sleep 2
+        pkill -9 -f "python.*crawl_worker.py" 2>/dev/null
+    fi
+
     # watchdog 관련 프로세스
     local watchdog_pids=$(pgrep -f "python.*watchdog.py" 2>/dev/null)
     if [ ! -z "$watchdog_pids" ]; then
@@ -62,7 +71,7 @@ check_and_kill_port_processes $MAIN_PORT
 cleanup_related_processes
 
 # 기존 PID 파일 정리
-rm -f main_server.pid watchdog.pid auto_chultae.pid heartbeat.txt 2>/dev/null
+rm -f main_server.pid watchdog.pid crawl_worker.pid auto_chultae.pid heartbeat.txt 2>/dev/null
 
 echo "✅ 환경 정리 완료"
 
@@ -116,6 +125,15 @@ for i in {1..15}; do
     fi
 done
 
+echo ""
+echo "🤖 크롤링 워커 시작 중..."
+echo "   - /api/command로 등록된 출퇴근 작업 처리 (웹 서버와 분리)"
+
+# 크롤링 워커 백그라운드 실행
+nohup python3 crawl_worker.py > crawl_worker.out 2>&1 &
+CRAWL_WORKER_PID=$!
+echo $CRAWL_WORKER_PID > crawl_worker.pid
+
 echo ""
 echo "🕐 워치독 시스템 시작 (사용자별 병렬 처리)"
 echo "   - 출근: 월-금 08:00-08:40 (5분간격)"
@@ -130,6 +148,7 @@ echo $WATCHDOG_PID > watchdog.pid
 echo ""
 echo "✅ 시스템 시작 완료"
 echo "   📡 메인 서버 (PID: $MAIN_PID)"
+echo "   🤖 크롤링 워커 (PID: $CRAWL_WORKER_PID)"
 echo "   🕐 워치독 (PID: $WATCHDOG_PID)"
 echo ""
 echo "📁 로그 확인: logs/ 디렉토리"
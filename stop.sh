@@ -37,7 +37,7 @@ complete_cleanup() {
     echo "🔍 완전한 시스템 정리 중..."
 
     # 모든 관련 프로세스 찾기 및 종료
-    local all_pids=$(pgrep -f "main_server\|gunicorn.*main_server\|python.*watchdog\.py\|auto_chultae" 2>/dev/null)
+    local all_pids=$(pgrep -f "main_server\|gunicorn.*main_server\|python.*watchdog\.py\|python.*crawl_worker\.py\|auto_chultae" 2>/dev/null)
 
     if [ ! -z "$all_pids" ]; then
         echo "   관련 프로세스 발견: $all_pids"
@@ -45,7 +45,7 @@ complete_cleanup() {
         sleep 3
 
         # 여전히 살아있는 프로세스 강제 종료
-        local remaining_pids=$(pgrep -f "main_server\|gunicorn.*main_server\|python.*watchdog\.py\|auto_chultae" 2>/dev/null)
+        local remaining_pids=$(pgrep -f "main_server\|gunicorn.*main_server\|python.*watchdog\.py\|python.*crawl_worker\.py\|auto_chultae" 2>/dev/null)
         if [ ! -z "$remaining_pids" ]; then
             echo "   남은 프로세스 강제 종료: $remaining_pids"
             kill -9 $remaining_pids 2>/dev/null
@@ -90,6 +90,29 @@ fi
 
 echo ""
 
+# 크롤링 워커 종료 (실행 중인 작업이 끝날 때까지 최대 60초 대기)
+echo "🤖 크롤링 워커 종료 중..."
+CRAWL_WORKER_PIDS=$( [ -f "crawl_worker.pid" ] && cat crawl_worker.pid || pgrep -f "python.*crawl_worker.py" )
+if [ ! -z "$CRAWL_WORKER_PIDS" ] && ps -p $CRAWL_WORKER_PIDS > /dev/null 2>&1; then
+    kill $CRAWL_WORKER_PIDS 2>/dev/null
+    for i in {1..60}; do
+        if ! ps -p $CRAWL_WORKER_PIDS > /dev/null 2>&1; then
+            echo "   크롤링 워커 정상 종료"
+            break
+        fi
+        sleep 1
+    done
+    if ps -p $CRAWL_WORKER_PIDS > /dev/null 2>&1; then
+        kill -9 $CRAWL_WORKER_PIDS 2>/dev/null
+        echo "   크롤링 워커 강제 종료 (진행 중이던 작업은 abandoned 처리됨)"
+    fi
+else
+    echo "   크롤링 워커가 실행되지 않음"
+fi
+rm -f crawl_worker.pid
+
+echo ""
+
 # 메인 서버 종료
 echo "📡 메인 서버 종료 중..."
 if [ -f "main_server.pid" ]; then
@@ -141,11 +164,11 @@ fi
 complete_cleanup
 
 # 기타 관련 파일 정리
-rm -f main_server.pid watchdog.pid auto_chultae.pid heartbeat.txt 2>/dev/null
+rm -f main_server.pid watchdog.pid crawl_worker.pid auto_chultae.pid heartbeat.txt 2>/dev/null
 
 # 최종 검증
 echo "🔍 최종 정리 검증 중..."
-remaining_processes=$(pgrep -f "main_server\|gunicorn.*main_server\|python.*watchdog\.py" 2>/dev/null)
+remaining_processes=$(pgrep -f "main_server\|gunicorn.*main_server\|python.*watchdog\.py\|python.*crawl_worker\.py" 2>/dev/null)
 port_check=$(ss -tlnp 2>/dev/null | grep ":$MAIN_PORT ")
 
 if [ ! -z "$remaining_processes" ]; then
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+적응형 타임아웃 모듈
+heartbeat_status 이력에서 단계별 소요 시간(다음 하트비트까지의 간격) p50/p99를 계산하고
+각 대기의 타임아웃을 p99×k로 제한 (정적 환경변수 값은 상한으로만 사용)
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import text
+from db_manager import db_manager
+
+# .env 파일 로드
+load_dotenv()
+
+logger = logging.getLogger('auto_chultae')
+
+# 적응형 타임아웃 설정 (선택)
+ADAPTIVE_TIMEOUT_ENABLED = os.getenv("ADAPTIVE_TIMEOUT_ENABLED", "true").lower() == "true"
+ADAPTIVE_TIMEOUT_MULTIPLIER = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "3"))       # p99에 곱할 배수 k
+ADAPTIVE_TIMEOUT_MIN_MS = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_MS", "5000"))              # 예산 하한
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20"))      # 표본이 적으면 정적 값 사용
+ADAPTIVE_TIMEOUT_LOOKBACK_DAYS = int(os.getenv("ADAPTIVE_TIMEOUT_LOOKBACK_DAYS", "14"))
+ADAPTIVE_TIMEOUT_REFRESH_HOURS = int(os.getenv("ADAPTIVE_TIMEOUT_REFRESH_HOURS", "24"))
+
+
+class StageStats:
+    """단계 하나의 소요 시간 분포 (밀리초)"""
+
+    def __init__(self, stage, p50_ms, p99_ms, samples):
+        self.stage = stage
+        self.p50_ms = p50_ms
+        self.p99_ms = p99_ms
+        self.samples = samples
+
+
+class TimeoutAdvisor:
+    """단계별 타임아웃 예산 계산 (하루 한 번 백그라운드 스레드에서 갱신)"""
+
+    def __init__(self, enabled=ADAPTIVE_TIMEOUT_ENABLED, multiplier=ADAPTIVE_TIMEOUT_MULTIPLIER,
+                 min_ms=ADAPTIVE_TIMEOUT_MIN_MS, min_samples=ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+                 lookback_days=ADAPTIVE_TIMEOUT_LOOKBACK_DAYS, refresh_hours=ADAPTIVE_TIMEOUT_REFRESH_HOURS):
+        self.enabled = enabled
+        self.multiplier = multiplier
+        self.min_ms = min_ms
+        self.min_samples = min_samples
+        self.lookback_days = lookback_days
+        self.refresh_seconds = refresh_hours * 3600
+
+        self._stats = {}
+        self._refreshed_at = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _is_stale(self):
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.refresh_seconds
+
+    def refresh(self):
+        """성공한 출퇴근 기록의 하트비트 간격으로 단계별 p50/p99 재계산"""
+        session = db_manager.get_session()
+        try:
+            # 같은 출석 기록 안에서 다음 하트비트까지의 간격 = 해당 단계의 소요 시간
+            result = session.execute(
+                text("""
+                    WITH stage_durations AS (
+                        SELECT h.stage,
+                               EXTRACT(EPOCH FROM (
+                                   LEAD(h.timestamp) OVER (PARTITION BY h.attendance_log_id ORDER BY h.timestamp)
+                                   - h.timestamp
+                               )) * 1000 AS duration_ms
+                        FROM heartbeat_status h
+                        JOIN attendance_logs a ON a.id = h.attendance_log_id
+                        WHERE h.timestamp >= :since
+                          AND a.status = 'success'
+                    )
+                    SELECT stage,
+                           percentile_cont(0.5) WITHIN GROUP (ORDER BY duration_ms) AS p50_ms,
+                           percentile_cont(0.99) WITHIN GROUP (ORDER BY duration_ms) AS p99_ms,
+                           COUNT(*) AS samples
+                    FROM stage_durations
+                    WHERE duration_ms IS NOT NULL
+                    GROUP BY stage
+                """),
+                {"since": datetime.now() - timedelta(days=self.lookback_days)}
+            )
+
+            stats = {
+                row.stage: StageStats(row.stage, float(row.p50_ms), float(row.p99_ms), row.samples)
+                for row in result.fetchall()
+            }
+            self._stats = stats
+            logger.info(f"적응형 타임아웃 갱신 - 단계 {len(stats)}개 (최근 {self.lookback_days}일): {self.format_stats()}")
+        except Exception as e:
+            logger.warning(f"적응형 타임아웃 갱신 실패 (정적 타임아웃 유지): {e}")
+        finally:
+            session.close()
+            # 실패해도 다음 갱신 주기까지는 재시도하지 않음 (크롤링마다 DB 조회 방지)
+            self._refreshed_at = time.monotonic()
+
+    def refresh_async(self):
+        """갱신 주기가 지났으면 백그라운드 스레드에서 refresh (이미 갱신 중이면 무시, 호출자는 기다리지 않음)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._refreshing or not self._is_stale():
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True, name="TimeoutAdvisorRefresh").start()
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def budget(self, stage, default_ms):
+        """
+        단계 타임아웃 예산 (밀리초) - p99×k를 [하한, 정적 값] 범위로 제한
+        집계 쿼리를 기다리지 않음 - 갱신이 필요하면 백그라운드로 시작하고 현재 통계(없으면 정적 값) 사용
+        """
+        if not self.enabled:
+            return default_ms
+
+        self.refresh_async()
+        stats = self._stats.get(stage)
+
+        if not stats or stats.samples < self.min_samples:
+            return default_ms
+
+        return int(min(default_ms, max(self.min_ms, stats.p99_ms * self.multiplier)))
+
+    def format_stats(self):
+        """단계별 분포와 예산 요약 문자열"""
+        if not self._stats:
+            return "적응형 타임아웃 통계 없음"
+        return ", ".join(
+            f"{s.stage}: p50 {s.p50_ms:.0f}ms / p99 {s.p99_ms:.0f}ms (n={s.samples})"
+            for s in sorted(self._stats.values(), key=lambda s: s.stage)
+        )
+
+
+# 전역 타임아웃 어드바이저 인스턴스
+timeout_advisor = TimeoutAdvisor()
@@ -17,6 +17,8 @@ from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.jobstores.memory import MemoryJobStore
 from sqlalchemy import text
 from db_manager import db_manager
+from partition_manager import partition_manager
+from command_jobs import wait_for_command_job, CommandJobNotClaimed, COMMAND_JOB_TIMEOUT
 
 # .env 파일 로드
 load_dotenv()
@@ -74,6 +76,27 @@ def get_users():
             stage="user_query_error")
         return []
 
+def get_punch_targets(action_type):
+    """출퇴근 대상 사용자 조회 (한 번의 쿼리) - 사용자별 판정은 로컬 로그, DB 로그는 요약 1건"""
+    label = "출근" if action_type == "punch_in" else "퇴근"
+    rows = db_manager.get_punch_eligibility(action_type)
+
+    targets = []
+    skipped = {}
+    for row in rows:
+        if row["eligible"]:
+            targets.append(row)
+            logger.info(f"[{row['user_id']}] {label} 처리 대상")
+        else:
+            skipped[row["user_id"]] = row["skip_reason"]
+            logger.info(f"[{row['user_id']}] {row['skip_reason']} - {label} 스킵")
+
+    db_manager.log_system("INFO", "watchdog",
+        f"활성 사용자 {len(rows)}명 {label} 대상 판정 - 대상: {[row['user_id'] for row in targets]}, 스킵: {skipped}",
+        stage="target_check", action_type=action_type)
+
+    return targets
+
 # 메인 서버 헬스체크 및 관리 함수
 def check_main_server_health():
     """메인 서버 헬스체크"""
@@ -316,7 +339,7 @@ def check_crawling_progress():
                     text("""
                         SELECT stage, timestamp, action
                         FROM server_heartbeat
-                        WHERE component = 'main_server'
+                        WHERE component IN ('main_server', 'crawl_worker')
                         AND timestamp > :threshold
                         AND (stage LIKE '%success%' OR stage LIKE '%complete%' OR stage LIKE '%finished%')
                         ORDER BY timestamp DESC
@@ -519,8 +542,39 @@ def monitor_main_server():
                     stage="server_restart_failed")
 
 # 메인 서버 통신 함수들
+def wait_command_job(main_server_url, response, command):
+    """등록된 명령 작업이 끝날 때까지 진행 상황 조회 - 정상 완료 여부 반환"""
+    job_id = response.json()["job_id"]
+    logger.info(f"{command} 작업 등록: {job_id} - 완료 대기")
+
+    try:
+        job = wait_for_command_job(main_server_url, job_id)
+    except CommandJobNotClaimed as e:
+        logger.error(f"🚨 {command} 작업 처리 불가 - 크롤링 워커 확인 필요: {e}")
+        db_manager.log_system("ERROR", "watchdog",
+            f"{command} 작업 처리 불가 - 크롤링 워커 확인 필요: {e}",
+            stage="worker_unavailable", action_type=command)
+        return False
+
+    if job is None:
+        logger.error(f"{command} 작업 대기 시간 초과 ({COMMAND_JOB_TIMEOUT}초): {job_id}")
+        db_manager.log_system("ERROR", "watchdog",
+            f"{command} 작업 대기 시간 초과 ({COMMAND_JOB_TIMEOUT}초): {job_id}",
+            stage="timeout_error", action_type=command)
+        return False
+
+    if job["status"] != "completed":
+        logger.error(f"{command} 작업 {job['status']}: {job_id} - {job['error_message']}")
+        db_manager.log_system("ERROR", "watchdog",
+            f"{command} 작업 {job['status']}: {job_id} - {job['error_message']}",
+            stage="command_failure", action_type=command)
+        return False
+
+    logger.info(f"{command} 작업 완료: {job_id} - 결과: {job['summary']}")
+    return True
+
 def send_command_to_main_server(command):
-    """메인 서버에 명령 전송"""
+    """메인 서버에 명령 작업 등록 후 완료까지 대기"""
     global last_command_start_time, current_command
 
     try:
@@ -542,14 +596,14 @@ def send_command_to_main_server(command):
 
         response = requests.post(f"{main_server_url}/api/command",
                                json={"command": command},
-                               timeout=300)  # 5분 타임아웃 (크롤링 작업 고려)
+                               timeout=30)  # 작업 등록만 하고 즉시 응답 (처리 완료는 /api/jobs로 확인)
 
         # 상세 로깅: 응답 결과
         db_manager.log_system("INFO", "watchdog",
             f"메인 서버 응답 - 상태코드: {response.status_code}, 명령: {command}",
             stage="server_response", action_type=command)
 
-        if response.status_code == 200:
+        if response.status_code in (200, 202) and wait_command_job(main_server_url, response, command):
             logger.info(f"{command} 명령 전송 성공")
             db_manager.log_system("INFO", "watchdog",
                 f"{command} 명령 전송 성공 - 상태코드: {response.status_code}",
@@ -574,8 +628,8 @@ def send_command_to_main_server(command):
                 try:
                     response = requests.post(f"{main_server_url}/api/command",
                                            json={"command": command},
-                                           timeout=300)
-                    if response.status_code == 200:
+                                           timeout=30)
+                    if response.status_code in (200, 202) and wait_command_job(main_server_url, response, command):
                         logger.info(f"{command} 명령 재시도 성공")
                         # 성공 시 명령 완료 기록
                         current_command = None
@@ -616,8 +670,8 @@ def send_command_to_main_server(command):
                 main_server_url = os.getenv('MAIN_SERVER_URL')
                 response = requests.post(f"{main_server_url}/api/command",
                                        json={"command": command},
-                                       timeout=300)
-                if response.status_code == 200:
+                                       timeout=30)
+                if response.status_code in (200, 202) and wait_command_job(main_server_url, response, command):
                     logger.info(f"{command} 명령 재시도 성공")
                     # 성공 시 명령 완료 기록
                     current_command = None
@@ -652,25 +706,13 @@ def send_command_to_main_server(command):
         last_command_start_time = None
         return False
 
-def execute_punch_in_parallel():
-    """출근 처리 실행 (사용자별 병렬 프로세스)"""
+def execute_punch_in_parallel(users_to_process=None):
+    """출근 처리 실행 (사용자별 병렬 프로세스) - 대상 목록이 없으면 직접 조회"""
     logger.info("출근 처리 시작 - 사용자별 병렬 실행")
 
-    users = get_users()
-    if not users:
-        logger.error("활성 사용자를 찾을 수 없습니다")
-        return False
-
-    # 처리가 필요한 사용자 필터링
-    users_to_process = []
-    for user in users:
-        user_id = user["user_id"]
-        is_workday = db_manager.is_workday_scheduled(user_id)
-        has_success_today = db_manager.has_today_success(user_id, "punch_in")
-
-        if is_workday and not has_success_today:
-            users_to_process.append(user)
-            logger.info(f"[{user_id}] 출근 처리 대상에 추가")
+    # 처리가 필요한 사용자 (호출자가 이미 판정한 목록이 있으면 재사용)
+    if users_to_process is None:
+        users_to_process = get_punch_targets("punch_in")
 
     if not users_to_process:
         logger.info("출근 처리가 필요한 사용자 없음")
@@ -693,7 +735,8 @@ def execute_punch_in_parallel():
         ]
 
         logger.info(f"[{user_id}] 출근 프로세스 시작 (포트: {port})")
-        proc = subprocess.Popen(cmd, cwd=os.getcwd())
+        # 사용자별 서브프로세스는 연결 풀 없이 실행 (동시 실행 수만큼 풀이 늘어나지 않도록)
+        proc = subprocess.Popen(cmd, cwd=os.getcwd(), env={**os.environ, "DB_POOL_ROLE": "worker"})
         processes.append((user_id, proc))
 
     # 모든 프로세스 완료 대기
@@ -708,25 +751,13 @@ def execute_punch_in_parallel():
 
     return all_success
 
-def execute_punch_out_parallel():
-    """퇴근 처리 실행 (사용자별 병렬 프로세스)"""
+def execute_punch_out_parallel(users_to_process=None):
+    """퇴근 처리 실행 (사용자별 병렬 프로세스) - 대상 목록이 없으면 직접 조회"""
     logger.info("퇴근 처리 시작 - 사용자별 병렬 실행")
 
-    users = get_users()
-    if not users:
-        logger.error("활성 사용자를 찾을 수 없습니다")
-        return False
-
-    # 처리가 필요한 사용자 필터링
-    users_to_process = []
-    for user in users:
-        user_id = user["user_id"]
-        has_punch_in = db_manager.has_today_success(user_id, "punch_in")
-        has_punch_out = db_manager.has_today_success(user_id, "punch_out")
-
-        if has_punch_in and not has_punch_out:
-            users_to_process.append(user)
-            logger.info(f"[{user_id}] 퇴근 처리 대상에 추가")
+    # 처리가 필요한 사용자 (호출자가 이미 판정한 목록이 있으면 재사용)
+    if users_to_process is None:
+        users_to_process = get_punch_targets("punch_out")
 
     if not users_to_process:
         logger.info("퇴근 처리가 필요한 사용자 없음")
@@ -749,7 +780,8 @@ def execute_punch_out_parallel():
         ]
 
         logger.info(f"[{user_id}] 퇴근 프로세스 시작 (포트: {port})")
-        proc = subprocess.Popen(cmd, cwd=os.getcwd())
+        # 사용자별 서브프로세스는 연결 풀 없이 실행 (동시 실행 수만큼 풀이 늘어나지 않도록)
+        proc = subprocess.Popen(cmd, cwd=os.getcwd(), env={**os.environ, "DB_POOL_ROLE": "worker"})
         processes.append((user_id, proc))
 
     # 모든 프로세스 완료 대기
@@ -764,13 +796,13 @@ def execute_punch_out_parallel():
 
     return all_success
 
-def execute_punch_in():
+def execute_punch_in(users_to_process=None):
     """출근 처리 실행 (병렬 모드 사용)"""
-    return execute_punch_in_parallel()
+    return execute_punch_in_parallel(users_to_process)
 
-def execute_punch_out():
+def execute_punch_out(users_to_process=None):
     """퇴근 처리 실행 (병렬 모드 사용)"""
-    return execute_punch_out_parallel()
+    return execute_punch_out_parallel(users_to_process)
 
 # 스케줄링 함수들
 def punch_in_with_retry():
@@ -791,51 +823,9 @@ def punch_in_with_retry():
             stage="time_check")
         return
 
-    # 모든 활성 사용자의 오늘자 출근 성공 이력 확인
-    users = get_users()
-    users_needing_punch_in = []
-
-    # 상세 로깅: 사용자 목록 조회
-    db_manager.log_system("INFO", "watchdog",
-        f"활성 사용자 {len(users)}명 조회완료: {[u['user_id'] for u in users]}",
-        stage="user_check")
-
-    for user in users:
-        user_id = user["user_id"]
-
-        # 1. 스케줄 확인: 오늘이 출근일인지 확인
-        is_workday = db_manager.is_workday_scheduled(user_id)
-
-        # 상세 로깅: 스케줄 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 스케줄 확인 결과: is_workday={is_workday}",
-            stage="schedule_check", user_id=user_id, action_type="punch_in")
-
-        if not is_workday:
-            logger.info(f"[{user_id}] 오늘은 휴무일로 스케줄되어 있음 - 스킵")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 휴무일로 스케줄되어 있어 출근 처리 스킵",
-                stage="schedule_skip", user_id=user_id, action_type="punch_in")
-            continue
-
-        # 2. 출근 성공 이력 확인
-        has_success_today = db_manager.has_today_success(user_id, "punch_in")
-
-        # 상세 로깅: 출근 이력 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 오늘자 출근 성공 이력: {has_success_today}",
-            stage="history_check", user_id=user_id, action_type="punch_in")
-
-        if has_success_today:
-            logger.info(f"[{user_id}] 오늘자 출근 성공 이력 있음 - 스킵")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 오늘자 출근 성공 이력 있어 스킵",
-                stage="history_skip", user_id=user_id, action_type="punch_in")
-        else:
-            users_needing_punch_in.append(user_id)
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 출근 처리 대상에 추가",
-                stage="target_add", user_id=user_id, action_type="punch_in")
+    # 출근 대상 판정 (스케줄/출근 이력/비밀번호 상태를 한 번의 쿼리로 조회)
+    targets = get_punch_targets("punch_in")
+    users_needing_punch_in = [row["user_id"] for row in targets]
 
     if not users_needing_punch_in:
         logger.info("모든 사용자가 오늘 이미 출근 완료 - 실행하지 않음")
@@ -849,7 +839,7 @@ def punch_in_with_retry():
         f"출근 처리 시도 시작 - 대상 사용자: {users_needing_punch_in}, 현재시간: {current_time}",
         stage="execution_start", action_type="punch_in")
 
-    success = execute_punch_in()
+    success = execute_punch_in(targets)
 
     # 상세 로깅: 실행 결과
     db_manager.log_system("INFO" if success else "ERROR", "watchdog",
@@ -882,53 +872,9 @@ def punch_out_with_retry():
             stage="time_check")
         return
 
-    # 모든 활성 사용자의 오늘자 퇴근 성공 이력 확인
-    users = get_users()
-    users_needing_punch_out = []
-
-    # 상세 로깅: 사용자 목록 조회
-    db_manager.log_system("INFO", "watchdog",
-        f"활성 사용자 {len(users)}명 조회완료: {[u['user_id'] for u in users]}",
-        stage="user_check")
-
-    for user in users:
-        user_id = user["user_id"]
-
-        # 1. 퇴근 성공 이력 확인 (먼저 확인)
-        has_punch_out_success = db_manager.has_today_success(user_id, "punch_out")
-
-        # 상세 로깅: 퇴근 이력 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 오늘자 퇴근 성공 이력: {has_punch_out_success}",
-            stage="punch_out_history_check", user_id=user_id, action_type="punch_out")
-
-        if has_punch_out_success:
-            logger.info(f"[{user_id}] 오늘자 퇴근 성공 이력 있음 - 스킵")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 오늘자 퇴근 성공 이력 있어 스킵",
-                stage="punch_out_skip", user_id=user_id, action_type="punch_out")
-            continue
-
-        # 2. 출근 이력 확인 (출근이 있어야 퇴근 가능)
-        has_punch_in_success = db_manager.has_today_success(user_id, "punch_in")
-
-        # 상세 로깅: 출근 이력 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 오늘자 출근 성공 이력: {has_punch_in_success}",
-            stage="punch_in_history_check", user_id=user_id, action_type="punch_out")
-
-        if not has_punch_in_success:
-            logger.info(f"[{user_id}] 오늘자 출근 이력 없음 - 퇴근 불필요")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 오늘자 출근 이력 없어 퇴근 불필요",
-                stage="punch_in_missing", user_id=user_id, action_type="punch_out")
-            continue
-
-        # 3. 출근 이력이 있으면 퇴근 대상에 추가 (스케줄 무관)
-        users_needing_punch_out.append(user_id)
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 퇴근 처리 대상에 추가",
-            stage="target_add", user_id=user_id, action_type="punch_out")
+    # 퇴근 대상 판정 (출퇴근 이력/비밀번호 상태를 한 번의 쿼리로 조회, 스케줄 무관)
+    targets = get_punch_targets("punch_out")
+    users_needing_punch_out = [row["user_id"] for row in targets]
 
     if not users_needing_punch_out:
         logger.info("모든 사용자가 오늘 이미 퇴근 완료 - 실행하지 않음")
@@ -942,7 +888,7 @@ def punch_out_with_retry():
         f"퇴근 처리 시도 시작 - 대상 사용자: {users_needing_punch_out}, 현재시간: {current_time}",
         stage="execution_start", action_type="punch_out")
 
-    success = execute_punch_out()
+    success = execute_punch_out(targets)
 
     # 상세 로깅: 실행 결과
     db_manager.log_system("INFO" if success else "ERROR", "watchdog",
@@ -981,19 +927,8 @@ def check_missed_schedules():
             stage="missed_punch_in_check")
 
         # 출근 이력이 없는 사용자들에게 출근 처리
-        users = get_users()
-        users_needing_punch_in = []
-
-        for user in users:
-            user_id = user["user_id"]
-            is_workday = db_manager.is_workday_scheduled(user_id)
-            has_success_today = db_manager.has_today_success(user_id, "punch_in")
-
-            if is_workday and not has_success_today:
-                users_needing_punch_in.append(user_id)
-                db_manager.log_system("INFO", "watchdog",
-                    f"[{user_id}] 놓친 출근 처리 대상에 추가",
-                    stage="missed_punch_in_target", user_id=user_id, action_type="punch_in")
+        targets = get_punch_targets("punch_in")
+        users_needing_punch_in = [row["user_id"] for row in targets]
 
         if users_needing_punch_in:
             logger.info(f"놓친 출근 처리 시도 - 대상 사용자: {users_needing_punch_in}")
@@ -1001,7 +936,7 @@ def check_missed_schedules():
                 f"놓친 출근 처리 시도 - 대상 사용자: {users_needing_punch_in}",
                 stage="missed_punch_in_execute", action_type="punch_in")
 
-            success = execute_punch_in_parallel()
+            success = execute_punch_in_parallel(targets)
             if success:
                 logger.info("✅ 놓친 출근 처리 성공")
                 db_manager.log_system("INFO", "watchdog",
@@ -1021,19 +956,8 @@ def check_missed_schedules():
             stage="missed_punch_out_check")
 
         # 출근은 했지만 퇴근 이력이 없는 사용자들에게 퇴근 처리
-        users = get_users()
-        users_needing_punch_out = []
-
-        for user in users:
-            user_id = user["user_id"]
-            has_punch_in_success = db_manager.has_today_success(user_id, "punch_in")
-            has_punch_out_success = db_manager.has_today_success(user_id, "punch_out")
-
-            if has_punch_in_success and not has_punch_out_success:
-                users_needing_punch_out.append(user_id)
-                db_manager.log_system("INFO", "watchdog",
-                    f"[{user_id}] 놓친 퇴근 처리 대상에 추가",
-                    stage="missed_punch_out_target", user_id=user_id, action_type="punch_out")
+        targets = get_punch_targets("punch_out")
+        users_needing_punch_out = [row["user_id"] for row in targets]
 
         if users_needing_punch_out:
             logger.info(f"놓친 퇴근 처리 시도 - 대상 사용자: {users_needing_punch_out}")
@@ -1041,7 +965,7 @@ def check_missed_schedules():
                 f"놓친 퇴근 처리 시도 - 대상 사용자: {users_needing_punch_out}",
                 stage="missed_punch_out_execute", action_type="punch_out")
 
-            success = execute_punch_out_parallel()
+            success = execute_punch_out_parallel(targets)
             if success:
                 logger.info("✅ 놓친 퇴근 처리 성공")
                 db_manager.log_system("INFO", "watchdog",
@@ -1074,6 +998,9 @@ def main():
         logger.info("데이터베이스 연결 성공")
         db_manager.log_system("INFO", "watchdog", "워치독 시스템 시작")
 
+    # 로그 파티션 확인 (오늘/미래 파티션이 없으면 하트비트가 기본 파티션에 쌓임)
+    partition_manager.run()
+
     # 워치독 시작 시 놓친 스케줄 확인
     logger.info("🕐 워치독 시작 - 놓친 스케줄 확인")
     db_manager.log_system("INFO", "watchdog",
@@ -1143,10 +1070,14 @@ def main():
     # 메인 서버 모니터링: 60초마다 체크
     scheduler.add_job(monitor_main_server, 'interval', seconds=60)
 
+    # 로그 파티션 유지보수: 매일 03:00 (미래 파티션 생성, 만료 파티션 삭제)
+    scheduler.add_job(partition_manager.run, 'cron', hour=3, minute=0)
+
     logger.info("스케줄러 시작")
     logger.info("출근 스케줄: 월-금 08:00-08:40 (5분간격)")
     logger.info("퇴근 스케줄: 월-금 18:00-19:00 (5분간격)")
     logger.info("메인 서버 모니터링: 60초마다")
+    logger.info("로그 파티션 유지보수: 매일 03:00")
 
     try:
         scheduler.start()
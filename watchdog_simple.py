@@ -13,6 +13,7 @@ import requests
 from datetime import datetime
 from dotenv import load_dotenv
 from db_manager import db_manager
+from command_jobs import wait_for_command_job, CommandJobNotClaimed, COMMAND_JOB_TIMEOUT
 
 # .env 파일 로드
 load_dotenv()
@@ -65,7 +66,7 @@ def get_users():
         return []
 
 def send_command_to_main_server(command):
-    """메인 서버에 명령 전송"""
+    """메인 서버에 명령 작업 등록 후 완료까지 대기"""
     try:
         main_server_url = os.getenv('MAIN_SERVER_URL')
         if not main_server_url:
@@ -78,10 +79,11 @@ def send_command_to_main_server(command):
 
         logger.info(f"메인 서버에 {command} 명령 전송 시작")
 
+        # 작업 등록만 하고 즉시 응답 (202: 새 작업, 200: 이미 진행 중인 작업)
         response = requests.post(
             f"{main_server_url}/api/command",
             json={"command": command},
-            timeout=300  # 5분 타임아웃
+            timeout=30
         )
 
         # 상세 로깅: 응답 결과
@@ -89,25 +91,46 @@ def send_command_to_main_server(command):
             f"메인 서버 응답 - 상태코드: {response.status_code}, 명령: {command}",
             stage="server_response", action_type=command)
 
-        if response.status_code == 200:
-            logger.info(f"✅ {command} 명령 전송 성공")
+        if response.status_code not in (200, 202):
+            logger.error(f"❌ {command} 명령 전송 실패: HTTP {response.status_code}")
+            db_manager.log_system("ERROR", "watchdog",
+                f"{command} 명령 전송 실패 - 상태코드: {response.status_code}",
+                stage="command_failure", action_type=command)
+            return False
+
+        job_id = response.json()["job_id"]
+        logger.info(f"{command} 작업 등록: {job_id} - 완료 대기")
+
+        # 작업 종료까지 진행 상황 조회
+        try:
+            job = wait_for_command_job(main_server_url, job_id)
+        except CommandJobNotClaimed as e:
+            logger.error(f"🚨 {command} 작업 처리 불가 - 크롤링 워커 확인 필요: {e}")
+            db_manager.log_system("ERROR", "watchdog",
+                f"{command} 작업 처리 불가 - 크롤링 워커 확인 필요: {e}",
+                stage="worker_unavailable", action_type=command)
+            return False
+
+        if job is None:
+            logger.error(f"❌ {command} 작업 대기 시간 초과 ({COMMAND_JOB_TIMEOUT}초): {job_id}")
+            db_manager.log_system("ERROR", "watchdog",
+                f"{command} 작업 대기 시간 초과 ({COMMAND_JOB_TIMEOUT}초): {job_id}",
+                stage="timeout_error", action_type=command)
+            return False
+
+        if job["status"] == "completed":
+            logger.info(f"✅ {command} 작업 완료: {job_id} - 결과: {job['summary']}")
             db_manager.log_system("INFO", "watchdog",
-                f"{command} 명령 전송 성공 - 상태코드: {response.status_code}",
+                f"{command} 작업 완료: {job_id} - 결과: {job['summary']}",
                 stage="command_success", action_type=command)
             return True
         else:
-            logger.error(f"❌ {command} 명령 전송 실패: HTTP {response.status_code}")
+            logger.error(f"❌ {command} 작업 {job['status']}: {job_id} - {job['error_message']}")
             db_manager.log_system("ERROR", "watchdog",
-                f"{command} 명령 전송 실패 - 상태코드: {response.status_code}",
+                f"{command} 작업 {job['status']}: {job_id} - {job['error_message']}",
                 stage="command_failure", action_type=command)
             return False
 
-    except requests.exceptions.Timeout:
-        logger.error(f"❌ {command} 명령 타임아웃 (5분 초과)")
-        db_manager.log_system("ERROR", "watchdog",
-            f"{command} 명령 타임아웃 (5분 초과)",
-            stage="timeout_error", action_type=command)
-        return False
     except requests.exceptions.RequestException as e:
         logger.error(f"❌ {command} 명령 전송 오류: {e}")
         db_manager.log_system("ERROR", "watchdog",
@@ -121,115 +144,37 @@ def send_command_to_main_server(command):
             stage="exception_error", action_type=command)
         return False
 
-def check_punch_in_needed():
-    """출근 처리가 필요한 사용자 확인"""
-    users = get_users()
-    if not users:
+def get_punch_targets(action_type):
+    """출퇴근 대상 사용자 ID 목록 (한 번의 쿼리) - 사용자별 판정은 로컬 로그, DB 로그는 요약 1건"""
+    label = "출근" if action_type == "punch_in" else "퇴근"
+    rows = db_manager.get_punch_eligibility(action_type)
+    if not rows:
         logger.error("활성 사용자를 찾을 수 없습니다")
         return []
 
-    users_needing_punch_in = []
-
-    # 상세 로깅: 사용자 목록 조회
-    db_manager.log_system("INFO", "watchdog",
-        f"활성 사용자 {len(users)}명 조회완료: {[u['user_id'] for u in users]}",
-        stage="user_check")
-
-    for user in users:
-        user_id = user["user_id"]
-
-        # 1. 스케줄 확인: 오늘이 출근일인지
-        is_workday = db_manager.is_workday_scheduled(user_id)
-
-        # 상세 로깅: 스케줄 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 스케줄 확인 결과: is_workday={is_workday}",
-            stage="schedule_check", user_id=user_id, action_type="punch_in")
-
-        if not is_workday:
-            logger.info(f"[{user_id}] 오늘은 휴무일 - 스킵")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 휴무일로 스케줄되어 있어 출근 처리 스킵",
-                stage="schedule_skip", user_id=user_id, action_type="punch_in")
-            continue
-
-        # 2. 출근 성공 이력 확인
-        has_success_today = db_manager.has_today_success(user_id, "punch_in")
-
-        # 상세 로깅: 출근 이력 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 오늘자 출근 성공 이력: {has_success_today}",
-            stage="history_check", user_id=user_id, action_type="punch_in")
-
-        if has_success_today:
-            logger.info(f"[{user_id}] 오늘 이미 출근 완료 - 스킵")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 오늘자 출근 성공 이력 있어 스킵",
-                stage="history_skip", user_id=user_id, action_type="punch_in")
+    targets = []
+    skipped = {}
+    for row in rows:
+        if row["eligible"]:
+            targets.append(row["user_id"])
+            logger.info(f"[{row['user_id']}] {label} 처리 대상")
         else:
-            users_needing_punch_in.append(user_id)
-            logger.info(f"[{user_id}] 출근 처리 대상")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 출근 처리 대상에 추가",
-                stage="target_add", user_id=user_id, action_type="punch_in")
-
-    return users_needing_punch_in
+            skipped[row["user_id"]] = row["skip_reason"]
+            logger.info(f"[{row['user_id']}] {row['skip_reason']} - 스킵")
 
-def check_punch_out_needed():
-    """퇴근 처리가 필요한 사용자 확인"""
-    users = get_users()
-    if not users:
-        logger.error("활성 사용자를 찾을 수 없습니다")
-        return []
-
-    users_needing_punch_out = []
-
-    # 상세 로깅: 사용자 목록 조회
     db_manager.log_system("INFO", "watchdog",
-        f"활성 사용자 {len(users)}명 조회완료: {[u['user_id'] for u in users]}",
-        stage="user_check")
-
-    for user in users:
-        user_id = user["user_id"]
+        f"활성 사용자 {len(rows)}명 {label} 대상 판정 - 대상: {targets}, 스킵: {skipped}",
+        stage="target_check", action_type=action_type)
 
-        # 1. 퇴근 성공 이력 확인
-        has_punch_out_success = db_manager.has_today_success(user_id, "punch_out")
+    return targets
 
-        # 상세 로깅: 퇴근 이력 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 오늘자 퇴근 성공 이력: {has_punch_out_success}",
-            stage="punch_out_history_check", user_id=user_id, action_type="punch_out")
-
-        if has_punch_out_success:
-            logger.info(f"[{user_id}] 오늘 이미 퇴근 완료 - 스킵")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 오늘자 퇴근 성공 이력 있어 스킵",
-                stage="punch_out_skip", user_id=user_id, action_type="punch_out")
-            continue
-
-        # 2. 출근 이력 확인 (출근이 있어야 퇴근 가능)
-        has_punch_in_success = db_manager.has_today_success(user_id, "punch_in")
-
-        # 상세 로깅: 출근 이력 확인 결과
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 오늘자 출근 성공 이력: {has_punch_in_success}",
-            stage="punch_in_history_check", user_id=user_id, action_type="punch_out")
-
-        if not has_punch_in_success:
-            logger.info(f"[{user_id}] 오늘 출근 이력 없음 - 퇴근 불필요")
-            db_manager.log_system("INFO", "watchdog",
-                f"[{user_id}] 오늘자 출근 이력 없어 퇴근 불필요",
-                stage="punch_in_missing", user_id=user_id, action_type="punch_out")
-            continue
-
-        # 퇴근 필요
-        users_needing_punch_out.append(user_id)
-        logger.info(f"[{user_id}] 퇴근 처리 대상")
-        db_manager.log_system("INFO", "watchdog",
-            f"[{user_id}] 퇴근 처리 대상에 추가",
-            stage="target_add", user_id=user_id, action_type="punch_out")
+def check_punch_in_needed():
+    """출근 처리가 필요한 사용자 확인 (출근일 + 오늘 출근 이력 없음)"""
+    return get_punch_targets("punch_in")
 
-    return users_needing_punch_out
+def check_punch_out_needed():
+    """퇴근 처리가 필요한 사용자 확인 (오늘 출근 이력 있음 + 퇴근 이력 없음)"""
+    return get_punch_targets("punch_out")
 
 def punch_in():
     """출근 처리 (1회 실행)"""
@@ -12,7 +12,9 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from dotenv import load_dotenv
-from db_manager import db_manager
+from db_manager import db_manager, day_range, clamp_limit, decode_cursor, split_page
+from server_status import server_status
+from response_cache import response_cache
 from sqlalchemy import text
 
 # .env 파일 로드
@@ -141,41 +143,24 @@ def login():
 @app.route('/api/web/server/status', methods=['GET'])
 @jwt_required()
 def get_server_status():
-    """서버 상태 조회 (실시간)"""
+    """서버 상태 조회 (server_heartbeat 기준 생존 여부, 마지막 하트비트 경과 시간)"""
     try:
-        session = db_manager.get_session()
-        try:
-            # 메인 서버 상태
-            result = session.execute(
-                text("""
-                    SELECT component, status, timestamp
-                    FROM server_heartbeat
-                    WHERE component IN ('main_server', 'watchdog')
-                    ORDER BY component, timestamp DESC
-                """)
-            )
-            heartbeats = result.fetchall()
-
-            server_status = {
-                'main_server': {'status': 'stopped', 'last_seen': None},
-                'watchdog': {'status': 'stopped', 'last_seen': None}
+        components = server_status.get_status()
+        server_status_response = {}
+        for component in ('main_server', 'watchdog', 'crawl_worker'):
+            info = components[component]
+            if info['last_seen'] is None:
+                state = 'stopped'
+            else:
+                state = info['status'] if info['alive'] else 'timeout'
+            server_status_response[component] = {
+                'status': state,
+                'alive': info['alive'],
+                'last_seen': info['last_seen'],
+                'age_seconds': info['age_seconds']
             }
 
-            for hb in heartbeats:
-                component = hb[0]
-                if component in server_status:
-                    # 5분 이내면 활성 상태로 간주
-                    time_diff = datetime.now() - hb[2]
-                    if time_diff.total_seconds() < 300:  # 5분
-                        server_status[component]['status'] = hb[1]
-                    else:
-                        server_status[component]['status'] = 'timeout'
-                    server_status[component]['last_seen'] = hb[2].isoformat()
-
-            return jsonify(server_status), 200
-
-        finally:
-            session.close()
+        return jsonify(server_status_response), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -188,11 +173,17 @@ def get_user_attendance():
         current_user = get_jwt_identity()
 
         # 쿼리 파라미터
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        limit = clamp_limit(request.args.get('limit', type=int))
+        offset = max(0, request.args.get('offset', 0, type=int))  # 하위 호환용 - cursor 사용 권장
+        cursor = request.args.get('cursor')
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
 
+        try:
+            cursor = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'error': '잘못된 커서입니다'}), 400
+
         session = db_manager.get_session()
         try:
             # 기본 쿼리
@@ -203,19 +194,26 @@ def get_user_attendance():
             """
             params = {"user_id": current_user}
 
-            # 날짜 필터링
-            if date_from:
-                query += " AND DATE(attempt_time) >= :date_from"
-                params["date_from"] = date_from
-            if date_to:
-                query += " AND DATE(attempt_time) <= :date_to"
-                params["date_to"] = date_to
+            # 날짜 필터링 (반열림 구간 - attempt_time 인덱스 사용)
+            range_start, range_end = day_range(date_from, date_to) if (date_from or date_to) else (None, None)
+            if range_start:
+                query += " AND attempt_time >= :range_start"
+                params["range_start"] = range_start
+            if range_end:
+                query += " AND attempt_time < :range_end"
+                params["range_end"] = range_end
 
-            query += " ORDER BY attempt_time DESC LIMIT :limit OFFSET :offset"
-            params.update({"limit": limit, "offset": offset})
+            # 키셋 페이지네이션: 이전 페이지 마지막 행보다 오래된 기록부터 조회
+            if cursor:
+                query += " AND (attempt_time, id) < (:cursor_time, :cursor_id)"
+                params["cursor_time"], params["cursor_id"] = cursor
+                offset = 0
+
+            query += " ORDER BY attempt_time DESC, id DESC LIMIT :limit OFFSET :offset"
+            params.update({"limit": limit + 1, "offset": offset})
 
             result = session.execute(text(query), params)
-            records = result.fetchall()
+            records, next_cursor = split_page(result.fetchall(), limit, lambda record: (record[3], record[0]))
 
             # 한국어 번역 맵
             status_translation = {
@@ -243,7 +241,8 @@ def get_user_attendance():
 
             return jsonify({
                 'attendance': attendance_data,
-                'total': len(attendance_data)
+                'total': len(attendance_data),
+                'next_cursor': next_cursor
             }), 200
 
         finally:
@@ -260,16 +259,22 @@ def get_user_heartbeat():
         current_user = get_jwt_identity()
 
         # 쿼리 파라미터
-        limit = request.args.get('limit', 50, type=int)
+        limit = clamp_limit(request.args.get('limit', type=int))
         action_type = request.args.get('action_type')  # punch_in 또는 punch_out 필터
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
+        cursor = request.args.get('cursor')
+
+        try:
+            cursor = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'error': '잘못된 커서입니다'}), 400
 
         session = db_manager.get_session()
         try:
             # 기본 쿼리
             query = """
-                SELECT stage, action_type, timestamp
+                SELECT stage, action_type, timestamp, id
                 FROM heartbeat_status
                 WHERE user_id = :user_id
             """
@@ -280,19 +285,25 @@ def get_user_heartbeat():
                 query += " AND action_type = :action_type"
                 params["action_type"] = action_type
 
-            # 날짜 필터링
-            if date_from:
-                query += " AND DATE(timestamp) >= :date_from"
-                params["date_from"] = date_from
-            if date_to:
-                query += " AND DATE(timestamp) <= :date_to"
-                params["date_to"] = date_to
+            # 날짜 필터링 (반열림 구간 - timestamp 인덱스 사용)
+            range_start, range_end = day_range(date_from, date_to) if (date_from or date_to) else (None, None)
+            if range_start:
+                query += " AND timestamp >= :range_start"
+                params["range_start"] = range_start
+            if range_end:
+                query += " AND timestamp < :range_end"
+                params["range_end"] = range_end
+
+            # 키셋 페이지네이션: 이전 페이지 마지막 행보다 오래된 하트비트부터 조회
+            if cursor:
+                query += " AND (timestamp, id) < (:cursor_time, :cursor_id)"
+                params["cursor_time"], params["cursor_id"] = cursor
 
-            query += " ORDER BY timestamp DESC LIMIT :limit"
-            params["limit"] = limit
+            query += " ORDER BY timestamp DESC, id DESC LIMIT :limit"
+            params["limit"] = limit + 1
 
             result = session.execute(text(query), params)
-            heartbeats = result.fetchall()
+            heartbeats, next_cursor = split_page(result.fetchall(), limit, lambda hb: (hb[2], hb[3]))
 
             # 한국어 번역 맵
             stage_translation = {
@@ -343,6 +354,7 @@ def get_user_heartbeat():
             return jsonify({
                 'heartbeats': heartbeat_data,
                 'total': len(heartbeat_data),
+                'next_cursor': next_cursor,
                 'filters': {
                     'action_type': action_type,
                     'date_from': date_from,
@@ -479,6 +491,7 @@ def get_attendance_heartbeat(attendance_id):
 
 @app.route('/api/web/user/summary', methods=['GET'])
 @jwt_required()
+@response_cache.cached('user_summary')
 def get_user_summary():
     """사용자별 요약 정보 조회"""
     try:
@@ -487,17 +500,17 @@ def get_user_summary():
         session = db_manager.get_session()
         try:
             # 오늘 출퇴근 상태
-            today = datetime.now().strftime('%Y-%m-%d')
+            day_start, day_end = day_range()
             result = session.execute(
                 text("""
                     SELECT action_type, status, attempt_time
                     FROM attendance_logs
                     WHERE user_id = :user_id
-                    AND DATE(attempt_time) = :today
+                    AND attempt_time >= :day_start AND attempt_time < :day_end
                     AND status IN ('success', 'already_done')
                     ORDER BY attempt_time DESC
                 """),
-                {"user_id": current_user, "today": today}
+                {"user_id": current_user, "day_start": day_start, "day_end": day_end}
             )
             today_records = result.fetchall()
 
@@ -509,9 +522,9 @@ def get_user_summary():
                         COUNT(CASE WHEN action_type = 'punch_out' AND status IN ('success', 'already_done') THEN 1 END) as punch_out_count
                     FROM attendance_logs
                     WHERE user_id = :user_id
-                    AND DATE(attempt_time) >= CURRENT_DATE - INTERVAL '7 days'
+                    AND attempt_time >= :week_start
                 """),
-                {"user_id": current_user}
+                {"user_id": current_user, "week_start": day_start - timedelta(days=7)}
             )
             week_stats = result.fetchone()
 